@@ -0,0 +1,13 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+
+@pytest.fixture(params=['serial', 'threads'])
+def executor(request):
+    """No executor, or a thread pool that is shut down after the test."""
+    if request.param == 'serial':
+        yield None
+        return
+    with ThreadPoolExecutor(2) as pool:
+        yield pool
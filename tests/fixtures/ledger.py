@@ -0,0 +1,83 @@
+from collections import Counter
+
+import grpc
+
+from xpring.proto.v1.get_account_info_pb2 import GetAccountInfoResponse
+from xpring.proto.v1.get_fee_pb2 import GetFeeResponse
+from xpring.proto.v1.get_transaction_pb2 import GetTransactionResponse
+from xpring.proto.v1.submit_pb2 import SubmitTransactionResponse
+from xpring.wallet import Wallet
+
+WALLET = Wallet.from_seed('sEdSKaCy2JT7JaM7v95H9SxkhP9wS2r')
+DESTINATION = 'rU6K7V3Po4snVhBBaU29sesqs2qTQJWDw1'
+
+
+class Clock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class Unavailable(grpc.RpcError):
+
+    def code(self):
+        return grpc.StatusCode.UNAVAILABLE
+
+
+class NotFound(grpc.RpcError):
+
+    def code(self):
+        return grpc.StatusCode.NOT_FOUND
+
+
+class FakeStub:
+    """Answers every request from fixed ledger state."""
+
+    def __init__(self):
+        self.submitted = []
+        self.calls = Counter()
+        self.result = 'tesSUCCESS'
+
+    def GetAccountInfo(self, request):
+        self.calls['GetAccountInfo'] += 1
+        response = GetAccountInfoResponse()
+        response.ledger_index = 100
+        response.account_data.balance.value.xrp_amount.drops = 1000
+        response.account_data.sequence.value = 7
+        return response
+
+    def GetFee(self, request):
+        self.calls['GetFee'] += 1
+        response = GetFeeResponse()
+        response.ledger_current_index = 100
+        response.fee.minimum_fee.drops = 12
+        return response
+
+    def SubmitTransaction(self, request):
+        self.submitted.append(request.signed_transaction)
+        response = SubmitTransactionResponse()
+        response.engine_result.result = self.result
+        return response
+
+    def GetTransaction(self, request):
+        response = GetTransactionResponse()
+        response.validated = True
+        response.meta.transaction_result.result = 'tecNO_DST'
+        return response
+
+
+class FakeAsyncStub:
+
+    def __init__(self):
+        self.stub = FakeStub()
+
+    def __getattr__(self, name):
+        method = getattr(self.stub, name)
+
+        async def call(request):
+            return method(request)
+
+        return call
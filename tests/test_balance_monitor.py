@@ -0,0 +1,92 @@
+import grpc
+
+from xpring.balance_monitor import BalanceChange, BalanceMonitor, BalanceTable
+from xpring.client import Client
+from xpring.fake_ledger import FakeLedger
+from xpring.response_cache import ResponseCache
+from xpring.sequences import SequenceAllocator
+from fixtures.ledger import DESTINATION, WALLET
+
+BYSTANDER = 'rPT1Sjq2YGrBMTttX4GZHjKu9dyfzbpAYe'
+NEW = 'rDuKotkyx18D5WqWCA4mVhRWK2YLqDFKaY'
+
+
+def test_table():
+    table = BalanceTable()
+    table.add('a')
+    table.add('b')
+    assert table.get('a') is None
+    assert table.update('a', 100, 5) is None
+    assert table.update('a', 120, 6) == BalanceChange('a', 100, 120, 6)
+    # Reads from older ledgers are ignored.
+    assert table.update('a', 90, 5) is None
+    assert table.get('a') == 120
+    assert table.update('a', None, 7) == BalanceChange('a', 120, None, 7)
+    table.remove('a')
+    table.add('c')
+    # The slot is reused.
+    assert len(table.balances) == 2
+    assert table.get('c') is None
+    assert table.ledger_index('c') == 0
+    assert list(table) == ['b', 'c']
+
+
+def test_monitor():
+    ledger = FakeLedger({
+        WALLET.address: 100_000_000,
+        DESTINATION: 20_000_000,
+        BYSTANDER: 30_000_000,
+    })
+    client = Client(ledger, ResponseCache(), SequenceAllocator())
+    changes = []
+    with BalanceMonitor(
+        client, [WALLET.address, DESTINATION, BYSTANDER, NEW], concurrency=2
+    ) as monitor:
+        monitor.subscribe(changes.append)
+        # The first reads are not changes.
+        assert monitor.refresh() == []
+        assert monitor.reads == 4
+        assert monitor.balance(BYSTANDER) == 30_000_000
+        assert monitor.balance(NEW) is None
+
+        signed_transaction = client.send(WALLET, DESTINATION, '1000')
+        client.submit(signed_transaction)
+        ledger.fund(NEW, 50_000_000)
+        ledger.close_ledger()
+        monitor.touch_transaction(signed_transaction)
+        assert monitor.refresh() == changes
+        assert set(changes) == {
+            BalanceChange(DESTINATION, 20_000_000, 20_001_000, 3),
+            BalanceChange(WALLET.address, 100_000_000, 99_998_990, 3),
+        }
+        # Only the touched accounts were read.
+        assert monitor.reads == 6
+
+        assert monitor.sweep() == [
+            BalanceChange(NEW, None, 50_000_000, 3),
+        ]
+        assert monitor.reads == 10
+
+
+class FlakyLedger(FakeLedger):
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.failures = 1
+
+    def GetAccountInfo(self, request, context=None):
+        if self.failures:
+            self.failures -= 1
+            self._abort(context, grpc.StatusCode.UNAVAILABLE, 'unavailable')
+        return super().GetAccountInfo(request, context)
+
+
+def test_retry():
+    ledger = FlakyLedger({DESTINATION: 20_000_000})
+    with BalanceMonitor(Client(ledger), [DESTINATION]) as monitor:
+        monitor.refresh()
+        assert monitor.errors == 1
+        assert monitor.balance(DESTINATION) is None
+        # The account is read again on the next refresh.
+        monitor.refresh()
+        assert monitor.balance(DESTINATION) == 20_000_000
@@ -0,0 +1,167 @@
+import asyncio
+from concurrent import futures
+import threading
+import time
+
+import grpc
+import pytest
+
+from xpring.call_policy import CallPolicy
+from xpring.channel_pool import ChannelPool
+from xpring.client import AsyncClient, Client
+from xpring.fake_ledger import FakeLedger, LedgerError
+from xpring.proto.v1.get_fee_pb2 import GetFeeResponse
+from xpring.proto.v1.submit_pb2 import SubmitTransactionResponse
+
+
+class ScriptedStub:
+    """Answers each call after the next delay, or fails with the next code."""
+
+    def __init__(self, *script):
+        self.script = list(script)
+        self.timeouts = []
+        self._lock = threading.Lock()
+
+    def _next(self, timeout):
+        with self._lock:
+            self.timeouts.append(timeout)
+            step = self.script.pop(0) if self.script else 0.0
+        if isinstance(step, grpc.StatusCode):
+            raise LedgerError(step, step.name)
+        time.sleep(step)
+
+    def GetFee(self, request, timeout=None):
+        self._next(timeout)
+        return GetFeeResponse()
+
+    def SubmitTransaction(self, request, timeout=None):
+        self._next(timeout)
+        return SubmitTransactionResponse()
+
+
+UNAVAILABLE = grpc.StatusCode.UNAVAILABLE
+
+
+def test_deadline():
+    policy = CallPolicy(timeout=0.01, timeouts={'GetFee': 0.02})
+    stub = ScriptedStub()
+    client = Client(stub, policy=policy)
+    client.get_fee()
+    client.submit_blob(b'')
+    assert stub.timeouts == [0.02, 0.01]
+
+    client = Client(FakeLedger(latency=1.0), policy=policy)
+    start = time.perf_counter()
+    with pytest.raises(grpc.RpcError) as info:
+        client.submit_blob(b'')
+    assert info.value.code() == grpc.StatusCode.DEADLINE_EXCEEDED
+    assert time.perf_counter() - start < 0.5
+
+
+def test_retry():
+    policy = CallPolicy(backoff=0.0)
+    stub = ScriptedStub(UNAVAILABLE, UNAVAILABLE)
+    client = Client(stub, policy=policy)
+    client.get_fee()
+    assert client.counters.retries == 2
+
+    stub = ScriptedStub(UNAVAILABLE, UNAVAILABLE, UNAVAILABLE)
+    client = Client(stub, policy=policy)
+    with pytest.raises(grpc.RpcError):
+        client.get_fee()
+    assert client.counters.retries == 2
+
+    # Submissions are not retried.
+    stub = ScriptedStub(UNAVAILABLE)
+    client = Client(stub, policy=policy)
+    with pytest.raises(grpc.RpcError):
+        client.submit_blob(b'')
+    assert client.counters.retries == 0
+
+
+def test_delay():
+    policy = CallPolicy(backoff=0.1, max_backoff=0.3)
+    for attempts, bound in [(1, 0.1), (2, 0.2), (3, 0.3), (8, 0.3)]:
+        delays = [policy.delay(attempts) for _ in range(100)]
+        assert all(0 <= delay <= bound for delay in delays)
+        assert max(delays) > bound / 2
+
+
+def test_hedge():
+    policy = CallPolicy(hedge_after=0.02)
+    stub = ScriptedStub(1.0, 0.0, 0.0)
+    client = Client(stub, policy=policy)
+    start = time.perf_counter()
+    client.get_fee()
+    assert time.perf_counter() - start < 0.5
+    assert client.counters.hedges == 1
+    assert client.counters.hedge_wins == 1
+    # The hedge shares the deadline.
+    assert stub.timeouts == [10.0, pytest.approx(9.98)]
+
+    client.get_fee()
+    assert client.counters.hedges == 1
+
+    # Submissions are not hedged.
+    stub.script = [0.05]
+    client.submit_blob(b'')
+    assert client.counters.hedges == 1
+
+
+def test_hedge_pool():
+    pool = ChannelPool({'slow': FakeLedger(latency=1.0), 'fast': FakeLedger()})
+    client = Client(pool, policy=CallPolicy(hedge_after=0.02))
+    start = time.perf_counter()
+    for _ in range(4):
+        client.get_fee()
+    assert time.perf_counter() - start < 0.5
+    assert client.counters.hedges >= 1
+    assert client.counters.hedge_wins == client.counters.hedges
+
+
+def test_close():
+    policy = CallPolicy(hedge_after=0.02)
+    with Client(ScriptedStub(0.1, 0.0), policy=policy) as client:
+        client.get_fee()
+        executor = client.executor
+    # The client's own thread pool is shut down.
+    with pytest.raises(RuntimeError):
+        executor.submit(time.sleep, 0)
+
+    with futures.ThreadPoolExecutor() as given:
+        with Client(ScriptedStub(), policy=policy, executor=given) as client:
+            client.get_fee()
+        # A given executor is left running.
+        given.submit(time.sleep, 0).result()
+
+
+class ScriptedAsyncStub:
+
+    def __init__(self, *delays):
+        self.delays = list(delays)
+        self.cancelled = 0
+
+    async def GetFee(self, request, timeout=None):
+        delay = self.delays.pop(0) if self.delays else 0.0
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return GetFeeResponse()
+
+
+def test_hedge_async():
+    stub = ScriptedAsyncStub(1.0, 0.0)
+    client = AsyncClient(stub, policy=CallPolicy(hedge_after=0.02))
+
+    async def main():
+        start = time.perf_counter()
+        await client.get_fee()
+        return time.perf_counter() - start
+
+    assert asyncio.run(main()) < 0.5
+    assert client.counters.hedges == 1
+    assert client.counters.hedge_wins == 1
+    # The slow attempt is cancelled.
+    assert stub.cancelled == 1
@@ -0,0 +1,161 @@
+import grpc
+import pytest
+
+from xpring.channel_pool import LEAST_OUTSTANDING, ROUND_ROBIN, ChannelPool
+from xpring.client import Client
+from xpring.proto.v1.get_fee_pb2 import GetFeeRequest, GetFeeResponse
+from xpring.proto.v1.submit_pb2 import (
+    SubmitTransactionRequest,
+    SubmitTransactionResponse,
+)
+from fixtures.ledger import Clock, NotFound, Unavailable
+
+
+class Node:
+    """A stand-in server that can be slow or down."""
+
+    def __init__(self, clock, fee, delay=0.0, down=False):
+        self.clock = clock
+        self.fee = fee
+        self.delay = delay
+        self.down = down
+        self.calls = 0
+        self.timeouts = []
+
+    def _call(self, timeout):
+        self.calls += 1
+        self.timeouts.append(timeout)
+        self.clock.now += self.delay
+        if self.down:
+            raise Unavailable()
+
+    def GetFee(self, request, timeout=None):
+        self._call(timeout)
+        response = GetFeeResponse()
+        response.fee.minimum_fee.drops = self.fee
+        return response
+
+    def SubmitTransaction(self, request, timeout=None):
+        self._call(timeout)
+        return SubmitTransactionResponse()
+
+    def GetTransaction(self, request, timeout=None):
+        raise NotFound()
+
+
+def make_pool(clock, **nodes):
+    return ChannelPool(
+        nodes,
+        max_failures=2,
+        max_latency=0.5,
+        ejection_time=60.0,
+        clock=clock,
+    )
+
+
+@pytest.mark.parametrize('policy', [ROUND_ROBIN, LEAST_OUTSTANDING])
+def test_spread(policy):
+    clock = Clock()
+    a = Node(clock, 10)
+    b = Node(clock, 10)
+    client = Client(ChannelPool({'a': a, 'b': b}, policy=policy, clock=clock))
+    for _ in range(10):
+        assert client.get_fee().fee.minimum_fee.drops == 10
+    assert (a.calls, b.calls) == (5, 5)
+
+
+def test_slow_node_is_ejected():
+    clock = Clock()
+    fast = Node(clock, 10)
+    slow = Node(clock, 20, delay=1.0)
+    pool = make_pool(clock, fast=fast, slow=slow)
+    client = Client(pool)
+    fees = [client.get_fee().fee.minimum_fee.drops for _ in range(10)]
+    assert fees.count(20) == 1
+    assert pool.healthy_endpoints() == ['fast']
+
+    # The slow node returns after the ejection time.
+    clock.now += 60.0
+    slow.delay = 0.0
+    assert pool.healthy_endpoints() == ['fast', 'slow']
+
+
+def test_failover():
+    clock = Clock()
+    up = Node(clock, 10)
+    down = Node(clock, 20, down=True)
+    pool = make_pool(clock, down=down, up=up)
+    client = Client(pool)
+    for _ in range(6):
+        assert client.get_fee().fee.minimum_fee.drops == 10
+    # Two consecutive failures eject the node.
+    assert down.calls == 2
+    assert pool.healthy_endpoints() == ['up']
+
+    up.down = True
+    with pytest.raises(Unavailable):
+        client.get_fee()
+
+
+def test_submissions_do_not_fail_over():
+    clock = Clock()
+    down = Node(clock, 10, down=True)
+    up = Node(clock, 10)
+    pool = ChannelPool({'down': down, 'up': up}, policy=ROUND_ROBIN)
+    with pytest.raises(grpc.RpcError):
+        pool.SubmitTransaction(SubmitTransactionRequest())
+    assert (down.calls, up.calls) == (1, 0)
+
+
+def test_failover_shares_deadline():
+    clock = Clock()
+    down = Node(clock, 10, delay=0.4, down=True)
+    up = Node(clock, 10)
+    pool = ChannelPool(
+        {'down': down, 'up': up}, policy=ROUND_ROBIN, clock=clock
+    )
+    pool.GetFee(GetFeeRequest(), timeout=1.0)
+    assert down.timeouts == [1.0]
+    assert up.timeouts == [pytest.approx(0.6)]
+
+    # No time is left to fail over.
+    down.delay = 1.0
+    with pytest.raises(grpc.RpcError):
+        pool.GetFee(GetFeeRequest(), timeout=1.0)
+    assert up.calls == 1
+
+
+def test_request_errors_do_not_fail_over():
+    clock = Clock()
+    a = Node(clock, 10)
+    b = Node(clock, 10)
+    pool = make_pool(clock, a=a, b=b)
+    with pytest.raises(NotFound):
+        pool.GetTransaction(None)
+    assert [e.requests for e in pool.endpoints] == [1, 0]
+    assert pool.healthy_endpoints() == ['a', 'b']
+
+
+def test_other_errors_release_endpoint():
+    clock = Clock()
+    a = Node(clock, 10)
+    pool = make_pool(clock, a=a)
+    with pytest.raises(TypeError):
+        pool.GetFee(None, unexpected=True)
+    assert [e.outstanding for e in pool.endpoints] == [0]
+    assert pool.healthy_endpoints() == ['a']
+
+
+def test_check_health():
+    clock = Clock()
+    a = Node(clock, 10, down=True)
+    b = Node(clock, 10, delay=1.0)
+    c = Node(clock, 10)
+    pool = make_pool(clock, a=a, b=b, c=c)
+    assert pool.check_health() == {'a': False, 'b': False, 'c': True}
+    assert pool.healthy_endpoints() == ['c']
+
+    a.down = False
+    b.delay = 0.0
+    assert pool.check_health() == {'a': True, 'b': True, 'c': True}
+    assert pool.healthy_endpoints() == ['a', 'b', 'c']
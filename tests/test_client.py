@@ -0,0 +1,99 @@
+import asyncio
+
+import grpc
+import pytest
+
+from xpring.client import AsyncClient, Client, account_key
+from xpring.fake_ledger import LedgerError
+from xpring.response_cache import ResponseCache
+from xpring.sequences import SequenceAllocator
+from xpring.serialization import Scanner, deserialize_transaction
+from xpring.types import TransactionStatus
+from fixtures.ledger import DESTINATION, WALLET, FakeAsyncStub, FakeStub
+
+
+def check_payment(signed_transaction):
+    assert signed_transaction['Account'] == WALLET.address
+    assert signed_transaction['Destination'] == DESTINATION
+    assert signed_transaction['Amount'] == '100'
+    assert signed_transaction['Fee'] == '12'
+    assert signed_transaction['Sequence'] == 7
+
+
+def test_client():
+    stub = FakeStub()
+    client = Client(stub)
+    assert client.get_balance(WALLET.address) == 1000
+    signed_transaction = client.send(WALLET, DESTINATION, '100')
+    check_payment(signed_transaction)
+    client.submit(signed_transaction)
+    submitted = deserialize_transaction(Scanner(stub.submitted[0]))
+    assert submitted == {
+        k: v for k, v in signed_transaction.items() if k != 'hash'
+    }
+    status = client.get_transaction_status(signed_transaction['hash'])
+    assert status == TransactionStatus.FAILED
+
+
+def test_async_client():
+    stub = FakeAsyncStub()
+    client = AsyncClient(stub)
+
+    async def main():
+        assert await client.get_balance(WALLET.address) == 1000
+        signed_transaction = await client.send(WALLET, DESTINATION, '100')
+        check_payment(signed_transaction)
+        response = await client.submit(signed_transaction)
+        assert response.engine_result.result == 'tesSUCCESS'
+        return await client.get_transaction_status(signed_transaction['hash'])
+
+    assert asyncio.run(main()) == TransactionStatus.FAILED
+
+
+def test_cached_client():
+    stub = FakeStub()
+    cache = ResponseCache()
+    client = Client(stub, cache)
+    for sequence in range(7, 12):
+        signed_transaction = client.send(WALLET, DESTINATION, '100')
+        assert signed_transaction['Sequence'] == sequence
+        client.submit(signed_transaction)
+    assert stub.calls == {'GetAccountInfo': 1, 'GetFee': 1}
+
+    cache.invalidate(account_key(WALLET.address))
+    assert client.send(WALLET, DESTINATION, '100')['Sequence'] == 7
+    assert stub.calls == {'GetAccountInfo': 2, 'GetFee': 1}
+
+
+def test_sequences():
+    stub = FakeStub()
+    client = Client(stub, sequences=SequenceAllocator())
+    signed_transactions = [
+        client.send(WALLET, DESTINATION, '100') for _ in range(5)
+    ]
+    assert [tx['Sequence'] for tx in signed_transactions] == [7, 8, 9, 10, 11]
+    assert stub.calls['GetAccountInfo'] == 1
+    for signed_transaction in signed_transactions:
+        client.submit(signed_transaction)
+    assert client.sequences.in_flight(WALLET.address) == set()
+    assert stub.calls['GetAccountInfo'] == 1
+
+    stub.result = 'tefPAST_SEQ'
+    client.submit(client.send(WALLET, DESTINATION, '100'))
+    assert stub.calls['GetAccountInfo'] == 2
+
+
+def test_async_send_releases_sequence():
+    stub = FakeAsyncStub()
+    client = AsyncClient(stub, sequences=SequenceAllocator())
+
+    def unavailable(request):
+        raise LedgerError(grpc.StatusCode.UNAVAILABLE, 'unavailable')
+
+    stub.stub.GetFee = unavailable
+    with pytest.raises(grpc.RpcError):
+        asyncio.run(client.send(WALLET, DESTINATION, '100'))
+    assert client.sequences.in_flight(WALLET.address) == set()
+    del stub.stub.GetFee
+    signed_transaction = asyncio.run(client.send(WALLET, DESTINATION, '100'))
+    assert signed_transaction['Sequence'] == 7
@@ -1,6 +1,7 @@
 import nacl.signing
 import pytest
 
+from xpring.algorithms import ed25519
 from fixtures.ed25519 import SIGNATURE_EXAMPLES
 
 
@@ -15,3 +16,19 @@ def test_sign(
     signing_key = nacl.signing.SigningKey(signing_key_bytes)
     signature = signing_key.sign(bytes.fromhex(message_hex)).signature
     assert signature.hex() == signature_hex
+
+
+@pytest.mark.parametrize(*SIGNATURE_EXAMPLES)
+def test_verify(
+    signing_key_hex: str,
+    message_hex: str,
+    signature_hex: str,
+):
+    signing_key = nacl.signing.SigningKey(bytes.fromhex(signing_key_hex))
+    public_key = ed25519.KEY_PREFIX + bytes(signing_key.verify_key)
+    message = bytes.fromhex(message_hex)
+    signature = bytes.fromhex(signature_hex)
+    assert ed25519.verify(message, signature, public_key)
+    tampered = bytes([signature[0] ^ 1]) + signature[1:]
+    assert not ed25519.verify(message, tampered, public_key)
+    assert not ed25519.verify(message, signature[:-1], public_key)
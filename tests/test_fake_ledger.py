@@ -0,0 +1,105 @@
+import grpc
+import pytest
+
+from xpring.client import Client
+from xpring.fake_ledger import FakeLedger, LedgerError
+from xpring.load_generator import generate_load
+from xpring.response_cache import ResponseCache
+from xpring.sequences import SequenceAllocator
+from xpring.types import TransactionStatus
+from fixtures.ledger import DESTINATION, WALLET
+
+
+def payment(**fields):
+    return WALLET.sign_transaction({
+        'Account': WALLET.address,
+        'Amount': '1000',
+        'Destination': DESTINATION,
+        'Fee': '10',
+        'Flags': 0x80000000,
+        'Sequence': 1,
+        'TransactionType': 'Payment',
+        **fields,
+    })
+
+
+@pytest.fixture
+def ledger():
+    ledger = FakeLedger({WALLET.address: 100_000_000})
+    ledger.fund(DESTINATION, ledger.reserve)
+    return ledger
+
+
+def test_payment(ledger):
+    client = Client(ledger, ResponseCache(), SequenceAllocator())
+    signed_transaction = client.send(WALLET, DESTINATION, '1000')
+    response = client.submit(signed_transaction)
+    assert response.engine_result.result == 'tesSUCCESS'
+    assert ledger.accounts[WALLET.address].balance == 100_000_000 - 1010
+    assert ledger.accounts[WALLET.address].sequence == 2
+    assert ledger.accounts[DESTINATION].balance == ledger.reserve + 1000
+
+    txid = signed_transaction['hash']
+    assert client.get_transaction_status(txid) == TransactionStatus.PENDING
+    ledger.close_ledger()
+    assert client.get_transaction_status(txid) == TransactionStatus.SUCCEEDED
+
+
+def test_hold(ledger):
+    client = Client(ledger)
+    ahead = payment(Sequence=2)
+    assert client.submit(ahead).engine_result.result == 'terPRE_SEQ'
+    assert ledger.accounts[WALLET.address].sequence == 1
+    first = payment()
+    assert client.submit(first).engine_result.result == 'tesSUCCESS'
+    # The held transaction applies after its predecessor.
+    assert ledger.accounts[WALLET.address].sequence == 3
+    record = ledger.transactions[bytes.fromhex(ahead['hash'])]
+    assert record.result == 'tesSUCCESS'
+    assert client.submit(first).engine_result.result == 'tefPAST_SEQ'
+
+
+@pytest.mark.parametrize(
+    'transaction,result', [
+        ({'Fee': '1'}, 'telINSUF_FEE_P'),
+        ({'Destination': WALLET.address}, 'temDST_IS_SRC'),
+        ({'Amount': '200000000'}, 'tecUNFUNDED_PAYMENT'),
+        (
+            {'Destination': 'rPT1Sjq2YGrBMTttX4GZHjKu9dyfzbpAYe'},
+            'tecNO_DST_INSUF_XRP',
+        ),
+        ({'Account': DESTINATION}, 'temBAD_SIGNATURE'),
+    ]
+)
+def test_result(ledger, transaction, result):
+    client = Client(ledger)
+    response = client.submit(payment(**transaction))
+    assert response.engine_result.result == result
+
+
+def test_tampered_signature(ledger):
+    signed_transaction = dict(payment())
+    signature = bytearray.fromhex(signed_transaction['TxnSignature'])
+    signature[0] ^= 1
+    signed_transaction['TxnSignature'] = signature.hex().upper()
+    response = Client(ledger).submit(signed_transaction)
+    assert response.engine_result.result == 'temBAD_SIGNATURE'
+
+
+def test_not_found(ledger):
+    client = Client(ledger)
+    with pytest.raises(LedgerError) as info:
+        client.get_transaction(b'\0' * 32)
+    assert info.value.code() == grpc.StatusCode.NOT_FOUND
+
+
+@pytest.mark.parametrize('mode', ['send', 'pipeline'])
+def test_generate_load(ledger, mode):
+    client = Client(ledger, ResponseCache(), SequenceAllocator())
+    report = generate_load(
+        client, [WALLET], DESTINATION, 20, concurrency=4, mode=mode
+    )
+    assert len(report.latencies) == 20
+    assert report.throughput > 0
+    assert ledger.accounts[WALLET.address].sequence == 21
+    assert ledger.accounts[DESTINATION].balance == ledger.reserve + 20_000
@@ -0,0 +1,66 @@
+import pytest
+
+from xpring import instrumentation
+from xpring.client import Client
+from xpring.instrumentation import MetricsRecorder, format_prometheus
+from xpring.serialization import serialize_transaction
+from fixtures.ledger import DESTINATION, WALLET, Clock, FakeStub
+
+
+@pytest.fixture
+def recorder():
+    recorder = MetricsRecorder()
+    previous = instrumentation.install(recorder)
+    yield recorder
+    instrumentation.install(previous)
+
+
+def test_histogram():
+    clock = Clock()
+    recorder = MetricsRecorder(clock)
+    for value in (0.001, 0.002, 0.003, 0.1):
+        recorder.observe('rpc.GetFee.seconds', value)
+    recorder.increment('serialize.bytes', 100)
+    clock.now = 2.0
+    snapshot = recorder.snapshot(reset=True)
+    histogram = snapshot.histograms['rpc.GetFee.seconds']
+    assert histogram.count == 4
+    assert histogram.min == 0.001
+    assert histogram.max == 0.1
+    assert 0.002 <= histogram.quantile(0.5) < 0.004
+    assert histogram.quantile(1.0) == 0.1
+    assert snapshot.rate('rpc.GetFee.seconds') == 2.0
+    assert snapshot.rate('serialize.bytes') == 50.0
+    assert recorder.snapshot().counters == {}
+
+
+def test_format_prometheus():
+    recorder = MetricsRecorder()
+    recorder.increment('rpc.GetFee.errors')
+    recorder.observe('rpc.GetFee.seconds', 0.5)
+    text = format_prometheus(recorder.snapshot())
+    assert 'xpring_rpc_GetFee_errors_total 1\n' in text
+    assert 'xpring_rpc_GetFee_seconds_bucket{le="+Inf"} 1\n' in text
+    assert 'xpring_rpc_GetFee_seconds_count 1\n' in text
+
+
+def test_instrumented(recorder):
+    client = Client(FakeStub())
+    signed_transaction = client.send(WALLET, DESTINATION, '100')
+    client.submit(signed_transaction)
+    snapshot = recorder.snapshot()
+    assert set(snapshot.histograms) >= {
+        'rpc.GetAccountInfo.seconds',
+        'rpc.GetFee.seconds',
+        'rpc.SubmitTransaction.seconds',
+        'serialize.seconds',
+        'sign.ed25519.seconds',
+    }
+    blob = serialize_transaction(signed_transaction)
+    assert snapshot.counters['serialize.bytes'] > len(blob)
+
+
+def test_not_instrumented():
+    assert instrumentation.recorder is None
+    blob = serialize_transaction({'Fee': '10'})
+    assert blob == bytes.fromhex('68400000000000000A')
@@ -1,8 +1,13 @@
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+import typing as t
+
 import pytest
 
 from xpring.key_pair import KeyPair
-from xpring.types import Address, EncodedSeed, PrivateKey, PublicKey
+from xpring.types import (
+    Address, EncodedSeed, PrivateKey, PublicKey, Signature
+)
 
 # https://github.com/ripple/ripple-keypairs/blob/6f606a885ae5cb2e897c796c98171938aba19903/test/fixtures/api.json#L12-L21
 KEY_PAIR_EXAMPLES = (
@@ -67,3 +72,61 @@ def test_sign_verify(
     message = b'message'
     signature = key_pair.sign(message)
     assert key_pair.verify(message, signature)
+
+
+@pytest.mark.parametrize(*KEY_PAIR_EXAMPLES)
+def test_verify_batch(
+    encoded_seed: EncodedSeed,
+    private_key_hex: str,
+    public_key_hex: str,
+    address: Address,
+    executor: t.Optional[ThreadPoolExecutor],
+):
+    key_pair = KeyPair.from_encoded_seed(encoded_seed)
+    messages = [f'message {i}'.encode() for i in range(600)]
+    signatures = [key_pair.sign(message) for message in messages]
+    # Swap two signatures and truncate a third.
+    signatures[1], signatures[2] = signatures[2], signatures[1]
+    signatures[300] = t.cast(Signature, signatures[300][:-1])
+    public_keys = [key_pair.public_key] * len(messages)
+    results = key_pair.algorithm.verify_batch(
+        messages, signatures, public_keys, executor=executor
+    )
+    expected = [True] * len(messages)
+    expected[1] = expected[2] = expected[300] = False
+    assert results == expected
+
+
+@pytest.mark.parametrize(*KEY_PAIR_EXAMPLES)
+def test_prepared_signer(
+    encoded_seed: EncodedSeed,
+    private_key_hex: str,
+    public_key_hex: str,
+    address: Address,
+):
+    key_pair = KeyPair.from_encoded_seed(encoded_seed)
+    message = b'message'
+    # Both algorithms sign deterministically.
+    assert key_pair.sign(message) == key_pair.algorithm.sign(
+        message, key_pair.private_key
+    )
+    assert key_pair.account_id is key_pair.account_id
+
+
+def test_encoded_seed_family():
+    encoded_seed = t.cast(EncodedSeed, 'sp5fghtJtpUorTwvof1NpDXAzNwf5')
+    family = KeyPair.from_encoded_seed_family(encoded_seed, 5)
+    assert family[0] == KeyPair.from_encoded_seed(encoded_seed)
+    assert len({key_pair.public_key for key_pair in family}) == 5
+    assert KeyPair.from_encoded_seed_family(encoded_seed, 2, start=3) == (
+        family[3:]
+    )
+    message = b'message'
+    for key_pair in family:
+        assert key_pair.verify(message, key_pair.sign(message))
+
+
+def test_encoded_seed_family_ed25519():
+    encoded_seed = t.cast(EncodedSeed, 'sEdSKaCy2JT7JaM7v95H9SxkhP9wS2r')
+    with pytest.raises(ValueError):
+        KeyPair.from_encoded_seed_family(encoded_seed, 2)
@@ -0,0 +1,42 @@
+import io
+
+import pytest
+
+from xpring.algorithms import ed25519, secp256k1
+from xpring.key_pair import KeyPair
+from xpring.provisioning import provision_wallets, write_wallets
+
+
+@pytest.mark.parametrize('algorithm', (ed25519, secp256k1))
+def test_provision_wallets(algorithm, executor):
+    reports = []
+    wallets = list(
+        provision_wallets(
+            10,
+            algorithm,
+            executor=executor,
+            chunk_size=4,
+            self_test_rate=1.0,
+            progress=reports.append,
+        )
+    )
+    assert len(wallets) == 10
+    assert len({wallet.encoded_seed for wallet in wallets}) == 10
+    for wallet in wallets:
+        key_pair = KeyPair.from_encoded_seed(wallet.encoded_seed)
+        assert key_pair.algorithm is algorithm
+        assert key_pair.address == wallet.address
+        assert key_pair.public_key == wallet.public_key
+    assert [report.done for report in reports] == [4, 8, 10]
+    assert reports[-1].total == 10
+
+
+def test_write_wallets():
+    file = io.StringIO()
+    assert write_wallets(provision_wallets(3), file) == 3
+    lines = file.getvalue().splitlines()
+    assert len(lines) == 3
+    encoded_seed, address, public_key_hex = lines[0].split(',')
+    key_pair = KeyPair.from_encoded_seed(encoded_seed)
+    assert key_pair.address == address
+    assert key_pair.public_key.hex().upper() == public_key_hex
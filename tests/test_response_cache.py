@@ -0,0 +1,52 @@
+from xpring.response_cache import ResponseCache
+from fixtures.ledger import Clock
+
+
+def test_ttl():
+    clock = Clock()
+    cache = ResponseCache(ttl=4.0, clock=clock)
+    assert cache.get('fee') is None
+    cache.put('fee', 10)
+    clock.now = 4.0
+    assert cache.get('fee') == 10
+    clock.now = 4.5
+    assert cache.get('fee') is None
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_ledger():
+    cache = ResponseCache()
+    cache.put('fee', 10, ledger_index=100)
+    cache.put('account', 20, ledger_index=100)
+    cache.observe_ledger(100)
+    assert cache.get('fee') == 10
+    # A later ledger expires everything read from earlier ones.
+    cache.put('account', 21, ledger_index=101)
+    assert cache.get('fee') is None
+    assert cache.get('account') == 21
+    cache.observe_ledger(102)
+    assert cache.get('account') is None
+
+
+def test_capacity():
+    cache = ResponseCache(capacity=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    cache.put('c', 3)
+    assert len(cache) == 2
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+
+
+def test_update_and_invalidate():
+    cache = ResponseCache()
+    assert not cache.update('a', lambda value: value + 1)
+    cache.put('a', 1)
+    assert cache.update('a', lambda value: value + 1)
+    assert cache.get('a') == 2
+    cache.invalidate('a')
+    cache.invalidate('a')
+    assert cache.get('a') is None
+    assert cache.invalidations == 1
+    assert cache.hit_rate == 0.5
@@ -2,6 +2,7 @@ import typing as t
 
 import pytest
 
+from xpring.algorithms import secp256k1
 from fixtures.secp256k1 import SIGNATURE_EXAMPLES
 from fixtures.packages import cryptography, ecdsa, fastecdsa
 
@@ -93,3 +94,83 @@ def test_equal_signature(
         signing_key_fastecdsa, message_digest_bytes
     )
     assert signature_fastecdsa.hex() == signature_hex
+
+
+@pytest.mark.parametrize(*SIGNATURE_EXAMPLES)
+def test_decompress_public_key(
+    signing_key_hex: str,
+    message_digest_hex: str,
+    signature_hex: str,
+):
+    signing_key = fastecdsa.make_signing_key(bytes.fromhex(signing_key_hex))
+    point = fastecdsa.derive_verifying_key(signing_key)
+    public_key = secp256k1.compress_point((point.x, point.y))
+    assert secp256k1.decompress_public_key(public_key) == (point.x, point.y)
+
+
+@pytest.mark.parametrize(*SIGNATURE_EXAMPLES)
+def test_decode_der_signature(
+    signing_key_hex: str,
+    message_digest_hex: str,
+    signature_hex: str,
+):
+    signature = bytes.fromhex(signature_hex)
+    r, s = secp256k1.decode_der_signature(signature)
+    assert secp256k1.encode_der_signature(r, s) == signature
+
+
+@pytest.mark.parametrize(
+    'signature_hex', (
+        # Trailing garbage.
+        '3006020101020101' + '00',
+        # Integer padded with an unnecessary zero.
+        '300702020001020101',
+        # Negative integer.
+        '3006020181020101',
+        # Zero.
+        '3006020100020101',
+        # Wrong sequence length.
+        '3007020101020101',
+        # Truncated before the length of the second integer.
+        '3006020301010102',
+    )
+)
+def test_decode_der_signature_strict(signature_hex: str):
+    signature = bytes.fromhex(signature_hex)
+    with pytest.raises(ValueError):
+        secp256k1.decode_der_signature(signature)
+    public_key = bytes.fromhex(
+        '030d58eb48b4420b1f7b9df55087e0e29fef0e8468f9a6825b01ca2c361042d435'
+    )
+    assert not secp256k1.verify(b'test message', signature, public_key)
+    assert secp256k1.verify_batch(
+        [b'test message'], [signature], [public_key]
+    ) == [False]
+
+
+def test_verify_strict_der():
+    # https://github.com/ripple/ripple-keypairs/blob/master/test/fixtures/api.json#L2-L15
+    public_key = bytes.fromhex(
+        '030d58eb48b4420b1f7b9df55087e0e29fef0e8468f9a6825b01ca2c361042d435'
+    )
+    signature = bytes.fromhex(
+        '30440220583a91c95e54e6a651c47bec22744e0b101e2c4060e7b08f6341657dad9bc3ee02207d1489c7395db0188d3a56a977ecba54b36fa9371b40319655b1b4429e33ef2d'
+    )
+    assert secp256k1.verify(b'test message', signature, public_key)
+    assert not secp256k1.verify(b'test massage', signature, public_key)
+
+
+def test_verifier_cache():
+    public_key = bytes.fromhex(
+        '030d58eb48b4420b1f7b9df55087e0e29fef0e8468f9a6825b01ca2c361042d435'
+    )
+    secp256k1.configure_verifier_cache(2)
+    try:
+        verifier = secp256k1.prepare_verifier(public_key)
+        assert secp256k1.prepare_verifier(public_key) is verifier
+        info = secp256k1.verifier_cache_info()
+        assert (info.hits, info.misses) == (1, 1)
+        secp256k1.configure_verifier_cache(0)
+        assert secp256k1.prepare_verifier(public_key) is not verifier
+    finally:
+        secp256k1.configure_verifier_cache(secp256k1.VERIFIER_CACHE_SIZE)
@@ -0,0 +1,62 @@
+import pytest
+
+from xpring.algorithms import secp256k1, secp256k1_backends as backends
+from xpring.key_pair import KeyPair
+
+# https://github.com/ripple/ripple-keypairs/blob/6f606a885ae5cb2e897c796c98171938aba19903/test/fixtures/api.json#L12-L21
+ENCODED_SEED = 'sp5fghtJtpUorTwvof1NpDXAzNwf5'
+PUBLIC_KEY_HEX = '030d58eb48b4420b1f7b9df55087e0e29fef0e8468f9a6825b01ca2c361042d435'
+
+BACKEND_NAMES = tuple(backends.BACKENDS)
+
+
+@pytest.fixture
+def restore_selection():
+    selected = dict(backends._SELECTED)  # pylint: disable=protected-access
+    yield
+    backends._SELECTED.clear()  # pylint: disable=protected-access
+    backends._SELECTED.update(selected)  # pylint: disable=protected-access
+
+
+@pytest.mark.parametrize('name', BACKEND_NAMES)
+def test_backend(name, restore_selection):
+    if backends.load_backend(name) is None:
+        pytest.skip(f'{name} is not installed')
+    backends.configure(derive=name, sign=name, verify=name)
+    key_pair = KeyPair.from_encoded_seed(ENCODED_SEED)
+    assert key_pair.public_key.hex() == PUBLIC_KEY_HEX
+    message = b'message'
+    signature = key_pair.sign(message)
+    # Every backend verifies every other backend's signatures.
+    for other in backends.available_backends():
+        backends.configure(verify=other.name)
+        assert secp256k1.verify(message, signature, key_pair.public_key)
+        assert not secp256k1.verify(b'massage', signature, key_pair.public_key)
+
+
+def test_configure_unknown(restore_selection):
+    with pytest.raises(ValueError):
+        backends.configure(sign='openssl')
+    with pytest.raises(ValueError):
+        backends.configure(hash='fastecdsa')
+
+
+def test_select_fastest(restore_selection):
+    names = backends.select_fastest(iterations=2)
+    assert set(names) == set(backends.OPERATIONS)
+    for operation, name in names.items():
+        assert backends.get_backend(operation).name == name
+    # Random nonces would make signatures irreproducible.
+    assert backends.get_backend('sign').deterministic
+
+
+def test_nondeterministic_signer(restore_selection):
+    assert not backends.CryptographyBackend.deterministic
+    assert all(
+        backend.deterministic
+        for backend in backends.available_backends('sign')
+    )
+    if backends.load_backend('cryptography') is not None:
+        # It may still be chosen explicitly.
+        backends.configure(sign='cryptography')
+        assert backends.get_backend('sign').name == 'cryptography'
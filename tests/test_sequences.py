@@ -0,0 +1,79 @@
+from xpring.sequences import SequenceAllocator
+
+ADDRESS = 'rLUEXYuLiQptky37CqLcm9USQpPiz5rkpD'
+
+
+def allocate(sequences, count):
+    return [sequences.allocate(ADDRESS) for _ in range(count)]
+
+
+def test_allocate():
+    sequences = SequenceAllocator()
+    assert sequences.needs_sync(ADDRESS)
+    sequences.sync(ADDRESS, 7)
+    assert allocate(sequences, 3) == [7, 8, 9]
+    assert sequences.in_flight(ADDRESS) == {7, 8, 9}
+    assert not sequences.record(ADDRESS, 7, 'tesSUCCESS')
+    assert not sequences.record(ADDRESS, 9, 'tecNO_DST')
+    # A failure that does not consume the sequence frees it for reuse.
+    assert not sequences.record(ADDRESS, 8, 'temBAD_FEE')
+    assert sequences.in_flight(ADDRESS) == set()
+    assert allocate(sequences, 2) == [8, 10]
+
+
+def test_retry():
+    sequences = SequenceAllocator()
+    sequences.sync(ADDRESS, 7)
+    assert allocate(sequences, 2) == [7, 8]
+    # A transaction to be submitted again keeps its sequence.
+    assert not sequences.record(ADDRESS, 7, 'telCAN_NOT_QUEUE', retry=True)
+    assert sequences.in_flight(ADDRESS) == {7, 8}
+    assert allocate(sequences, 1) == [9]
+    assert not sequences.record(ADDRESS, 7, 'tesSUCCESS')
+    assert sequences.in_flight(ADDRESS) == {8, 9}
+
+
+def test_past_sequence():
+    sequences = SequenceAllocator()
+    sequences.sync(ADDRESS, 7)
+    assert allocate(sequences, 2) == [7, 8]
+    # Another client used the account.
+    assert sequences.record(ADDRESS, 7, 'tefPAST_SEQ')
+    sequences.sync(ADDRESS, 12)
+    assert sequences.in_flight(ADDRESS) == set()
+    assert allocate(sequences, 2) == [12, 13]
+
+
+def test_fill_gaps():
+    sequences = SequenceAllocator()
+    sequences.sync(ADDRESS, 7)
+    assert allocate(sequences, 4) == [7, 8, 9, 10]
+    sequences.release(ADDRESS, 7)
+    # The released sequence explains why these are held.
+    assert not sequences.record(ADDRESS, 8, 'terPRE_SEQ')
+    assert not sequences.record(ADDRESS, 9, 'terPRE_SEQ')
+    sequences.sync(ADDRESS, 7)
+    # The gap is filled before any new sequence is used.
+    assert allocate(sequences, 2) == [7, 11]
+    assert sequences.in_flight(ADDRESS) == {7, 10, 11}
+
+
+def test_unexplained_gap():
+    sequences = SequenceAllocator()
+    sequences.sync(ADDRESS, 7)
+    assert allocate(sequences, 3) == [7, 8, 9]
+    # 7 is still in flight.
+    assert not sequences.record(ADDRESS, 9, 'terPRE_SEQ')
+    assert not sequences.record(ADDRESS, 7, 'tesSUCCESS')
+    # Nothing below 8 is in flight or free.
+    assert sequences.record(ADDRESS, 8, 'terPRE_SEQ')
+
+
+def test_allocate_gap():
+    sequences = SequenceAllocator()
+    sequences.sync(ADDRESS, 7)
+    assert allocate(sequences, 2) == [7, 8]
+    assert sequences.allocate_gap(ADDRESS) is None
+    assert not sequences.record(ADDRESS, 7, 'temBAD_AMOUNT')
+    assert sequences.allocate_gap(ADDRESS) == 7
+    assert sequences.allocate_gap(ADDRESS) is None
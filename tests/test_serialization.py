@@ -1,9 +1,10 @@
+import io
 import json
 from pathlib import Path
 
 import pytest
 
-from xpring import hashes, serialization
+from xpring import hashes, patching, serialization, transcoding
 
 # yapf: disable
 TRANSACTION_EXAMPLES = [
@@ -93,6 +94,19 @@ def test_serialize_transaction(transaction, blob_hex):
     assert blob.hex().upper() == blob_hex
 
 
+@pytest.mark.parametrize(*TRANSACTION_PARAMETERS)
+def test_transaction_template(transaction, blob_hex):
+    variables = {'Fee', 'Sequence', 'TxnSignature'} & transaction.keys()
+    constants = without(transaction, variables)
+    values = {k: transaction[k] for k in variables}
+    template = serialization.TransactionTemplate(constants, variables)
+    blob = template.serialize(values)
+    assert blob.hex().upper() == blob_hex
+    assert template.serialize(
+        values, signing=True
+    ) == serialization.serialize_transaction(transaction, signing=True)
+
+
 @pytest.mark.parametrize(*TRANSACTION_PARAMETERS)
 def test_deserialize_transaction(transaction, blob_hex):
     scanner = serialization.Scanner(bytes.fromhex(blob_hex))
@@ -100,6 +114,60 @@ def test_deserialize_transaction(transaction, blob_hex):
     assert serialization.deserialize_transaction(scanner) == expected
 
 
+@pytest.mark.parametrize(*TRANSACTION_PARAMETERS)
+@pytest.mark.parametrize(
+    'fields', (
+        {'Fee', 'TransactionType'},
+        {'Account', 'Sequence', 'TxnSignature'},
+        set(),
+    )
+)
+def test_deserialize_transaction_fields(transaction, blob_hex, fields):
+    scanner = serialization.Scanner(bytes.fromhex(blob_hex))
+    expected = {k: v for k, v in transaction.items() if k in fields}
+    assert serialization.deserialize_transaction(
+        scanner, fields=fields
+    ) == expected
+    assert not scanner
+
+
+@pytest.mark.parametrize(*TRANSACTION_PARAMETERS)
+def test_transcode_transaction(transaction, blob_hex):
+    expected = serialization.deserialize_transaction(
+        serialization.Scanner(bytes.fromhex(blob_hex))
+    )
+    scanner = serialization.Scanner(bytes.fromhex(blob_hex))
+    file = io.StringIO()
+    transcoding.transcode_transaction(scanner, file)
+    assert file.getvalue() == json.dumps(expected)
+
+
+@pytest.mark.parametrize(*TRANSACTION_PARAMETERS)
+def test_extract_signing_blob(transaction, blob_hex):
+    assert patching.extract_signing_blob(
+        bytes.fromhex(blob_hex)
+    ) == serialization.serialize_transaction(transaction, signing=True)
+
+
+@pytest.mark.parametrize(
+    TRANSACTION_PARAMETERS[0],
+    [example for example in TRANSACTION_EXAMPLES if 'Fee' in example[0]],
+)
+def test_patch_transaction(transaction, blob_hex):
+    values = {
+        'Fee': str(int(transaction['Fee']) + 10),
+        'LastLedgerSequence': 12345678,
+        'TxnSignature': 'AB' * 72,
+    }
+    patched = {**transaction, **values}
+    blob = bytearray.fromhex(blob_hex)
+    signing_blob = patching.patch_transaction(blob, values)
+    assert blob == serialization.serialize_transaction(patched)
+    assert signing_blob == serialization.serialize_transaction(
+        patched, signing=True
+    )
+
+
 @pytest.mark.parametrize(*TRANSACTION_PARAMETERS)
 def test_hash_transaction(transaction, blob_hex):
     if 'hash' not in transaction:
@@ -109,6 +177,27 @@ def test_hash_transaction(transaction, blob_hex):
     assert digest.hex().upper() == transaction['hash']
 
 
+@pytest.mark.parametrize(*TRANSACTION_PARAMETERS)
+def test_serialize_transaction_into(transaction, blob_hex):
+    file = io.BytesIO()
+    serialization.serialize_transaction_into(file, transaction)
+    assert file.getvalue().hex().upper() == blob_hex
+
+    sink = serialization.ByteArraySink(bytearray(b'prefix'))
+    serialization.serialize_transaction_into(sink, transaction, signing=True)
+    assert sink.buffer == b'prefix' + serialization.serialize_transaction(
+        transaction, signing=True
+    )
+
+    hasher = hashes.Sha512Half(serialization.PREFIX_TRANSACTION_ID)
+    serialization.serialize_transaction_into(
+        serialization.HasherSink(hasher), transaction
+    )
+    assert hasher.digest() == hashes.sha512half(
+        serialization.PREFIX_TRANSACTION_ID + bytes.fromhex(blob_hex)
+    )
+
+
 # yapf: disable
 AMOUNT_EXAMPLES = (
     ('amount', 'blob_hex'),
@@ -0,0 +1,66 @@
+import pytest
+
+from xpring.key_pair import KeyPair
+from xpring.serialization import serialize_transaction
+from xpring.signing_pool import SigningPool
+from xpring.wallet import Wallet
+
+WALLETS = [
+    Wallet.from_seed(seed) for seed in (
+        'sEdSKaCy2JT7JaM7v95H9SxkhP9wS2r',
+        'sp5fghtJtpUorTwvof1NpDXAzNwf5',
+    )
+]
+DESTINATION = 'rLUEXYuLiQptky37CqLcm9USQpPiz5rkpD'
+
+
+def make_transaction(wallet, sequence):
+    return {
+        'Account': wallet.address,
+        'Amount': str(1000 + sequence),
+        'Destination': DESTINATION,
+        'Fee': '10',
+        'Flags': 0x80000000,
+        'Sequence': sequence,
+        'TransactionType': 'Payment',
+    }
+
+
+@pytest.mark.parametrize('threads', (False, True))
+def test_sign(threads):
+    transactions = [
+        make_transaction(WALLETS[i % 2], i) for i in range(1, 100)
+    ]
+    with SigningPool(
+        WALLETS, max_workers=2, threads=threads, chunk_size=8, max_pending=2
+    ) as pool:
+        results = list(pool.sign(transactions))
+    assert len(results) == len(transactions)
+    for transaction, (blob, digest) in zip(transactions, results):
+        wallet = WALLETS[transaction['Sequence'] % 2]
+        signed = wallet.sign_transaction(transaction)
+        assert digest.hex().upper() == signed.pop('hash')
+        assert blob == serialize_transaction(signed)
+
+
+def test_unknown_account():
+    wallet = Wallet.from_seed('snoPBrXtMeMyMHUVTgbuqAfg1SUTb')
+    with SigningPool(WALLETS, threads=True) as pool:
+        with pytest.raises(ValueError):
+            list(pool.sign([make_transaction(wallet, 1)]))
+
+
+@pytest.mark.parametrize('threads', (False, True))
+def test_family(threads):
+    family = [
+        Wallet(key_pair) for key_pair in
+        KeyPair.from_encoded_seed_family('sp5fghtJtpUorTwvof1NpDXAzNwf5', 3)
+    ]
+    transactions = [make_transaction(wallet, 1) for wallet in family]
+    with SigningPool(family, max_workers=1, threads=threads) as pool:
+        results = list(pool.sign(transactions))
+    for wallet, transaction, (_, digest) in zip(
+        family, transactions, results
+    ):
+        signed = wallet.sign_transaction(transaction)
+        assert digest.hex().upper() == signed['hash']
@@ -0,0 +1,125 @@
+from xpring.client import Client
+from xpring.proto.v1.get_fee_pb2 import GetFeeResponse
+from xpring.proto.v1.get_transaction_pb2 import GetTransactionResponse
+from xpring.status_tracker import StatusTracker
+from xpring.types import TransactionStatus
+from fixtures.ledger import NotFound
+
+
+class Ledger:
+
+    def __init__(self):
+        self.index = 100
+        # Results by transaction ID, once validated.
+        self.validated = {}
+        self.requests = 0
+
+    def GetFee(self, request):
+        response = GetFeeResponse()
+        response.ledger_current_index = self.index
+        return response
+
+    def GetTransaction(self, request):
+        self.requests += 1
+        if request.hash not in self.validated:
+            raise NotFound()
+        response = GetTransactionResponse()
+        response.validated = True
+        response.meta.transaction_result.result = self.validated[request.hash]
+        return response
+
+
+def txid(i):
+    return i.to_bytes(32, 'big')
+
+
+def test_resolve():
+    ledger = Ledger()
+    tracker = StatusTracker(Client(ledger))
+    succeeded = tracker.track(txid(1))
+    failed = tracker.track(txid(2).hex())
+    expired = tracker.track(txid(3), last_ledger_sequence=101)
+    assert tracker.track(txid(1)) is succeeded
+
+    assert tracker.poll() == 0
+    # Nothing is polled until the next ledger.
+    assert tracker.poll() == 0
+    assert ledger.requests == 3
+
+    ledger.validated[txid(1)] = 'tesSUCCESS'
+    ledger.validated[txid(2)] = 'tecNO_DST'
+    ledger.index += 1
+    assert tracker.poll() == 2
+    assert succeeded.result() == TransactionStatus.SUCCEEDED
+    assert failed.result() == TransactionStatus.FAILED
+    assert not expired.done()
+
+    ledger.index = 104
+    assert tracker.poll() == 1
+    assert expired.result() == TransactionStatus.EXPIRED
+    assert len(tracker) == 0
+
+
+def test_backoff():
+    ledger = Ledger()
+    tracker = StatusTracker(Client(ledger), max_delay=4)
+    tracker.track(txid(1))
+    requests = []
+    for _ in range(16):
+        tracker.poll()
+        requests.append(ledger.requests)
+        ledger.index += 1
+    # Checked after 1, 2, 4, 4, 4 ledgers.
+    assert requests == [
+        1, 2, 2, 3, 3, 3, 3, 4, 4, 4, 4, 5, 5, 5, 5, 6
+    ]
+
+
+def test_batch_size():
+    ledger = Ledger()
+    tracker = StatusTracker(Client(ledger), batch_size=10)
+    futures = [tracker.track(txid(i)) for i in range(25)]
+    for i in range(25):
+        ledger.validated[txid(i)] = 'tesSUCCESS'
+    resolved = []
+    for _ in range(3):
+        resolved.append(tracker.poll())
+        ledger.index += 1
+    assert resolved == [10, 10, 5]
+    assert all(f.result() == TransactionStatus.SUCCEEDED for f in futures)
+
+
+def test_cancel():
+    ledger = Ledger()
+    tracker = StatusTracker(Client(ledger))
+    cancelled = tracker.track(txid(1))
+    kept = tracker.track(txid(2))
+    assert cancelled.cancel()
+    ledger.validated[txid(1)] = 'tesSUCCESS'
+    ledger.validated[txid(2)] = 'tesSUCCESS'
+    assert tracker.poll() == 1
+    assert kept.result() == TransactionStatus.SUCCEEDED
+    assert len(tracker) == 0
+
+
+class BrokenLedger(Ledger):
+
+    def __init__(self):
+        super().__init__()
+        self.failures = 1
+
+    def GetFee(self, request):
+        if self.failures:
+            self.failures -= 1
+            raise ValueError('broken')
+        return super().GetFee(request)
+
+
+def test_survive_errors():
+    ledger = BrokenLedger()
+    ledger.validated[txid(1)] = 'tesSUCCESS'
+    with StatusTracker(Client(ledger), ledger_interval=0.01) as tracker:
+        future = tracker.track(txid(1))
+        tracker.start()
+        assert future.result(timeout=5) == TransactionStatus.SUCCEEDED
+    assert ledger.failures == 0
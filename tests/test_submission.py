@@ -0,0 +1,193 @@
+import threading
+
+import grpc
+import pytest
+
+from xpring.client import Client
+from xpring.fake_ledger import LedgerError
+from xpring.proto.v1.get_account_info_pb2 import GetAccountInfoResponse
+from xpring.proto.v1.get_fee_pb2 import GetFeeResponse
+from xpring.proto.v1.submit_pb2 import SubmitTransactionResponse
+from xpring.sequences import SequenceAllocator
+from xpring.serialization import Scanner, deserialize_transaction
+from xpring.submission import Disposition, SubmissionPipeline, classify
+from fixtures.ledger import DESTINATION, WALLET, Unavailable
+
+
+class Ledger:
+    """
+    Applies transactions in sequence, with scripted failures. Like rippled,
+    it holds transactions that arrive ahead of their predecessors.
+    """
+
+    def __init__(self, sequence=7):
+        self.sequence = sequence
+        self.held = {}
+        self.applied = []
+        # Amounts submitted, by sequence.
+        self.submitted = {}
+        # Results, exceptions, or functions returning either, to return
+        # before applying, by amount.
+        self.script = {}
+        self.lock = threading.Lock()
+
+    def GetAccountInfo(self, request):
+        response = GetAccountInfoResponse()
+        response.account_data.sequence.value = self.sequence
+        return response
+
+    def GetFee(self, request):
+        response = GetFeeResponse()
+        response.fee.minimum_fee.drops = 12
+        return response
+
+    def SubmitTransaction(self, request):
+        transaction = deserialize_transaction(
+            Scanner(request.signed_transaction)
+        )
+        amount = transaction.get('Amount', transaction['TransactionType'])
+        response = SubmitTransactionResponse()
+        with self.lock:
+            sequence = transaction['Sequence']
+            self.submitted.setdefault(sequence, set()).add(amount)
+            script = self.script.get(amount)
+            if script:
+                result = script.pop(0)
+                if callable(result):
+                    result = result()
+                if isinstance(result, Exception):
+                    raise result
+            elif transaction['Sequence'] < self.sequence:
+                result = 'tefPAST_SEQ'
+            elif transaction['Sequence'] > self.sequence:
+                result = 'terPRE_SEQ'
+                self.held[transaction['Sequence']] = amount
+            else:
+                result = 'tesSUCCESS'
+                self.applied.append(amount)
+                self.sequence += 1
+                while self.sequence in self.held:
+                    self.applied.append(self.held.pop(self.sequence))
+                    self.sequence += 1
+        response.engine_result.result = result
+        return response
+
+
+def payments(count):
+    return [
+        {
+            'Account': WALLET.address,
+            'Amount': str(amount),
+            'Destination': DESTINATION,
+            'Flags': 0x80000000,
+            'TransactionType': 'Payment',
+        } for amount in range(1, count + 1)
+    ]
+
+
+@pytest.mark.parametrize(
+    'result,disposition', [
+        ('tesSUCCESS', Disposition.ACCEPTED),
+        ('terQUEUED', Disposition.HELD),
+        ('terPRE_SEQ', Disposition.HELD),
+        ('telCAN_NOT_QUEUE', Disposition.RETRY),
+        ('telINSUF_FEE_P', Disposition.RESIGN),
+        ('tefPAST_SEQ', Disposition.RESIGN),
+        ('tecUNFUNDED_PAYMENT', Disposition.FAILED),
+        ('temBAD_AMOUNT', Disposition.FAILED),
+    ]
+)
+def test_classify(result, disposition):
+    assert classify(result) == disposition
+
+
+# Dispositions of transactions that apply once their predecessors do.
+APPLIED = (Disposition.ACCEPTED, Disposition.HELD)
+
+
+def submit(ledger, transactions, concurrency=1, retry_delay=0):
+    client = Client(ledger, sequences=SequenceAllocator())
+    with SubmissionPipeline(
+        client, [WALLET], concurrency=concurrency, retry_delay=retry_delay
+    ) as pipeline:
+        return list(pipeline.submit(transactions))
+
+
+def test_submit():
+    ledger = Ledger()
+    transactions = payments(20)
+    submissions = submit(ledger, transactions)
+    assert [s.transaction for s in submissions] == transactions
+    assert all(s.disposition == Disposition.ACCEPTED for s in submissions)
+    assert ledger.applied == [tx['Amount'] for tx in transactions]
+    assert ledger.sequence == 27
+
+
+def test_submit_concurrently():
+    ledger = Ledger()
+    submissions = submit(ledger, payments(50), concurrency=8)
+    assert all(s.disposition in APPLIED for s in submissions)
+    assert sorted(ledger.applied, key=int) == [str(i) for i in range(1, 51)]
+
+
+def test_retry():
+    ledger = Ledger()
+    ledger.script['2'] = [Unavailable(), 'telCAN_NOT_QUEUE']
+    submissions = submit(ledger, payments(3))
+    assert [s.attempts for s in submissions] == [1, 3, 1]
+    assert [s.disposition for s in submissions] == [Disposition.ACCEPTED] * 3
+
+
+def test_retry_keeps_sequence():
+    ledger = Ledger()
+    ledger.script['2'] = ['telCAN_NOT_QUEUE']
+    # Later transactions are prepared while the second waits to retry.
+    submissions = submit(ledger, payments(10), retry_delay=0.05)
+    assert [s.disposition for s in submissions] == [Disposition.ACCEPTED] * 10
+    # No other transaction took the sequence of the one retried.
+    assert all(len(amounts) == 1 for amounts in ledger.submitted.values())
+    assert sorted(ledger.applied, key=int) == [str(i) for i in range(1, 11)]
+
+
+def test_resign():
+    ledger = Ledger()
+    transactions = payments(2)
+
+    def take_sequence():
+        # Another client takes the first sequence.
+        ledger.sequence += 1
+        return 'tefPAST_SEQ'
+
+    ledger.script['1'] = [take_sequence]
+    first, second = submit(ledger, transactions)
+    assert first.attempts == 2
+    assert first.disposition in APPLIED
+    assert second.disposition in APPLIED
+    assert sorted(ledger.applied) == ['1', '2']
+    assert ledger.sequence == 10
+
+
+def test_fail():
+    ledger = Ledger()
+    ledger.script['1'] = ['temBAD_AMOUNT']
+    first, second = submit(ledger, payments(2))
+    assert first.result == 'temBAD_AMOUNT'
+    assert first.disposition == Disposition.FAILED
+    assert second.disposition == Disposition.ACCEPTED
+    # A no-op fills the sequence of the failed transaction.
+    assert ledger.applied == ['AccountSet', '2']
+    assert ledger.sequence == 9
+
+
+def test_rpc_error():
+    ledger = Ledger()
+    ledger.script['2'] = [LedgerError(grpc.StatusCode.INTERNAL, 'internal')]
+    submissions = submit(ledger, payments(5), concurrency=4)
+    assert submissions[1].disposition == Disposition.FAILED
+    assert all(
+        s.disposition in APPLIED for i, s in enumerate(submissions) if i != 1
+    )
+    # A no-op fills the sequence of the failed transaction, so the
+    # transactions held behind it apply.
+    assert sorted(ledger.applied) == ['1', '3', '4', '5', 'AccountSet']
+    assert ledger.sequence == 12
@@ -0,0 +1,140 @@
+from concurrent.futures import ThreadPoolExecutor
+import typing as t
+
+import pytest
+
+from xpring.algorithms import secp256k1
+from xpring.serialization import serialize_transaction
+from xpring.verification import SignatureCache, verify_signed_transactions
+from xpring.wallet import Wallet
+
+WALLETS = [
+    Wallet.from_seed(seed) for seed in (
+        'sEdSKaCy2JT7JaM7v95H9SxkhP9wS2r',
+        'sp5fghtJtpUorTwvof1NpDXAzNwf5',
+    )
+]
+
+
+def make_blob(wallet: Wallet, sequence: int) -> bytes:
+    transaction = {
+        'Account': wallet.address,
+        'Amount': '1000',
+        'Destination': 'rLUEXYuLiQptky37CqLcm9USQpPiz5rkpD',
+        'Fee': '10',
+        'Flags': 0x80000000,
+        'Sequence': sequence,
+        'TransactionType': 'Payment',
+    }
+    blob, _ = wallet.sign_transaction_blob(transaction)
+    return blob
+
+
+def test_verify_signed_transactions(executor: t.Optional[ThreadPoolExecutor]):
+    blobs = [make_blob(WALLETS[i % 2], i) for i in range(1, 20)]
+    # Tamper with the last byte (of the Destination) of two transactions,
+    # and with the structure of a third.
+    blobs[3] = blobs[3][:-1] + bytes([blobs[3][-1] ^ 1])
+    blobs[4] = blobs[4][:-1] + bytes([blobs[4][-1] ^ 1])
+    blobs[5] = blobs[5][:-1]
+    expected = [True] * len(blobs)
+    expected[3] = expected[4] = expected[5] = False
+    assert verify_signed_transactions(
+        blobs, executor=executor, chunk_size=4
+    ) == expected
+
+
+def test_malformed_signature(monkeypatch):
+    good = make_blob(WALLETS[1], 1)
+    bad = WALLETS[1].sign_transaction({
+        'Account': WALLETS[1].address,
+        'Fee': '10',
+        'Sequence': 2,
+        'TransactionType': 'AccountSet',
+    })
+    # A truncated DER signature.
+    bad['TxnSignature'] = '3006020301010102'
+    bad = serialize_transaction(bad)
+    assert verify_signed_transactions([good, bad]) == [True, False]
+
+    # An error from the algorithm fails only the check that raised it.
+    verify_batch = secp256k1.verify_batch
+
+    def fragile_verify_batch(messages, signatures, public_keys, **kwargs):
+        if any(len(signature) < 64 for signature in signatures):
+            raise IndexError('truncated')
+        return verify_batch(messages, signatures, public_keys, **kwargs)
+
+    monkeypatch.setattr(secp256k1, 'verify_batch', fragile_verify_batch)
+    assert verify_signed_transactions([good, bad, good]) == [
+        True, False, True
+    ]
+
+
+def test_unsigned_transaction():
+    transaction = {
+        'Account': WALLETS[0].address,
+        'Fee': '10',
+        'Sequence': 1,
+        'TransactionType': 'AccountSet',
+    }
+    blob = serialize_transaction(transaction)
+    assert verify_signed_transactions([blob]) == [False]
+
+
+def test_signature_cache_capacity():
+    cache = SignatureCache(capacity=2)
+    cache.put(b'a', True)
+    cache.put(b'b', False)
+    assert cache.get(b'a') is True
+    # b is now the least recently used.
+    cache.put(b'c', True)
+    assert cache.get(b'b') is None
+    assert cache.get(b'a') is True
+    assert cache.get(b'c') is True
+    assert (cache.hits, cache.misses) == (3, 1)
+    assert cache.hit_rate == 0.75
+
+
+def test_signature_cache_ttl():
+    now = [0.0]
+    cache = SignatureCache(ttl=10, clock=lambda: now[0])
+    cache.put(b'a', True)
+    now[0] = 10
+    assert cache.get(b'a') is True
+    now[0] = 10.5
+    assert cache.get(b'a') is None
+    assert len(cache) == 0
+
+
+def test_verify_signed_transactions_cache():
+    cache = SignatureCache()
+    blobs = [make_blob(WALLETS[i % 2], i) for i in range(1, 5)]
+    blobs[1] = blobs[1][:-1] + bytes([blobs[1][-1] ^ 1])
+    expected = [True, False, True, True]
+    assert verify_signed_transactions(blobs, cache=cache) == expected
+    assert (cache.hits, cache.misses) == (0, 4)
+    assert verify_signed_transactions(blobs, cache=cache) == expected
+    assert (cache.hits, cache.misses) == (4, 4)
+
+
+def test_wallet_verify_cache():
+    cache = SignatureCache()
+    wallet = Wallet(WALLETS[1].key_pair, signature_cache=cache)
+    message = b'message'
+    signature = wallet.sign(message)
+    assert wallet.verify(message, signature)
+    assert wallet.verify(message, signature)
+    assert not wallet.verify(b'massage', signature)
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_wallet_verify_cache_forgery():
+    cache = SignatureCache()
+    wallet = Wallet(WALLETS[1].key_pair, signature_cache=cache)
+    message = b'message'
+    signature = wallet.sign(message)
+    assert wallet.verify(message, signature)
+    # The same bytes, split differently between signature and message.
+    forged = signature[:-1], signature[-1:] + message
+    assert not wallet.verify(forged[1], forged[0])
@@ -1,2 +1,2 @@
-from xpring.client import Client
+from xpring.client import AsyncClient, Client
 from xpring.wallet import Wallet
@@ -1,10 +1,20 @@
+from concurrent.futures import Executor
 import typing as t
 
 import nacl.encoding
+import nacl.exceptions
 import nacl.signing
 
 from xpring import hashes
-from xpring.algorithms.signing import Seed, PrivateKey, PublicKey, Signature
+from xpring.algorithms.signing import (
+    Seed,
+    PrivateKey,
+    PublicKey,
+    Signature,
+    Signer,
+    Verifier,
+    verify_batch_with,
+)
 
 SEED_PREFIX = b'\x01\xE1\x4B'
 """
@@ -24,15 +34,67 @@ def derive_key_pair(seed: Seed) -> t.Tuple[PrivateKey, PublicKey]:
     )
 
 
-def sign(message: bytes, private_key: PrivateKey) -> Signature:
+def prepare_signer(private_key: PrivateKey) -> Signer:
     assert len(private_key) == 32
     key = nacl.signing.SigningKey(private_key)
-    signature = key.sign(message, nacl.encoding.RawEncoder).signature
-    return t.cast(Signature, signature)
 
+    def sign(message: bytes) -> Signature:
+        signature = key.sign(message, nacl.encoding.RawEncoder).signature
+        return t.cast(Signature, signature)
 
-def verify(message: bytes, signature: Signature, public_key: PublicKey) -> bool:
+    return sign
+
+
+def prepare_verifier(public_key: PublicKey) -> Verifier:
     assert len(public_key) == 33
     assert public_key.startswith(KEY_PREFIX)
     key = nacl.signing.VerifyKey(public_key[len(KEY_PREFIX):])
-    return key.verify(message, signature, nacl.encoding.RawEncoder) == message
+
+    def verify(message: bytes, signature: Signature) -> bool:
+        try:
+            return key.verify(
+                message, signature, nacl.encoding.RawEncoder
+            ) == message
+        except (nacl.exceptions.BadSignatureError, ValueError):
+            return False
+
+    return verify
+
+
+def sign(message: bytes, private_key: PrivateKey) -> Signature:
+    return prepare_signer(private_key)(message)
+
+
+def verify(message: bytes, signature: Signature, public_key: PublicKey) -> bool:
+    return prepare_verifier(public_key)(message, signature)
+
+
+def verify_chunk(
+    messages: t.Sequence[bytes],
+    signatures: t.Sequence[Signature],
+    public_keys: t.Sequence[PublicKey],
+) -> t.List[bool]:
+    verifiers: t.Dict[bytes, t.Optional[Verifier]] = {}
+    results = []
+    for message, signature, public_key in zip(
+        messages, signatures, public_keys
+    ):
+        if public_key not in verifiers:
+            if len(public_key) != 33 or not public_key.startswith(KEY_PREFIX):
+                verifiers[public_key] = None
+            else:
+                verifiers[public_key] = prepare_verifier(public_key)
+        verifier = verifiers[public_key]
+        results.append(verifier is not None and verifier(message, signature))
+    return results
+
+
+def verify_batch(
+    messages: t.Iterable[bytes],
+    signatures: t.Iterable[Signature],
+    public_keys: t.Iterable[PublicKey],
+    executor: t.Optional[Executor] = None,
+) -> t.List[bool]:
+    return verify_batch_with(
+        verify_chunk, messages, signatures, public_keys, executor
+    )
@@ -1,21 +1,25 @@
+from concurrent.futures import Executor
+import functools
 import typing as t
 
-from fastecdsa import curve, ecdsa, keys
-from fastecdsa.encoding.der import DEREncoder
-# We use ecdsa only for verifying, until we can decode DER with fastecdsa:
-# https://github.com/AntonKueltz/fastecdsa/issues/47
-from ecdsa import curves, VerifyingKey
-from ecdsa.util import sigdecode_der
-
 from xpring import hashes
-from xpring.algorithms.signing import Seed, PrivateKey, PublicKey, Signature
+from xpring.algorithms import secp256k1_backends as backends
+from xpring.algorithms.secp256k1_backends import AffinePoint
+from xpring.algorithms.signing import (
+    Seed,
+    PrivateKey,
+    PublicKey,
+    Signature,
+    Signer,
+    Verifier,
+    verify_batch_with,
+)
 from xpring.bits import from_bytes, to_bytes
 
 SEED_PREFIX = b'\x21'
-FAMILY = bytes(4)
 
 GROUP_ORDER = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141
-assert curve.secp256k1.q == GROUP_ORDER
+FIELD_ORDER = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEFFFFFC2F
 
 
 def derive_private_key(seed: bytes) -> int:
@@ -28,60 +32,209 @@ def derive_private_key(seed: bytes) -> int:
         sequence += 1
 
 
-def compress_ecdsa_point(point) -> PublicKey:
-    prefix = b'\x03' if point.y % 2 else b'\x02'
-    return t.cast(PublicKey, prefix + to_bytes(point.x, 32))
+def compress_point(point: AffinePoint) -> PublicKey:
+    x, y = point
+    prefix = b'\x03' if y % 2 else b'\x02'
+    return t.cast(PublicKey, prefix + to_bytes(x, 32))
+
+
+def decompress_public_key(public_key: PublicKey) -> AffinePoint:
+    """
+    Return the curve point for a compressed public key.
+
+    secp256k1 is y^2 = x^3 + 7 over a field whose order is 3 mod 4, so the
+    square root of a residue `a` is ``a^((p+1)/4)``.
+    """
+    if len(public_key) != 33 or public_key[0] not in (0x02, 0x03):
+        raise ValueError('public key must be 33 bytes in compressed form')
+    x = from_bytes(public_key[1:])
+    if x >= FIELD_ORDER:
+        raise ValueError('public key is not on the curve')
+    y_squared = (pow(x, 3, FIELD_ORDER) + 7) % FIELD_ORDER
+    y = pow(y_squared, (FIELD_ORDER + 1) // 4, FIELD_ORDER)
+    if (y * y) % FIELD_ORDER != y_squared:
+        raise ValueError('public key is not on the curve')
+    # The prefix carries the parity of y.
+    if (y & 1) != (public_key[0] & 1):
+        y = FIELD_ORDER - y
+    return (x, y)
+
+
+def decode_der_integer(der: bytes, offset: int) -> t.Tuple[int, int]:
+    """Return a positive integer and the offset that follows it."""
+    if offset + 2 > len(der) or der[offset] != 0x02:
+        raise ValueError('expected an integer')
+    length = der[offset + 1]
+    start = offset + 2
+    end = start + length
+    if not 0 < length <= 33 or end > len(der):
+        raise ValueError('invalid integer length')
+    if der[start] & 0x80:
+        raise ValueError('integer must be positive')
+    # A leading zero is allowed only to clear the sign bit of the next byte.
+    if length > 1 and der[start] == 0 and not der[start + 1] & 0x80:
+        raise ValueError('integer must be minimally encoded')
+    return from_bytes(der[start:end]), end
+
+
+def encode_der_integer(i: int) -> bytes:
+    # One extra byte leaves room for a clear sign bit.
+    bites = to_bytes(i, i.bit_length() // 8 + 1)
+    return b'\x02' + bytes([len(bites)]) + bites
+
+
+def encode_der_signature(r: int, s: int) -> Signature:
+    body = encode_der_integer(r) + encode_der_integer(s)
+    return t.cast(Signature, b'\x30' + bytes([len(body)]) + body)
+
+
+def decode_der_signature(signature: Signature) -> t.Tuple[int, int]:
+    """
+    Decode a signature in strict DER, as rippled requires.
+
+    https://xrpl.org/cryptographic-keys.html#signing-algorithms
+    """
+    if len(signature) < 8 or len(signature) > 72:
+        raise ValueError('invalid signature length')
+    if signature[0] != 0x30 or signature[1] != len(signature) - 2:
+        raise ValueError('expected a sequence')
+    r, offset = decode_der_integer(signature, 2)
+    s, offset = decode_der_integer(signature, offset)
+    if offset != len(signature):
+        raise ValueError('trailing bytes after signature')
+    if not 0 < r < GROUP_ORDER or not 0 < s < GROUP_ORDER:
+        raise ValueError('signature out of range')
+    return r, s
 
 
 def derive_key_pair(seed: Seed) -> t.Tuple[PrivateKey, PublicKey]:
-    root_private_key = derive_private_key(seed)
-    root_public_point = keys.get_public_key(root_private_key, curve.secp256k1)
-    root_public_key = compress_ecdsa_point(root_public_point)
+    return derive_key_pairs(seed, 1)[0]
+
 
-    inter_private_key = derive_private_key(root_public_key + FAMILY)
-    inter_public_point = keys.get_public_key(inter_private_key, curve.secp256k1)
-    inter_public_key = compress_ecdsa_point(inter_public_point)
+def derive_key_pairs(seed: Seed, count: int,
+                     start: int = 0) -> t.List[t.Tuple[PrivateKey, PublicKey]]:
+    """
+    Derive the key pairs for a range of account indices in one family.
 
-    master_private_key = to_bytes(
-        (root_private_key + inter_private_key) % GROUP_ORDER, 32
+    The root key pair is derived once for the whole family. Account 0 is
+    the one returned by :func:`derive_key_pair`.
+    """
+    backend = backends.get_backend('derive')
+    root_private_key = derive_private_key(seed)
+    root_public_point = backend.derive_public_point(root_private_key)
+    root_public_key = compress_point(root_public_point)
+
+    key_pairs = []
+    for index in range(start, start + count):
+        inter_private_key = derive_private_key(
+            root_public_key + to_bytes(index, 4)
+        )
+        master_private_key = (
+            root_private_key + inter_private_key
+        ) % GROUP_ORDER
+        # The master public point is the sum of the root and intermediate
+        # public points, but it is just as cheap to multiply again, and the
+        # backends need not add points.
+        master_public_point = backend.derive_public_point(master_private_key)
+        master_public_key = compress_point(master_public_point)
+        key_pairs.append((
+            t.cast(PrivateKey, to_bytes(master_private_key, 32)),
+            t.cast(PublicKey, master_public_key),
+        ))
+    return key_pairs
+
+
+def prepare_signer(private_key: PrivateKey) -> Signer:
+    signer = backends.get_backend('sign').prepare_signer(
+        from_bytes(private_key)
     )
-    master_public_point = root_public_point + inter_public_point
-    master_public_key = compress_ecdsa_point(master_public_point)
 
-    return (
-        t.cast(PrivateKey, master_private_key),
-        t.cast(PublicKey, master_public_key),
+    def sign(message: bytes) -> Signature:
+        r, s = signer(hashes.sha512half(message))
+        # Both (r, s) and (r, -s mod G = G - s) are valid, canonical
+        # signatures. (r, s) is fully canonical only when s <= G - s.
+        s_inverse = GROUP_ORDER - s
+        if s > s_inverse:
+            s = s_inverse
+        return encode_der_signature(r, s)
+
+    return sign
+
+
+def _prepare_verifier(
+    public_key: PublicKey, backend: backends.Backend
+) -> Verifier:
+    verifier = backend.prepare_verifier(decompress_public_key(public_key))
+
+    def verify(message: bytes, signature: Signature) -> bool:
+        try:
+            r, s = decode_der_signature(signature)
+        except ValueError:
+            return False
+        return verifier(hashes.sha512half(message), r, s)
+
+    return verify
+
+
+# The set of active signing keys is small compared to the volume of
+# signatures, so we keep the verifiers (with their decompressed points) for
+# the most recently used keys.
+VERIFIER_CACHE_SIZE = 4096
+_cached_prepare_verifier = functools.lru_cache(VERIFIER_CACHE_SIZE)(
+    _prepare_verifier
+)
+
+
+def configure_verifier_cache(maxsize: t.Optional[int]) -> None:
+    """Resize (and empty) the verifier cache. Zero disables it."""
+    global _cached_prepare_verifier  # pylint: disable=global-statement
+    _cached_prepare_verifier = functools.lru_cache(maxsize)(_prepare_verifier)
+
+
+def verifier_cache_info():
+    return _cached_prepare_verifier.cache_info()
+
+
+def prepare_verifier(public_key: PublicKey) -> Verifier:
+    return _cached_prepare_verifier(
+        bytes(public_key), backends.get_backend('verify')
     )
 
 
 def sign(message: bytes, private_key: PrivateKey) -> Signature:
-    digest = hashes.sha512half(message)
-    signing_key = int.from_bytes(private_key, byteorder='big')
-    r, s = ecdsa.sign(
-        digest,
-        signing_key,
-        curve=curve.secp256k1,
-        prehashed=True,
-    )
-    # Both (r, s) and (r, -s mod G = G - s) are valid, canonical signatures.
-    # (r, s) is fully canonical only when s <= G - s.
-    s_inverse = GROUP_ORDER - s
-    if s > s_inverse:
-        s = s_inverse
-    signature = DEREncoder.encode_signature(r, s)
-    return t.cast(Signature, signature)
+    return prepare_signer(private_key)(message)
 
 
 def verify(message: bytes, signature: Signature, public_key: PublicKey) -> bool:
-    digest = hashes.sha512half(message)
-    # We need `ecdsa` to decompress the public key.
-    # Would be nice if fastecdsa could do this.
-    # TODO: Implement it ourselves.
-    # https://github.com/AntonKueltz/fastecdsa/issues/47
-    verifying_key = VerifyingKey.from_string(public_key, curves.SECP256k1)
-    return verifying_key.verify(
-        signature,
-        digest,
-        hashfunc=hashes.IdentityHash,
-        sigdecode=sigdecode_der,
+    return prepare_verifier(public_key)(message, signature)
+
+
+def verify_chunk(
+    messages: t.Sequence[bytes],
+    signatures: t.Sequence[Signature],
+    public_keys: t.Sequence[PublicKey],
+) -> t.List[bool]:
+    verifiers: t.Dict[bytes, t.Optional[Verifier]] = {}
+    results = []
+    for message, signature, public_key in zip(
+        messages, signatures, public_keys
+    ):
+        if public_key not in verifiers:
+            try:
+                verifiers[public_key] = prepare_verifier(public_key)
+            except ValueError:
+                verifiers[public_key] = None
+        verifier = verifiers[public_key]
+        results.append(verifier is not None and verifier(message, signature))
+    return results
+
+
+def verify_batch(
+    messages: t.Iterable[bytes],
+    signatures: t.Iterable[Signature],
+    public_keys: t.Iterable[PublicKey],
+    executor: t.Optional[Executor] = None,
+) -> t.List[bool]:
+    return verify_batch_with(
+        verify_chunk, messages, signatures, public_keys, executor
     )
@@ -0,0 +1,301 @@
+"""
+Interchangeable implementations of the secp256k1 primitives.
+
+Each backend wraps one optional package. The registry picks, for each
+operation, the first installed backend in order of preference, unless it
+is configured explicitly with :func:`configure` or by benchmark with
+:func:`select_fastest`. Only backends with deterministic (RFC 6979) nonces
+are picked to sign, so that signatures and transaction IDs are
+reproducible, unless one is configured explicitly.
+"""
+
+import time
+import typing as t
+
+import typing_extensions as tex
+
+# (x, y) coordinates of a point on the curve.
+AffinePoint = t.Tuple[int, int]
+PreparedSigner = t.Callable[[bytes], t.Tuple[int, int]]
+PreparedVerifier = t.Callable[[bytes, int, int], bool]
+
+OPERATIONS = ('derive', 'sign', 'verify')
+
+
+class Backend(tex.Protocol):
+    name: str
+    # Whether signatures use deterministic nonces.
+    deterministic: bool
+
+    def derive_public_point(self, private_key: int) -> AffinePoint:
+        ...
+
+    def prepare_signer(self, private_key: int) -> PreparedSigner:
+        """Return a function that signs a 32-byte digest."""
+        ...
+
+    def prepare_verifier(self, point: AffinePoint) -> PreparedVerifier:
+        """Return a function that verifies `(r, s)` for a 32-byte digest."""
+        ...
+
+
+class FastecdsaBackend:
+    name = 'fastecdsa'
+    deterministic = True
+
+    def __init__(self) -> None:
+        from fastecdsa import curve, ecdsa, keys
+        from fastecdsa.point import Point
+        self.curve = curve.secp256k1
+        self.ecdsa = ecdsa
+        self.keys = keys
+        self.Point = Point
+
+    def derive_public_point(self, private_key: int) -> AffinePoint:
+        point = self.keys.get_public_key(private_key, self.curve)
+        return (point.x, point.y)
+
+    def prepare_signer(self, private_key: int) -> PreparedSigner:
+
+        def sign(digest: bytes) -> t.Tuple[int, int]:
+            return self.ecdsa.sign(
+                digest, private_key, curve=self.curve, prehashed=True
+            )
+
+        return sign
+
+    def prepare_verifier(self, point: AffinePoint) -> PreparedVerifier:
+        public_point = self.Point(*point, curve=self.curve)
+
+        def verify(digest: bytes, r: int, s: int) -> bool:
+            return self.ecdsa.verify(
+                (r, s),
+                digest,
+                public_point,
+                curve=self.curve,
+                prehashed=True,
+            )
+
+        return verify
+
+
+class CryptographyBackend:
+    name = 'cryptography'
+    # OpenSSL signs with random nonces.
+    deterministic = False
+
+    def __init__(self) -> None:
+        from cryptography.exceptions import InvalidSignature
+        from cryptography.hazmat.backends import default_backend
+        from cryptography.hazmat.primitives import hashes
+        from cryptography.hazmat.primitives.asymmetric import ec, utils
+        self.InvalidSignature = InvalidSignature
+        self.backend = default_backend()
+        self.ec = ec
+        self.utils = utils
+        # Prehashed only checks that the digest has the size of its
+        # algorithm. It never hashes.
+        self.algorithm = ec.ECDSA(utils.Prehashed(hashes.SHA256()))
+
+    def _private_key(self, private_key: int):
+        return self.ec.derive_private_key(
+            private_key, self.ec.SECP256K1(), self.backend
+        )
+
+    def derive_public_point(self, private_key: int) -> AffinePoint:
+        numbers = self._private_key(private_key).public_key().public_numbers()
+        return (numbers.x, numbers.y)
+
+    def prepare_signer(self, private_key: int) -> PreparedSigner:
+        key = self._private_key(private_key)
+
+        def sign(digest: bytes) -> t.Tuple[int, int]:
+            return self.utils.decode_dss_signature(
+                key.sign(digest, self.algorithm)
+            )
+
+        return sign
+
+    def prepare_verifier(self, point: AffinePoint) -> PreparedVerifier:
+        key = self.ec.EllipticCurvePublicNumbers(
+            *point, self.ec.SECP256K1()
+        ).public_key(self.backend)
+
+        def verify(digest: bytes, r: int, s: int) -> bool:
+            signature = self.utils.encode_dss_signature(r, s)
+            try:
+                key.verify(signature, digest, self.algorithm)
+            except self.InvalidSignature:
+                return False
+            return True
+
+        return verify
+
+
+class EcdsaBackend:
+    name = 'ecdsa'
+    deterministic = True
+
+    def __init__(self) -> None:
+        import hashlib
+        from ecdsa import BadSignatureError, curves, ellipticcurve
+        from ecdsa import SigningKey, VerifyingKey
+        self.BadSignatureError = BadSignatureError
+        self.curve = curves.SECP256k1
+        self.ellipticcurve = ellipticcurve
+        self.SigningKey = SigningKey
+        self.VerifyingKey = VerifyingKey
+        # The hash used for deterministic nonces (RFC 6979).
+        self.hashfunc = hashlib.sha256
+
+    def derive_public_point(self, private_key: int) -> AffinePoint:
+        key = self.SigningKey.from_secret_exponent(private_key, self.curve)
+        point = key.get_verifying_key().pubkey.point
+        return (point.x(), point.y())
+
+    def prepare_signer(self, private_key: int) -> PreparedSigner:
+        key = self.SigningKey.from_secret_exponent(
+            private_key, self.curve, hashfunc=self.hashfunc
+        )
+
+        def sign(digest: bytes) -> t.Tuple[int, int]:
+            return key.sign_digest_deterministic(
+                digest,
+                hashfunc=self.hashfunc,
+                sigencode=lambda r, s, order: (r, s),
+            )
+
+        return sign
+
+    def prepare_verifier(self, point: AffinePoint) -> PreparedVerifier:
+        key = self.VerifyingKey.from_public_point(
+            self.ellipticcurve.Point(self.curve.curve, *point),
+            curve=self.curve,
+        )
+
+        def verify(digest: bytes, r: int, s: int) -> bool:
+            try:
+                return key.verify_digest((r, s),
+                                         digest,
+                                         sigdecode=lambda rs, order: rs)
+            except self.BadSignatureError:
+                return False
+
+        return verify
+
+
+# In order of preference.
+BACKENDS: t.Dict[str, t.Callable[[], Backend]] = {
+    'fastecdsa': FastecdsaBackend,
+    'cryptography': CryptographyBackend,
+    'ecdsa': EcdsaBackend,
+}
+
+_INSTANCES: t.Dict[str, t.Optional[Backend]] = {}
+_SELECTED: t.Dict[str, Backend] = {}
+
+
+def load_backend(name: str) -> t.Optional[Backend]:
+    """Return the named backend, or `None` if its package is missing."""
+    if name not in BACKENDS:
+        raise ValueError(f'unknown secp256k1 backend: {name}')
+    if name not in _INSTANCES:
+        try:
+            _INSTANCES[name] = BACKENDS[name]()
+        except ImportError:
+            _INSTANCES[name] = None
+    return _INSTANCES[name]
+
+
+def available_backends(operation: t.Optional[str] = None) -> t.List[Backend]:
+    """
+    Return the installed backends, in order of preference, that may be
+    picked for `operation`, if given.
+    """
+    backends = (load_backend(name) for name in BACKENDS)
+    return [
+        backend for backend in backends if backend is not None and
+        (operation != 'sign' or backend.deterministic)
+    ]
+
+
+def configure(**names: str) -> None:
+    """
+    Choose a backend by name for each given operation, e.g.
+    ``configure(sign='fastecdsa', verify='cryptography')``.
+    """
+    for operation, name in names.items():
+        if operation not in OPERATIONS:
+            raise ValueError(f'unknown secp256k1 operation: {operation}')
+        backend = load_backend(name)
+        if backend is None:
+            raise ImportError(f'secp256k1 backend is not installed: {name}')
+        _SELECTED[operation] = backend
+
+
+def get_backend(operation: str) -> Backend:
+    backend = _SELECTED.get(operation)
+    if backend is None:
+        backends = available_backends(operation)
+        if not backends:
+            names = ', '.join(
+                name for name, factory in BACKENDS.items()
+                if operation != 'sign' or
+                getattr(factory, 'deterministic', True)
+            )
+            raise ImportError(f'no secp256k1 backend is installed: {names}')
+        backend = _SELECTED[operation] = backends[0]
+    return backend
+
+
+def benchmark(iterations: int = 100) -> t.Dict[str, t.Dict[str, float]]:
+    """Return the mean seconds per call, by operation, then by backend."""
+    private_key = 0x1D2E3F4A5B6C7D8E9FA0B1C2D3E4F5061728394A5B6C7D8E9FA0B1C2D3E4F5
+    digest = bytes(range(32))
+    timings: t.Dict[str, t.Dict[str, float]] = {
+        operation: {}
+        for operation in OPERATIONS
+    }
+    for backend in available_backends():
+        point = backend.derive_public_point(private_key)
+        signer = backend.prepare_signer(private_key)
+        r, s = signer(digest)
+        verifier = backend.prepare_verifier(point)
+        # Default arguments bind the values of this iteration.
+        calls: t.Dict[str, t.Callable[[], t.Any]] = {
+            'derive':
+                lambda backend=backend: backend.derive_public_point(
+                    private_key
+                ),
+            'sign':
+                lambda signer=signer: signer(digest),
+            'verify':
+                lambda verifier=verifier, r=r, s=s: verifier(digest, r, s),
+        }
+        for operation, call in calls.items():
+            start = time.perf_counter()
+            for _ in range(iterations):
+                call()
+            elapsed = time.perf_counter() - start
+            timings[operation][backend.name] = elapsed / iterations
+    return timings
+
+
+def select_fastest(iterations: int = 100) -> t.Dict[str, str]:
+    """
+    Configure the fastest installed backend for each operation, among those
+    that may be picked for it.
+
+    Return the names chosen.
+    """
+    timings = benchmark(iterations)
+    names = {}
+    for operation in OPERATIONS:
+        eligible = {
+            backend.name: timings[operation][backend.name]
+            for backend in available_backends(operation)
+        }
+        if eligible:
+            names[operation] = min(eligible, key=eligible.__getitem__)
+    configure(**names)
+    return names
@@ -1,8 +1,47 @@
+from concurrent.futures import Executor
 import typing as t
 import typing_extensions as tex
 
 from xpring.types import Seed, PrivateKey, PublicKey, Signature
 
+Signer = t.Callable[[bytes], Signature]
+Verifier = t.Callable[[bytes, Signature], bool]
+VerifyChunk = t.Callable[
+    [t.Sequence[bytes], t.Sequence[Signature], t.Sequence[PublicKey]],
+    t.List[bool]]
+
+
+def verify_batch_with(
+    verify_chunk: VerifyChunk,
+    messages: t.Iterable[bytes],
+    signatures: t.Iterable[Signature],
+    public_keys: t.Iterable[PublicKey],
+    executor: t.Optional[Executor] = None,
+    chunk_size: int = 256,
+) -> t.List[bool]:
+    """
+    Verify a batch in chunks, optionally spread across an executor.
+
+    `verify_chunk` must be a module-level function if `executor` is a
+    process pool.
+    """
+    messages = list(messages)
+    signatures = list(signatures)
+    public_keys = list(public_keys)
+    if not len(messages) == len(signatures) == len(public_keys):
+        raise ValueError('batch arguments must have the same length')
+    if executor is None:
+        return verify_chunk(messages, signatures, public_keys)
+    futures = [
+        executor.submit(
+            verify_chunk,
+            messages[i:i + chunk_size],
+            signatures[i:i + chunk_size],
+            public_keys[i:i + chunk_size],
+        ) for i in range(0, len(messages), chunk_size)
+    ]
+    return [ok for future in futures for ok in future.result()]
+
 
 class SigningAlgorithm(tex.Protocol):
     """
@@ -24,3 +63,21 @@ class SigningAlgorithm(tex.Protocol):
         self, message: bytes, signature: Signature, public_key: PublicKey
     ) -> bool:
         ...
+
+    def prepare_signer(self, private_key: PrivateKey) -> Signer:
+        """Expand a private key once, for signing many messages."""
+        ...
+
+    def prepare_verifier(self, public_key: PublicKey) -> Verifier:
+        """Expand a public key once, for verifying many messages."""
+        ...
+
+    def verify_batch(
+        self,
+        messages: t.Iterable[bytes],
+        signatures: t.Iterable[Signature],
+        public_keys: t.Iterable[PublicKey],
+        executor: t.Optional[Executor] = None,
+    ) -> t.List[bool]:
+        """Return, for each message, whether its signature is valid."""
+        ...
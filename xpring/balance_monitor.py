@@ -0,0 +1,292 @@
+"""
+Watch the balances of many accounts.
+
+A :class:`BalanceMonitor` keeps the last known balance of each watched
+account in a compact :class:`BalanceTable`. :meth:`BalanceMonitor.refresh`
+reads only the accounts touched by transactions since the last refresh,
+and :meth:`BalanceMonitor.sweep` reads them all. Reads fan out over a
+thread pool, at most `concurrency` at once, so a sweep takes about
+``len(accounts) / concurrency`` round trips.
+"""
+
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+import typing as t
+
+import grpc
+from xpring.client import Client, account_key
+from xpring.executors import imap_ordered
+from xpring.types import Address
+
+
+class BalanceChange(t.NamedTuple):
+    address: Address
+    # In drops, or `None` while the account does not exist.
+    old: t.Optional[int]
+    new: t.Optional[int]
+    # The ledger of the new balance.
+    ledger_index: int
+
+
+# A subscriber to balance changes.
+Listener = t.Callable[[BalanceChange], None]
+
+# The balance in the table of an account that does not exist.
+MISSING = -1
+
+
+class BalanceTable:
+    """
+    The last known balance of each account, in drops, with the ledger it
+    was read from.
+
+    Balances and ledger indexes are kept in arrays of machine integers, at a
+    slot for each account. Slots are reused after :meth:`remove`.
+    """
+
+    def __init__(self) -> None:
+        self._slots: t.Dict[Address, int] = {}
+        self._free: t.List[int] = []
+        self.balances = array('q')
+        # 0 for an account never read.
+        self.ledgers = array('L')
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, address: object) -> bool:
+        return address in self._slots
+
+    def __iter__(self) -> t.Iterator[Address]:
+        return iter(self._slots)
+
+    def add(self, address: Address) -> None:
+        if address in self._slots:
+            return
+        if self._free:
+            slot = self._free.pop()
+            self.balances[slot] = MISSING
+            self.ledgers[slot] = 0
+        else:
+            slot = len(self.balances)
+            self.balances.append(MISSING)
+            self.ledgers.append(0)
+        self._slots[address] = slot
+
+    def remove(self, address: Address) -> None:
+        slot = self._slots.pop(address, None)
+        if slot is not None:
+            self._free.append(slot)
+
+    def get(self, address: Address) -> t.Optional[int]:
+        """Return the balance of an account, if known and it exists."""
+        slot = self._slots[address]
+        balance = self.balances[slot]
+        return None if balance == MISSING else balance
+
+    def ledger_index(self, address: Address) -> int:
+        """Return the ledger of the balance, or 0 if never read."""
+        return self.ledgers[self._slots[address]]
+
+    def update(
+        self,
+        address: Address,
+        balance: t.Optional[int],
+        ledger_index: int,
+    ) -> t.Optional[BalanceChange]:
+        """
+        Record a balance read from a ledger. Return the change, if any.
+
+        A read from an older ledger than the last is ignored. The first read
+        of an account is not a change.
+        """
+        slot = self._slots.get(address)
+        if slot is None or ledger_index < self.ledgers[slot]:
+            return None
+        new = MISSING if balance is None else balance
+        old = self.balances[slot]
+        first = self.ledgers[slot] == 0
+        self.balances[slot] = new
+        self.ledgers[slot] = ledger_index
+        if first or old == new:
+            return None
+        return BalanceChange(
+            address,
+            None if old == MISSING else old,
+            balance,
+            ledger_index,
+        )
+
+
+class BalanceMonitor:
+    """
+    Track the balances of watched accounts, and report their changes to
+    subscribers.
+
+    Mark accounts to read on the next :meth:`refresh` with :meth:`touch` or
+    :meth:`touch_transaction`. Newly watched accounts are read on the next
+    refresh, and accounts that fail to be read are read again. Call
+    :meth:`start` to refresh in a background thread.
+    """
+
+    def __init__(
+        self,
+        client: Client,
+        addresses: t.Iterable[Address] = (),
+        concurrency: int = 64,
+        clock: t.Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.client = client
+        self.concurrency = concurrency
+        self.clock = clock
+        self.table = BalanceTable()
+        # The latest ledger read from.
+        self.ledger_index = 0
+        self.reads = 0
+        self.errors = 0
+        self._executor = ThreadPoolExecutor(concurrency)
+        self._touched: t.Set[Address] = set()
+        self._listeners: t.List[Listener] = []
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: t.Optional[threading.Thread] = None
+        self.watch(addresses)
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def watch(self, addresses: t.Iterable[Address]) -> None:
+        with self._lock:
+            for address in addresses:
+                if address not in self.table:
+                    self.table.add(address)
+                    self._touched.add(address)
+
+    def unwatch(self, addresses: t.Iterable[Address]) -> None:
+        with self._lock:
+            for address in addresses:
+                self.table.remove(address)
+                self._touched.discard(address)
+
+    def subscribe(self, listener: Listener) -> None:
+        """Call `listener` with each change, in the refreshing thread."""
+        self._listeners.append(listener)
+
+    def balance(self, address: Address) -> t.Optional[int]:
+        """Return the last known balance of a watched account, in drops."""
+        with self._lock:
+            return self.table.get(address)
+
+    def touch(self, *addresses: Address) -> None:
+        """Mark watched accounts to be read on the next refresh."""
+        with self._lock:
+            self._touched.update(
+                address for address in addresses if address in self.table
+            )
+
+    def touch_transaction(self, transaction: t.Mapping) -> None:
+        """
+        Mark the accounts whose balances a transaction may change: its
+        sender and destination.
+        """
+        self.touch(
+            *(
+                transaction[field]
+                for field in ('Account', 'Destination')
+                if field in transaction
+            )
+        )
+
+    def _read(
+        self, address: Address
+    ) -> t.List[t.Tuple[Address, t.Optional[int], int]]:
+        if self.client.cache is not None:
+            self.client.cache.invalidate(account_key(address))
+        try:
+            account = self.client.get_account(address)
+        except grpc.RpcError as error:
+            if error.code() != grpc.StatusCode.NOT_FOUND:
+                with self._lock:
+                    self.errors += 1
+                    self._touched.add(address)
+                return []
+            # The ledger is not reported. Assume the latest, but never 0.
+            return [(address, None, max(self.ledger_index, 1))]
+        balance = account.account_data.balance.value.xrp_amount.drops
+        return [(address, balance, account.ledger_index)]
+
+    def _refresh(
+        self, addresses: t.Iterable[Address]
+    ) -> t.List[BalanceChange]:
+        changes = []
+        for address, balance, ledger_index in imap_ordered(
+            self._executor,
+            self._read,
+            ((address,) for address in addresses),
+            2 * self.concurrency,
+        ):
+            with self._lock:
+                self.reads += 1
+                self.ledger_index = max(self.ledger_index, ledger_index)
+                change = self.table.update(address, balance, ledger_index)
+            if change is not None:
+                changes.append(change)
+                for listener in self._listeners:
+                    listener(change)
+        return changes
+
+    def refresh(self) -> t.List[BalanceChange]:
+        """Read the touched accounts. Return the changes."""
+        with self._lock:
+            touched, self._touched = self._touched, set()
+        return self._refresh(touched)
+
+    def sweep(self) -> t.List[BalanceChange]:
+        """Read every watched account. Return the changes."""
+        with self._lock:
+            addresses = list(self.table)
+            self._touched.clear()
+        return self._refresh(addresses)
+
+    def start(
+        self,
+        interval: float = 1.0,
+        sweep_interval: t.Optional[float] = None,
+    ) -> None:
+        """
+        Refresh every `interval` seconds, and sweep instead every
+        `sweep_interval` seconds if given, until :meth:`close`.
+        """
+        if self._thread is not None:
+            raise RuntimeError('the balance monitor is already running')
+
+        def run():
+            swept = self.clock()
+            while not self._stopped.wait(interval):
+                if (
+                    sweep_interval is not None and
+                    self.clock() - swept >= sweep_interval
+                ):
+                    swept = self.clock()
+                    self.sweep()
+                else:
+                    self.refresh()
+
+        self._stopped.clear()
+        self._thread = threading.Thread(target=run, daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._executor.shutdown()
+
+    def __enter__(self) -> 'BalanceMonitor':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
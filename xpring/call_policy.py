@@ -0,0 +1,244 @@
+"""
+Deadlines, retries, and hedging for calls to a ledger.
+
+A :class:`CallPolicy` gives each attempt at a call a deadline, and retries
+read-only calls that fail for reasons unrelated to the request, after a
+jittered exponential backoff. It may also hedge read-only calls: if an
+attempt has not answered after `hedge_after` seconds, a second one is sent,
+and the first answer wins. Behind a :class:`~xpring.channel_pool.ChannelPool`
+that balances by outstanding requests, the hedge goes to another endpoint.
+"""
+
+import asyncio
+from concurrent import futures
+from dataclasses import dataclass, field
+import random
+import threading
+import time
+import typing as t
+
+import grpc
+from xpring import instrumentation
+
+# Methods that change nothing, and so are safe to send twice.
+READ_ONLY = frozenset(('GetAccountInfo', 'GetFee', 'GetTransaction'))
+
+# Status codes that say more about the server than about the request.
+RETRY_CODES = frozenset((
+    grpc.StatusCode.UNAVAILABLE,
+    grpc.StatusCode.DEADLINE_EXCEEDED,
+    grpc.StatusCode.RESOURCE_EXHAUSTED,
+))
+
+
+@dataclass(frozen=True)
+class CallPolicy:
+    # Seconds allowed for each attempt, or `None` for no deadline.
+    timeout: t.Optional[float] = 10.0
+    # Deadlines of particular methods, in place of `timeout`.
+    timeouts: t.Mapping[str, t.Optional[float]] = field(default_factory=dict)
+    # Attempts at each call of a method in `retry_methods`.
+    max_attempts: int = 3
+    retry_methods: t.FrozenSet[str] = READ_ONLY
+    # Seconds of backoff before the first retry, doubling for each retry
+    # after it, up to `max_backoff`. The delay is drawn uniformly up to it.
+    backoff: float = 0.1
+    max_backoff: float = 2.0
+    # Seconds to wait for an answer before hedging, or `None` to never
+    # hedge.
+    hedge_after: t.Optional[float] = None
+    hedge_methods: t.FrozenSet[str] = READ_ONLY
+
+    def timeout_for(self, method: str) -> t.Optional[float]:
+        return self.timeouts.get(method, self.timeout)
+
+    def should_retry(
+        self, method: str, attempts: int, error: grpc.RpcError
+    ) -> bool:
+        return (
+            method in self.retry_methods and attempts < self.max_attempts and
+            error.code() in RETRY_CODES
+        )
+
+    def delay(self, attempts: int) -> float:
+        """Return seconds to wait after a number of failed attempts."""
+        backoff = min(self.max_backoff, self.backoff * 2**(attempts - 1))
+        return random.uniform(0, backoff)
+
+    def hedges(self, method: str) -> bool:
+        return self.hedge_after is not None and method in self.hedge_methods
+
+
+DEFAULT_POLICY = CallPolicy()
+
+
+class CallCounters:
+    """
+    Count retries and hedges, and hedges answered first.
+
+    Each count is also reported, by method, to the installed recorder, e.g.
+    as ``rpc.GetFee.hedges``.
+    """
+
+    def __init__(self) -> None:
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self._lock = threading.Lock()
+
+    def count(self, event: str, method: str) -> None:
+        with self._lock:
+            setattr(self, event, getattr(self, event) + 1)
+        recorder = instrumentation.recorder
+        if recorder is not None:
+            recorder.increment(f'rpc.{method}.{event}')
+
+
+def _remaining(
+    timeout: t.Optional[float], elapsed: float
+) -> t.Optional[float]:
+    return None if timeout is None else max(timeout - elapsed, 0.0)
+
+
+def _hedge(
+    policy: CallPolicy,
+    counters: CallCounters,
+    executor: futures.Executor,
+    method: str,
+    function: t.Callable,
+    request,
+    timeout: t.Optional[float],
+):
+    primary = executor.submit(function, request, timeout=timeout)
+    try:
+        return primary.result(timeout=policy.hedge_after)
+    except futures.TimeoutError:
+        pass
+    counters.count('hedges', method)
+    # The hedge shares the deadline of the first attempt.
+    hedge = executor.submit(
+        function,
+        request,
+        timeout=_remaining(timeout, t.cast(float, policy.hedge_after)),
+    )
+    pending = {primary, hedge}
+    error = None
+    while pending:
+        done, pending = futures.wait(
+            pending, return_when=futures.FIRST_COMPLETED
+        )
+        for future in done:
+            try:
+                response = future.result()
+            except grpc.RpcError as e:
+                error = e
+                continue
+            if future is hedge:
+                counters.count('hedge_wins', method)
+            return response
+    raise t.cast(grpc.RpcError, error)
+
+
+def invoke(
+    policy: t.Optional[CallPolicy],
+    counters: CallCounters,
+    executor: t.Optional[futures.Executor],
+    method: str,
+    function: t.Callable,
+    request,
+):
+    """
+    Call `function` with `request` under `policy`. Hedges run on
+    `executor`, which must be given if the policy hedges.
+    """
+    if policy is None:
+        return function(request)
+    timeout = policy.timeout_for(method)
+    attempts = 0
+    while True:
+        attempts += 1
+        try:
+            if policy.hedges(method):
+                return _hedge(
+                    policy,
+                    counters,
+                    t.cast(futures.Executor, executor),
+                    method,
+                    function,
+                    request,
+                    timeout,
+                )
+            return function(request, timeout=timeout)
+        except grpc.RpcError as error:
+            if not policy.should_retry(method, attempts, error):
+                raise
+        counters.count('retries', method)
+        time.sleep(policy.delay(attempts))
+
+
+async def _hedge_async(
+    policy: CallPolicy,
+    counters: CallCounters,
+    method: str,
+    function: t.Callable,
+    request,
+    timeout: t.Optional[float],
+):
+    primary = asyncio.ensure_future(function(request, timeout=timeout))
+    done, _ = await asyncio.wait({primary}, timeout=policy.hedge_after)
+    if done:
+        return primary.result()
+    counters.count('hedges', method)
+    hedge = asyncio.ensure_future(
+        function(
+            request,
+            timeout=_remaining(timeout, t.cast(float, policy.hedge_after)),
+        )
+    )
+    pending = {primary, hedge}
+    error = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                try:
+                    response = task.result()
+                except grpc.RpcError as e:
+                    error = e
+                    continue
+                if task is hedge:
+                    counters.count('hedge_wins', method)
+                return response
+        raise t.cast(grpc.RpcError, error)
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def invoke_async(
+    policy: t.Optional[CallPolicy],
+    counters: CallCounters,
+    method: str,
+    function: t.Callable,
+    request,
+):
+    """Await `function` with `request` under `policy`."""
+    if policy is None:
+        return await function(request)
+    timeout = policy.timeout_for(method)
+    attempts = 0
+    while True:
+        attempts += 1
+        try:
+            if policy.hedges(method):
+                return await _hedge_async(
+                    policy, counters, method, function, request, timeout
+                )
+            return await function(request, timeout=timeout)
+        except grpc.RpcError as error:
+            if not policy.should_retry(method, attempts, error):
+                raise
+        counters.count('retries', method)
+        await asyncio.sleep(policy.delay(attempts))
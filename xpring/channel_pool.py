@@ -0,0 +1,257 @@
+"""
+Spread requests over several rippled servers.
+
+A :class:`ChannelPool` stands in for a single ``XRPLedgerAPIServiceStub``.
+Each call goes to one healthy endpoint, chosen round-robin or by fewest
+outstanding requests. An endpoint is ejected for a while after consecutive
+failures or when its latency grows too high, and a failed read-only call
+is retried on another endpoint.
+"""
+
+from dataclasses import dataclass
+import itertools
+import threading
+import time
+import typing as t
+
+import grpc
+from xpring.call_policy import READ_ONLY
+from xpring.proto.v1.get_fee_pb2 import GetFeeRequest
+from xpring.proto.v1.xrp_ledger_pb2_grpc import XRPLedgerAPIServiceStub
+
+ROUND_ROBIN = 'round-robin'
+LEAST_OUTSTANDING = 'least-outstanding'
+POLICIES = (ROUND_ROBIN, LEAST_OUTSTANDING)
+
+# Status codes that say more about the endpoint than about the request.
+FAILOVER_CODES = frozenset((
+    grpc.StatusCode.UNAVAILABLE,
+    grpc.StatusCode.DEADLINE_EXCEEDED,
+))
+
+
+@dataclass
+class Endpoint:
+    url: str
+    stub: t.Any
+    channel: t.Optional[grpc.Channel] = None
+    outstanding: int = 0
+    # Consecutive failures.
+    failures: int = 0
+    # Exponentially weighted moving average of seconds per call.
+    latency: float = 0.0
+    ejected_until: float = 0.0
+    requests: int = 0
+    errors: int = 0
+    ejections: int = 0
+
+
+class ChannelPool:
+    """
+    A stub that dispatches each call to one of several endpoints.
+
+    An endpoint is ejected for `ejection_time` seconds after `max_failures`
+    consecutive failures, or when its average latency exceeds
+    `max_latency`. When every endpoint is ejected, the one due back
+    soonest is used anyway.
+    """
+
+    def __init__(
+        self,
+        endpoints: t.Mapping[str, t.Any],
+        policy: str = LEAST_OUTSTANDING,
+        max_failures: int = 3,
+        max_latency: t.Optional[float] = None,
+        ejection_time: float = 30.0,
+        latency_weight: float = 0.2,
+        clock: t.Callable[[], float] = time.monotonic,
+    ) -> None:
+        if not endpoints:
+            raise ValueError('a channel pool needs at least one endpoint')
+        if policy not in POLICIES:
+            raise ValueError(f'unknown balancing policy: {policy}')
+        self.endpoints = [
+            Endpoint(url, stub) for url, stub in endpoints.items()
+        ]
+        self.policy = policy
+        self.max_failures = max_failures
+        self.max_latency = max_latency
+        self.ejection_time = ejection_time
+        self.latency_weight = latency_weight
+        self.clock = clock
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._health_checker: t.Optional[threading.Thread] = None
+
+    @classmethod
+    def from_urls(cls, grpc_urls: t.Iterable[str], **kwargs):
+        channels = {url: grpc.insecure_channel(url) for url in grpc_urls}
+        pool = cls(
+            {
+                url: XRPLedgerAPIServiceStub(channel)
+                for url, channel in channels.items()
+            },
+            **kwargs,
+        )
+        for endpoint in pool.endpoints:
+            endpoint.channel = channels[endpoint.url]
+        return pool
+
+    def __getattr__(self, method: str) -> t.Callable[..., t.Any]:
+        if method.startswith('_'):
+            raise AttributeError(method)
+
+        def call(request, **kwargs):
+            return self.call(method, request, **kwargs)
+
+        return call
+
+    def call(self, method: str, request, **kwargs):
+        """
+        Call `method` on a healthy endpoint. A read-only call fails over to
+        another endpoint on errors, within the same `timeout`, if given.
+        A call that may change the ledger does not, since it may have
+        reached the first endpoint.
+        """
+        tried: t.List[Endpoint] = []
+        timeout = kwargs.get('timeout')
+        deadline = None if timeout is None else self.clock() + timeout
+        while True:
+            endpoint = self._acquire(tried)
+            tried.append(endpoint)
+            start = self.clock()
+            if deadline is not None:
+                kwargs['timeout'] = deadline - start
+            # Unset if the call fails for a reason other than the server.
+            elapsed = None
+            unhealthy = False
+            try:
+                response = getattr(endpoint.stub, method)(request, **kwargs)
+                elapsed = self.clock() - start
+                return response
+            except grpc.RpcError as error:
+                elapsed = self.clock() - start
+                unhealthy = error.code() in FAILOVER_CODES
+                if (
+                    not unhealthy or method not in READ_ONLY or
+                    len(tried) == len(self.endpoints) or
+                    deadline is not None and self.clock() >= deadline
+                ):
+                    raise
+            finally:
+                self._release(endpoint, elapsed, unhealthy)
+
+    def _acquire(self, exclude: t.Sequence[Endpoint]) -> Endpoint:
+        with self._lock:
+            now = self.clock()
+            candidates = [e for e in self.endpoints if e not in exclude]
+            healthy = [e for e in candidates if e.ejected_until <= now]
+            if healthy:
+                # Rotate so that ties are broken round-robin.
+                offset = next(self._counter) % len(healthy)
+                healthy = healthy[offset:] + healthy[:offset]
+                if self.policy == ROUND_ROBIN:
+                    endpoint = healthy[0]
+                else:
+                    endpoint = min(healthy, key=lambda e: e.outstanding)
+            else:
+                endpoint = min(candidates, key=lambda e: e.ejected_until)
+            endpoint.outstanding += 1
+            endpoint.requests += 1
+            return endpoint
+
+    def _release(
+        self, endpoint: Endpoint, elapsed: t.Optional[float], failed: bool
+    ) -> None:
+        with self._lock:
+            endpoint.outstanding -= 1
+            if elapsed is None:
+                return
+            if failed:
+                endpoint.errors += 1
+                endpoint.failures += 1
+                if endpoint.failures >= self.max_failures:
+                    self._eject(endpoint)
+                return
+            endpoint.failures = 0
+            if endpoint.latency:
+                endpoint.latency += self.latency_weight * (
+                    elapsed - endpoint.latency
+                )
+            else:
+                endpoint.latency = elapsed
+            if self._too_slow(endpoint.latency):
+                self._eject(endpoint)
+
+    def _too_slow(self, latency: float) -> bool:
+        return self.max_latency is not None and latency > self.max_latency
+
+    def _eject(self, endpoint: Endpoint) -> None:
+        endpoint.ejected_until = self.clock() + self.ejection_time
+        endpoint.ejections += 1
+        # Start afresh when the endpoint returns.
+        endpoint.failures = 0
+        endpoint.latency = 0.0
+
+    def healthy_endpoints(self) -> t.List[str]:
+        now = self.clock()
+        return [e.url for e in self.endpoints if e.ejected_until <= now]
+
+    def check_health(self, timeout: float = 5.0) -> t.Dict[str, bool]:
+        """
+        Probe every endpoint with a fee request.
+
+        An endpoint that answers quickly enough is restored at once. One
+        that fails or is too slow is ejected. Return the result by URL.
+        """
+        results = {}
+        for endpoint in self.endpoints:
+            start = self.clock()
+            try:
+                endpoint.stub.GetFee(GetFeeRequest(), timeout=timeout)
+            except grpc.RpcError:
+                healthy = False
+            else:
+                elapsed = self.clock() - start
+                healthy = not self._too_slow(elapsed)
+            with self._lock:
+                if healthy:
+                    endpoint.ejected_until = 0.0
+                    endpoint.failures = 0
+                    endpoint.latency = elapsed
+                elif endpoint.ejected_until <= self.clock():
+                    self._eject(endpoint)
+            results[endpoint.url] = healthy
+        return results
+
+    def start_health_checks(
+        self, interval: float = 10.0, timeout: float = 5.0
+    ) -> None:
+        """Run :meth:`check_health` every `interval` seconds in a thread."""
+        if self._health_checker is not None:
+            raise RuntimeError('health checks are already running')
+
+        def run():
+            while not self._stopped.wait(interval):
+                self.check_health(timeout)
+
+        self._stopped.clear()
+        self._health_checker = threading.Thread(target=run, daemon=True)
+        self._health_checker.start()
+
+    def close(self) -> None:
+        """Stop health checks and close the channels opened by the pool."""
+        self._stopped.set()
+        if self._health_checker is not None:
+            self._health_checker.join()
+            self._health_checker = None
+        for endpoint in self.endpoints:
+            if endpoint.channel is not None:
+                endpoint.channel.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
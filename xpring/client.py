@@ -1,6 +1,21 @@
+import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor
 from dataclasses import dataclass
+import threading
+import time
+import typing as t
 
 import grpc
+from grpc import aio
+from xpring import instrumentation
+from xpring.call_policy import (
+    DEFAULT_POLICY,
+    CallCounters,
+    CallPolicy,
+    invoke,
+    invoke_async,
+)
+from xpring.channel_pool import ChannelPool
 from xpring.proto.v1.get_account_info_pb2 import (
     GetAccountInfoRequest,
     GetAccountInfoResponse,
@@ -19,76 +34,497 @@ from xpring.proto.v1.submit_pb2 import (
     SubmitTransactionResponse,
 )
 from xpring.proto.v1.xrp_ledger_pb2_grpc import XRPLedgerAPIServiceStub
-from xpring.serialization import serialize_transaction
+from xpring.response_cache import ResponseCache
+from xpring.sequences import SequenceAllocator
+from xpring.serialization import (
+    Scanner,
+    deserialize_transaction,
+    serialize_transaction,
+)
 from xpring.types import (
     Address,
     Amount,
     DigestLike,
     SignedTransaction,
+    Transaction,
     TransactionStatus,
     to_digest,
 )
 from xpring.wallet import Wallet
 
 
+def make_payment(
+    address: Address,
+    destination: Address,
+    amount: Amount,
+    sequence: int,
+    fees: GetFeeResponse,
+) -> Transaction:
+    return {
+        'Account': address,
+        'Amount': amount,
+        'Destination': destination,
+        'Fee': str(fees.fee.minimum_fee.drops),
+        'Flags': 0x80000000,
+        'Sequence': sequence,
+        'TransactionType': 'Payment'
+    }
+
+
+def transaction_status(
+    transaction: GetTransactionResponse
+) -> TransactionStatus:
+    if not transaction.validated:
+        return TransactionStatus.PENDING
+    return (
+        TransactionStatus.SUCCEEDED
+        if transaction.meta.transaction_result.result.startswith('tes') else
+        TransactionStatus.FAILED
+    )
+
+
+FEE_KEY = 'fee'
+# The fields that identify the sender and sequence of a transaction.
+SUBMITTER_FIELDS = frozenset(('Account', 'Sequence'))
+
+
+def account_key(address: Address) -> t.Hashable:
+    return ('account', address)
+
+
+def update_cached_account(
+    cache: ResponseCache,
+    signed_transaction: SignedTransaction,
+    response: SubmitTransactionResponse,
+) -> None:
+    """
+    Advance the cached sequence of the sender of a submitted transaction if
+    the transaction consumed it. Otherwise, forget the cached account info.
+    """
+    key = account_key(signed_transaction['Account'])
+    result = response.engine_result.result
+    if not result.startswith(('tes', 'tec')) and result != 'terQUEUED':
+        cache.invalidate(key)
+        return
+    sequence = signed_transaction['Sequence'] + 1
+
+    def advance(account: GetAccountInfoResponse) -> GetAccountInfoResponse:
+        account_data = account.account_data
+        if account_data.sequence.value >= sequence:
+            return account
+        advanced = GetAccountInfoResponse()
+        advanced.CopyFrom(account)
+        advanced.account_data.sequence.value = sequence
+        return advanced
+
+    cache.update(key, advance)
+
+
 class Client:
+    """
+    A client of the gRPC interface of rippled.
 
-    def __init__(self, grpc_client: XRPLedgerAPIServiceStub):
+    Calls follow `policy`, if given, for deadlines, retries, and hedging.
+    Without one, they are passed to `grpc_client` as they are. Hedges run
+    on `executor`, or on a thread pool of the client's own. Call
+    :meth:`close`, or use the client as a context manager, to shut that
+    pool down.
+    """
+
+    def __init__(
+        self,
+        grpc_client: XRPLedgerAPIServiceStub,
+        cache: t.Optional[ResponseCache] = None,
+        sequences: t.Optional[SequenceAllocator] = None,
+        policy: t.Optional[CallPolicy] = None,
+        executor: t.Optional[Executor] = None,
+    ):
         self.grpc_client = grpc_client
+        self.cache = cache
+        self.sequences = sequences
+        self.policy = policy
+        self.counters = CallCounters()
+        self._executor = executor
+        # The thread pool made by the client, if any.
+        self._own_executor: t.Optional[Executor] = None
+        # The channel or channel pool opened by the client, if any.
+        self._closeable: t.Optional[t.Any] = None
+        self._lock = threading.Lock()
 
     @classmethod
-    def from_url(cls, grpc_url: str = 'grpc.xpring.tech:80'):
+    def from_url(
+        cls,
+        grpc_url: str = 'grpc.xpring.tech:80',
+        policy: t.Optional[CallPolicy] = DEFAULT_POLICY,
+    ):
         channel = grpc.insecure_channel(grpc_url)
-        grpc_client = XRPLedgerAPIServiceStub(channel)
-        return cls(grpc_client)
+        client = cls(XRPLedgerAPIServiceStub(channel), policy=policy)
+        client._closeable = channel
+        return client
+
+    @classmethod
+    def from_urls(
+        cls,
+        grpc_urls: t.Iterable[str],
+        policy: t.Optional[CallPolicy] = DEFAULT_POLICY,
+        **kwargs,
+    ):
+        """
+        Spread requests over several servers.
+
+        Keyword arguments are passed to :class:`ChannelPool`.
+        """
+        pool = ChannelPool.from_urls(grpc_urls, **kwargs)
+        client = cls(pool, policy=policy)
+        client._closeable = pool
+        return client
+
+    @property
+    def executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    thread_name_prefix='xpring-hedge'
+                )
+                self._own_executor = self._executor
+            return self._executor
+
+    def close(self) -> None:
+        """
+        Shut down the thread pool the client made for hedges, if any, and
+        close the channel or channel pool opened by :meth:`from_url` or
+        :meth:`from_urls`. An executor given to the client is left running.
+        """
+        with self._lock:
+            executor, self._own_executor = self._own_executor, None
+            if executor is not None:
+                self._executor = None
+            closeable, self._closeable = self._closeable, None
+        if executor is not None:
+            executor.shutdown()
+        if closeable is not None:
+            closeable.close()
+
+    def __enter__(self) -> 'Client':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def _invoke(self, method: str, function, request):
+        policy = self.policy
+        executor = (
+            self.executor
+            if policy is not None and policy.hedges(method) else None
+        )
+        return invoke(
+            policy, self.counters, executor, method, function, request
+        )
+
+    def _call(self, method: str, request):
+        function = getattr(self.grpc_client, method)
+        recorder = instrumentation.recorder
+        if recorder is None:
+            return self._invoke(method, function, request)
+        start = time.perf_counter()
+        try:
+            return self._invoke(method, function, request)
+        except grpc.RpcError:
+            recorder.increment(f'rpc.{method}.errors')
+            raise
+        finally:
+            recorder.observe(
+                f'rpc.{method}.seconds', time.perf_counter() - start
+            )
 
     def get_account(self, address: Address) -> GetAccountInfoResponse:
+        key = account_key(address)
+        if self.cache is not None:
+            account = self.cache.get(key)
+            if account is not None:
+                return account
         request = GetAccountInfoRequest(account=AccountAddress(address=address))
-        return self.grpc_client.GetAccountInfo(request)
+        account = self._call('GetAccountInfo', request)
+        if self.cache is not None:
+            self.cache.put(key, account, account.ledger_index)
+        return account
 
     def get_balance(self, address: Address) -> int:
         account = self.get_account(address)
         return account.account_data.balance.value.xrp_amount.drops
 
+    def get_sequence(self, address: Address) -> int:
+        """Read the next sequence of an account from the ledger."""
+        if self.cache is not None:
+            self.cache.invalidate(account_key(address))
+        return self.get_account(address).account_data.sequence.value
+
+    def allocate_sequence(self, address: Address) -> int:
+        """
+        Return the sequence for the next transaction from an account,
+        from the sequence allocator if there is one.
+        """
+        if self.sequences is None:
+            account = self.get_account(address)
+            return account.account_data.sequence.value
+        if self.sequences.needs_sync(address):
+            self.sequences.sync(address, self.get_sequence(address))
+        return self.sequences.allocate(address)
+
     def get_fee(self) -> GetFeeResponse:
+        if self.cache is not None:
+            fees = self.cache.get(FEE_KEY)
+            if fees is not None:
+                return fees
         request = GetFeeRequest()
-        return self.grpc_client.GetFee(request)
+        fees = self._call('GetFee', request)
+        if self.cache is not None:
+            self.cache.put(FEE_KEY, fees, fees.ledger_current_index)
+        return fees
 
     def submit(
         self, signed_transaction: SignedTransaction
     ) -> SubmitTransactionResponse:
         blob = serialize_transaction(signed_transaction)
+        return self.submit_blob(blob, signed_transaction)
+
+    def submit_blob(
+        self,
+        blob: bytes,
+        signed_transaction: t.Optional[SignedTransaction] = None,
+        record: bool = True,
+    ) -> SubmitTransactionResponse:
+        """
+        Submit a serialized signed transaction.
+
+        `signed_transaction`, if given, must be its deserialized form. It
+        saves decoding the blob to update the cache and sequences. Unless
+        `record` is false, the result is passed to :meth:`record_submission`.
+        """
         request = SubmitTransactionRequest(signed_transaction=blob)
-        return self.grpc_client.SubmitTransaction(request)
+        response = self._call('SubmitTransaction', request)
+        if not record or (self.cache is None and self.sequences is None):
+            return response
+        if signed_transaction is None:
+            signed_transaction = deserialize_transaction(
+                Scanner(blob), fields=SUBMITTER_FIELDS
+            )
+        self.record_submission(signed_transaction, response)
+        return response
+
+    def record_submission(
+        self,
+        signed_transaction: SignedTransaction,
+        response: SubmitTransactionResponse,
+        retry: bool = False,
+    ) -> None:
+        """
+        Update the cache and sequences with the result of a submission. If
+        `retry`, the same transaction will be submitted again.
+        """
+        if self.cache is not None:
+            update_cached_account(self.cache, signed_transaction, response)
+        if self.sequences is not None:
+            address = signed_transaction['Account']
+            if self.sequences.record(
+                address,
+                signed_transaction['Sequence'],
+                response.engine_result.result,
+                retry,
+            ):
+                self.sequences.sync(address, self.get_sequence(address))
 
     def send(
         self, wallet: Wallet, destination: Address, amount: Amount
     ) -> SignedTransaction:
         address = wallet.address
-        account = self.get_account(address)
         fees = self.get_fee()
-        unsigned_transaction = {
-            'Account': address,
-            'Amount': amount,
-            'Destination': destination,
-            'Fee': str(fees.fee.minimum_fee.drops),
-            'Flags': 0x80000000,
-            'Sequence': account.account_data.sequence.value,
-            'TransactionType': 'Payment'
-        }
-        return wallet.sign_transaction(unsigned_transaction)
+        sequence = self.allocate_sequence(address)
+        unsigned_transaction = make_payment(
+            address, destination, amount, sequence, fees
+        )
+        try:
+            return wallet.sign_transaction(unsigned_transaction)
+        except Exception:
+            if self.sequences is not None:
+                self.sequences.release(address, sequence)
+            raise
 
     def get_transaction(self, txid: DigestLike) -> GetTransactionResponse:
         txid = to_digest(txid)
         request = GetTransactionRequest(hash=txid)
-        return self.grpc_client.GetTransaction(request)
+        return self._call('GetTransaction', request)
 
     def get_transaction_status(self, txid: DigestLike) -> TransactionStatus:
-        transaction = self.get_transaction(txid)
-        if not transaction.validated:
-            return TransactionStatus.PENDING
-        return (
-            TransactionStatus.SUCCEEDED
-            if transaction.meta.transaction_result.result.startswith('tes') else
-            TransactionStatus.FAILED
+        return transaction_status(self.get_transaction(txid))
+
+
+class AsyncClient:
+    """
+    A :class:`Client` for asyncio.
+
+    Every method is a coroutine, so one event loop can keep many requests
+    in flight.
+    """
+
+    def __init__(
+        self,
+        grpc_client: XRPLedgerAPIServiceStub,
+        cache: t.Optional[ResponseCache] = None,
+        sequences: t.Optional[SequenceAllocator] = None,
+        policy: t.Optional[CallPolicy] = None,
+    ):
+        self.grpc_client = grpc_client
+        self.cache = cache
+        self.sequences = sequences
+        self.policy = policy
+        self.counters = CallCounters()
+
+    @classmethod
+    def from_url(
+        cls,
+        grpc_url: str = 'grpc.xpring.tech:80',
+        policy: t.Optional[CallPolicy] = DEFAULT_POLICY,
+    ):
+        channel = aio.insecure_channel(grpc_url)
+        grpc_client = XRPLedgerAPIServiceStub(channel)
+        return cls(grpc_client, policy=policy)
+
+    async def _invoke(self, method: str, function, request):
+        return await invoke_async(
+            self.policy, self.counters, method, function, request
         )
+
+    async def _call(self, method: str, request):
+        function = getattr(self.grpc_client, method)
+        recorder = instrumentation.recorder
+        if recorder is None:
+            return await self._invoke(method, function, request)
+        start = time.perf_counter()
+        try:
+            return await self._invoke(method, function, request)
+        except grpc.RpcError:
+            recorder.increment(f'rpc.{method}.errors')
+            raise
+        finally:
+            recorder.observe(
+                f'rpc.{method}.seconds', time.perf_counter() - start
+            )
+
+    async def get_account(self, address: Address) -> GetAccountInfoResponse:
+        key = account_key(address)
+        if self.cache is not None:
+            account = self.cache.get(key)
+            if account is not None:
+                return account
+        request = GetAccountInfoRequest(account=AccountAddress(address=address))
+        account = await self._call('GetAccountInfo', request)
+        if self.cache is not None:
+            self.cache.put(key, account, account.ledger_index)
+        return account
+
+    async def get_balance(self, address: Address) -> int:
+        account = await self.get_account(address)
+        return account.account_data.balance.value.xrp_amount.drops
+
+    async def get_sequence(self, address: Address) -> int:
+        if self.cache is not None:
+            self.cache.invalidate(account_key(address))
+        account = await self.get_account(address)
+        return account.account_data.sequence.value
+
+    async def allocate_sequence(self, address: Address) -> int:
+        if self.sequences is None:
+            account = await self.get_account(address)
+            return account.account_data.sequence.value
+        if self.sequences.needs_sync(address):
+            sequence = await self.get_sequence(address)
+            # Another task may have synchronized the account meanwhile.
+            if self.sequences.needs_sync(address):
+                self.sequences.sync(address, sequence)
+        return self.sequences.allocate(address)
+
+    async def get_fee(self) -> GetFeeResponse:
+        if self.cache is not None:
+            fees = self.cache.get(FEE_KEY)
+            if fees is not None:
+                return fees
+        request = GetFeeRequest()
+        fees = await self._call('GetFee', request)
+        if self.cache is not None:
+            self.cache.put(FEE_KEY, fees, fees.ledger_current_index)
+        return fees
+
+    async def submit(
+        self, signed_transaction: SignedTransaction
+    ) -> SubmitTransactionResponse:
+        blob = serialize_transaction(signed_transaction)
+        return await self.submit_blob(blob, signed_transaction)
+
+    async def submit_blob(
+        self,
+        blob: bytes,
+        signed_transaction: t.Optional[SignedTransaction] = None,
+    ) -> SubmitTransactionResponse:
+        """
+        Submit a serialized signed transaction.
+
+        `signed_transaction`, if given, must be its deserialized form. It
+        saves decoding the blob to update the cache and sequences.
+        """
+        request = SubmitTransactionRequest(signed_transaction=blob)
+        response = await self._call('SubmitTransaction', request)
+        if self.cache is None and self.sequences is None:
+            return response
+        if signed_transaction is None:
+            signed_transaction = deserialize_transaction(
+                Scanner(blob), fields=SUBMITTER_FIELDS
+            )
+        if self.cache is not None:
+            update_cached_account(self.cache, signed_transaction, response)
+        if self.sequences is not None:
+            address = signed_transaction['Account']
+            if self.sequences.record(
+                address,
+                signed_transaction['Sequence'],
+                response.engine_result.result,
+            ):
+                self.sequences.sync(address, await self.get_sequence(address))
+        return response
+
+    async def send(
+        self, wallet: Wallet, destination: Address, amount: Amount
+    ) -> SignedTransaction:
+        address = wallet.address
+        # The two lookups are independent.
+        fees, sequence = await asyncio.gather(
+            self.get_fee(),
+            self.allocate_sequence(address),
+            return_exceptions=True,
+        )
+        if isinstance(sequence, BaseException):
+            raise sequence
+        try:
+            if isinstance(fees, BaseException):
+                raise fees
+            unsigned_transaction = make_payment(
+                address, destination, amount, sequence, fees
+            )
+            return wallet.sign_transaction(unsigned_transaction)
+        except BaseException:
+            # The sequence was never submitted.
+            if self.sequences is not None:
+                self.sequences.release(address, sequence)
+            raise
+
+    async def get_transaction(
+        self, txid: DigestLike
+    ) -> GetTransactionResponse:
+        txid = to_digest(txid)
+        request = GetTransactionRequest(hash=txid)
+        return await self._call('GetTransaction', request)
+
+    async def get_transaction_status(
+        self, txid: DigestLike
+    ) -> TransactionStatus:
+        return transaction_status(await self.get_transaction(txid))
@@ -0,0 +1,31 @@
+from collections import deque
+from concurrent.futures import Executor
+import typing as t
+
+T = t.TypeVar('T')
+
+
+def imap_ordered(
+    executor: t.Optional[Executor],
+    function: t.Callable[..., t.Iterable[T]],
+    arguments: t.Iterable[t.Tuple],
+    max_pending: int,
+) -> t.Iterator[T]:
+    """
+    Yield the items of each call ``function(*args)``, in order.
+
+    At most `max_pending` calls are in flight at once, and `arguments` is
+    consumed only as fast as results are consumed. Without an executor,
+    calls run in the current thread.
+    """
+    if executor is None:
+        for args in arguments:
+            yield from function(*args)
+        return
+    pending: t.Deque = deque()
+    for args in arguments:
+        if len(pending) >= max_pending:
+            yield from pending.popleft().result()
+        pending.append(executor.submit(function, *args))
+    while pending:
+        yield from pending.popleft().result()
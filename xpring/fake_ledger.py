@@ -0,0 +1,339 @@
+"""
+A stand-in for a rippled server, for tests and benchmarks.
+
+A :class:`FakeLedger` keeps the balance and sequence of each account in
+memory and applies XRP payments. Pass it to :class:`~xpring.client.Client`
+directly to skip gRPC, or :func:`serve` it on a local port.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+import threading
+import time
+import typing as t
+
+import grpc
+from xpring.codec import DEFAULT_CODEC
+from xpring.hashes import sha512half
+from xpring.key_pair import derive_account_id
+from xpring.proto.v1.get_account_info_pb2 import GetAccountInfoResponse
+from xpring.proto.v1.get_fee_pb2 import GetFeeResponse
+from xpring.proto.v1.get_transaction_pb2 import GetTransactionResponse
+from xpring.proto.v1.submit_pb2 import SubmitTransactionResponse
+from xpring.proto.v1.xrp_ledger_pb2_grpc import (
+    XRPLedgerAPIServiceServicer,
+    add_XRPLedgerAPIServiceServicer_to_server,
+)
+from xpring.serialization import (
+    PREFIX_TRANSACTION_ID,
+    Scanner,
+    deserialize_transaction,
+)
+from xpring.types import Address, Transaction
+from xpring.verification import (
+    algorithm_for_public_key,
+    split_signed_transaction,
+)
+
+# https://github.com/ripple/rippled/blob/develop/src/ripple/protocol/TER.h
+ENGINE_RESULT_CODES = {
+    'tesSUCCESS': 0,
+    'tecUNFUNDED_PAYMENT': 104,
+    'tecNO_DST_INSUF_XRP': 125,
+    'tefPAST_SEQ': -190,
+    'terNO_ACCOUNT': -96,
+    'terPRE_SEQ': -92,
+    'telINSUF_FEE_P': -394,
+    'temMALFORMED': -299,
+    'temBAD_AMOUNT': -298,
+    'temBAD_SIGNATURE': -282,
+    'temDST_IS_SRC': -279,
+    'temUNKNOWN': -265,
+}
+
+
+# A transaction, with its ID and serialized form.
+Submitted = t.Tuple[bytes, bytes, Transaction]
+
+
+class LedgerError(grpc.RpcError):
+    """An error raised in place of an aborted RPC, without gRPC."""
+
+    def __init__(self, code: grpc.StatusCode, details: str) -> None:
+        super().__init__(details)
+        self._code = code
+        self._details = details
+
+    def code(self) -> grpc.StatusCode:
+        return self._code
+
+    def details(self) -> str:
+        return self._details
+
+
+@dataclass
+class AccountState:
+    balance: int
+    sequence: int = 1
+
+
+@dataclass
+class TransactionRecord:
+    blob: bytes
+    result: str
+    # The ledger that includes the transaction.
+    ledger_index: int
+    validated: bool = False
+
+
+class FakeLedger(XRPLedgerAPIServiceServicer):
+    """
+    A simulated ledger with the gRPC interface of rippled.
+
+    Every RPC waits `latency` seconds first, to simulate the network. Called
+    directly, an RPC whose `timeout` is shorter fails with
+    ``DEADLINE_EXCEEDED`` instead.
+    Submitted transactions are checked for a valid signature (unless
+    `verify_signatures` is false), fee, and sequence, and applied to the
+    open ledger at once. Transactions that arrive ahead of their sequence
+    are held until they can apply. :meth:`close_ledger` validates the open
+    ledger, and :meth:`start` closes ledgers on a timer.
+    """
+
+    def __init__(
+        self,
+        accounts: t.Optional[t.Mapping[Address, int]] = None,
+        base_fee: int = 10,
+        reserve: int = 10_000_000,
+        latency: float = 0.0,
+        verify_signatures: bool = True,
+    ) -> None:
+        self.accounts = {
+            address: AccountState(balance)
+            for address, balance in (accounts or {}).items()
+        }
+        self.base_fee = base_fee
+        self.reserve = reserve
+        self.latency = latency
+        self.verify_signatures = verify_signatures
+        # The index of the open ledger.
+        self.ledger_index = 2
+        self.transactions: t.Dict[bytes, TransactionRecord] = {}
+        self._open: t.List[bytes] = []
+        # Held transactions, by account and sequence.
+        self._held: t.Dict[t.Tuple[Address, int], Submitted] = {}
+        self._lock = threading.RLock()
+        self._stopped = threading.Event()
+        self._closer: t.Optional[threading.Thread] = None
+
+    def fund(self, address: Address, drops: int) -> None:
+        with self._lock:
+            account = self.accounts.get(address)
+            if account is None:
+                self.accounts[address] = AccountState(drops)
+            else:
+                account.balance += drops
+
+    def close_ledger(self) -> int:
+        """Validate the open ledger. Return its index."""
+        with self._lock:
+            for txid in self._open:
+                self.transactions[txid].validated = True
+            self._open.clear()
+            closed = self.ledger_index
+            self.ledger_index += 1
+            return closed
+
+    def start(self, interval: float = 1.0) -> None:
+        """Close a ledger every `interval` seconds until :meth:`stop`."""
+        if self._closer is not None:
+            raise RuntimeError('the ledger is already closing on a timer')
+
+        def run():
+            while not self._stopped.wait(interval):
+                self.close_ledger()
+
+        self._stopped.clear()
+        self._closer = threading.Thread(target=run, daemon=True)
+        self._closer.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._closer is not None:
+            self._closer.join()
+            self._closer = None
+
+    def _wait(self, context, timeout: t.Optional[float]) -> None:
+        if timeout is not None and timeout < self.latency:
+            time.sleep(timeout)
+            self._abort(
+                context, grpc.StatusCode.DEADLINE_EXCEEDED,
+                'deadline exceeded'
+            )
+        if self.latency:
+            time.sleep(self.latency)
+
+    @staticmethod
+    def _abort(context, code: grpc.StatusCode, details: str):
+        if context is None:
+            raise LedgerError(code, details)
+        context.abort(code, details)
+
+    def GetAccountInfo(self, request, context=None, timeout=None):
+        self._wait(context, timeout)
+        with self._lock:
+            account = self.accounts.get(request.account.address)
+            if account is None:
+                self._abort(
+                    context, grpc.StatusCode.NOT_FOUND, 'account not found'
+                )
+            response = GetAccountInfoResponse()
+            account_data = response.account_data
+            account_data.account.value.address = request.account.address
+            account_data.balance.value.xrp_amount.drops = account.balance
+            account_data.sequence.value = account.sequence
+            response.ledger_index = self.ledger_index
+            return response
+
+    def GetFee(self, request, context=None, timeout=None):
+        self._wait(context, timeout)
+        with self._lock:
+            response = GetFeeResponse()
+            fee = response.fee
+            fee.base_fee.drops = self.base_fee
+            fee.median_fee.drops = self.base_fee
+            fee.minimum_fee.drops = self.base_fee
+            fee.open_ledger_fee.drops = self.base_fee
+            response.current_ledger_size = len(self._open)
+            response.ledger_current_index = self.ledger_index
+            return response
+
+    def GetTransaction(self, request, context=None, timeout=None):
+        self._wait(context, timeout)
+        with self._lock:
+            record = self.transactions.get(request.hash)
+            if record is None:
+                self._abort(
+                    context, grpc.StatusCode.NOT_FOUND, 'txn not found'
+                )
+            response = GetTransactionResponse()
+            if request.binary:
+                response.transaction_binary = record.blob
+            response.ledger_index = record.ledger_index
+            response.hash = request.hash
+            response.validated = record.validated
+            response.meta.transaction_result.result = record.result
+            return response
+
+    def SubmitTransaction(self, request, context=None, timeout=None):
+        self._wait(context, timeout)
+        blob = request.signed_transaction
+        txid = sha512half(PREFIX_TRANSACTION_ID + blob)
+        try:
+            transaction = deserialize_transaction(Scanner(blob))
+            result = self._check(blob, transaction)
+        except (KeyError, IndexError, ValueError):
+            result = 'temMALFORMED'
+        if result == 'tesSUCCESS':
+            with self._lock:
+                result = self._apply(txid, blob, transaction)
+        response = SubmitTransactionResponse()
+        response.engine_result.result = result
+        response.engine_result_code = ENGINE_RESULT_CODES[result]
+        response.hash = txid
+        return response
+
+    def _check(self, blob: bytes, transaction: Transaction) -> str:
+        """Check what needs no ledger state."""
+        if transaction['TransactionType'] not in ('Payment', 'AccountSet'):
+            return 'temUNKNOWN'
+        if self.verify_signatures:
+            message, signature, public_key = split_signed_transaction(blob)
+            address = DEFAULT_CODEC.encode_address(
+                derive_account_id(public_key)
+            )
+            algorithm = algorithm_for_public_key(public_key)
+            if (
+                address != transaction['Account'] or
+                not algorithm.verify(message, signature, public_key)
+            ):
+                return 'temBAD_SIGNATURE'
+        if int(transaction['Fee']) < self.base_fee:
+            return 'telINSUF_FEE_P'
+        if transaction['TransactionType'] == 'Payment':
+            if not isinstance(transaction['Amount'], str):
+                return 'temBAD_AMOUNT'
+            if transaction['Destination'] == transaction['Account']:
+                return 'temDST_IS_SRC'
+        return 'tesSUCCESS'
+
+    def _apply(
+        self, txid: bytes, blob: bytes, transaction: Transaction
+    ) -> str:
+        address = transaction['Account']
+        account = self.accounts.get(address)
+        if account is None:
+            return 'terNO_ACCOUNT'
+        sequence = transaction['Sequence']
+        if sequence < account.sequence:
+            return 'tefPAST_SEQ'
+        if sequence > account.sequence:
+            self._held[(address, sequence)] = (txid, blob, transaction)
+            return 'terPRE_SEQ'
+        self._held.pop((address, sequence), None)
+        result = self._record(txid, blob, self._transact(account, transaction))
+        # Apply the held transactions that are now in sequence.
+        while True:
+            held = self._held.pop((address, account.sequence), None)
+            if held is None:
+                return result
+            txid, blob, transaction = held
+            self._record(txid, blob, self._transact(account, transaction))
+
+    def _record(self, txid: bytes, blob: bytes, result: str) -> str:
+        self.transactions[txid] = TransactionRecord(
+            blob, result, self.ledger_index
+        )
+        self._open.append(txid)
+        return result
+
+    def _transact(
+        self, account: AccountState, transaction: Transaction
+    ) -> str:
+        """Claim the fee, consume the sequence, and apply the transaction."""
+        fee = int(transaction['Fee'])
+        account.sequence += 1
+        account.balance -= min(fee, account.balance)
+        if transaction['TransactionType'] != 'Payment':
+            return 'tesSUCCESS'
+        amount = int(transaction['Amount'])
+        if account.balance < amount + self.reserve:
+            return 'tecUNFUNDED_PAYMENT'
+        destination = self.accounts.get(transaction['Destination'])
+        if destination is None:
+            if amount < self.reserve:
+                return 'tecNO_DST_INSUF_XRP'
+            destination = AccountState(0)
+            self.accounts[transaction['Destination']] = destination
+        account.balance -= amount
+        destination.balance += amount
+        return 'tesSUCCESS'
+
+    def __enter__(self) -> 'FakeLedger':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+
+def serve(
+    ledger: FakeLedger,
+    address: str = 'localhost:0',
+    max_workers: int = 16,
+) -> t.Tuple[grpc.Server, int]:
+    """Serve a ledger over gRPC. Return the started server and its port."""
+    server = grpc.server(ThreadPoolExecutor(max_workers))
+    add_XRPLedgerAPIServiceServicer_to_server(ledger, server)
+    port = server.add_insecure_port(address)
+    server.start()
+    return server, port
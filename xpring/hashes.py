@@ -41,3 +41,27 @@ class IdentityHash:
 
     def copy(self) -> 'IdentityHash':
         return self.__class__(self.data)
+
+
+class Sha512Half:
+    """An incremental :func:`sha512half`."""
+    digest_size = 32
+    block_size = hashlib.sha512().block_size
+    name = 'sha512half'
+
+    def __init__(self, data: bytes = b'') -> None:
+        self.hasher = hashlib.sha512(data)
+
+    def update(self, data: bytes) -> None:
+        self.hasher.update(data)
+
+    def digest(self) -> bytes:
+        return self.hasher.digest()[:32]
+
+    def hexdigest(self) -> str:
+        return self.digest().hex()
+
+    def copy(self) -> 'Sha512Half':
+        other = self.__class__()
+        other.hasher = self.hasher.copy()
+        return other
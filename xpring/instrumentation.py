@@ -0,0 +1,199 @@
+"""
+Measure where the time goes.
+
+Instrumentation is off by default, and then costs each instrumented call
+one global lookup. Install a recorder to turn it on:
+
+.. code-block:: python
+
+   recorder = instrumentation.MetricsRecorder()
+   instrumentation.install(recorder)
+   ...
+   print(instrumentation.format_prometheus(recorder.snapshot()))
+
+Metric names are dotted paths. Names ending in ``.seconds`` are latency
+histograms, e.g. ``rpc.GetFee.seconds`` and ``sign.ed25519.seconds``.
+Others are counters, e.g. ``rpc.GetFee.errors`` and ``serialize.bytes``.
+A recorder sees only the calls made in its own process.
+"""
+
+import bisect
+import threading
+import time
+import typing as t
+
+import typing_extensions as tex
+
+
+class Recorder(tex.Protocol):
+
+    def increment(self, name: str, value: int = 1) -> None:
+        ...
+
+    def observe(self, name: str, value: float) -> None:
+        ...
+
+
+# The installed recorder, if any.
+recorder: t.Optional[Recorder] = None
+
+
+def install(new: t.Optional[Recorder]) -> t.Optional[Recorder]:
+    """
+    Install a recorder, or `None` to turn instrumentation off. Return the
+    recorder it replaces.
+    """
+    global recorder
+    old, recorder = recorder, new
+    return old
+
+
+# Upper bounds of histogram buckets, in seconds: 1us to about 2 minutes,
+# doubling.
+BUCKETS = tuple(1e-6 * 2**i for i in range(28))
+
+
+class HistogramSnapshot(t.NamedTuple):
+    count: int
+    sum: float
+    min: float
+    max: float
+    # Observations per bucket, by upper bound, ending with infinity.
+    buckets: t.Tuple[t.Tuple[float, int], ...]
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile by the upper bound of its bucket."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in self.buckets:
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+
+class Histogram:
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = float('inf')
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def snapshot(self) -> HistogramSnapshot:
+        bounds = BUCKETS + (float('inf'),)
+        return HistogramSnapshot(
+            self.count,
+            self.sum,
+            self.min if self.count else 0.0,
+            self.max,
+            tuple(zip(bounds, self.counts)),
+        )
+
+
+class Snapshot(t.NamedTuple):
+    # Seconds covered by the snapshot.
+    elapsed: float
+    counters: t.Dict[str, int]
+    histograms: t.Dict[str, HistogramSnapshot]
+
+    def rate(self, name: str) -> float:
+        """Per second, of a counter or of observations in a histogram."""
+        if name in self.histograms:
+            total = self.histograms[name].count
+        else:
+            total = self.counters.get(name, 0)
+        return total / self.elapsed if self.elapsed else 0.0
+
+    def as_dict(self) -> t.Dict[str, t.Any]:
+        """Return a summary fit for JSON."""
+        return {
+            'elapsed': self.elapsed,
+            'counters': dict(self.counters),
+            'histograms': {
+                name: {
+                    'count': histogram.count,
+                    'sum': histogram.sum,
+                    'min': histogram.min,
+                    'max': histogram.max,
+                    'mean': histogram.mean,
+                    'p50': histogram.quantile(0.5),
+                    'p90': histogram.quantile(0.9),
+                    'p99': histogram.quantile(0.99),
+                } for name, histogram in self.histograms.items()
+            },
+        }
+
+
+class MetricsRecorder:
+    """Keeps counters and histograms in memory."""
+
+    def __init__(self, clock: t.Callable[[], float] = time.monotonic) -> None:
+        self.clock = clock
+        self.started = clock()
+        self._counters: t.Dict[str, int] = {}
+        self._histograms: t.Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name: str, value: int = 1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def observe(self, name: str, value: float) -> None:
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+            histogram.observe(value)
+
+    def snapshot(self, reset: bool = False) -> Snapshot:
+        """Return the metrics since the start or the last reset."""
+        with self._lock:
+            now = self.clock()
+            snapshot = Snapshot(
+                now - self.started,
+                dict(self._counters),
+                {
+                    name: histogram.snapshot()
+                    for name, histogram in self._histograms.items()
+                },
+            )
+            if reset:
+                self.started = now
+                self._counters.clear()
+                self._histograms.clear()
+            return snapshot
+
+
+def format_prometheus(snapshot: Snapshot, prefix: str = 'xpring') -> str:
+    """Format a snapshot in the Prometheus text exposition format."""
+    lines = []
+    for name, value in sorted(snapshot.counters.items()):
+        metric = f'{prefix}_{name}'.replace('.', '_')
+        lines.append(f'# TYPE {metric}_total counter')
+        lines.append(f'{metric}_total {value}')
+    for name, histogram in sorted(snapshot.histograms.items()):
+        metric = f'{prefix}_{name}'.replace('.', '_')
+        lines.append(f'# TYPE {metric} histogram')
+        cumulative = 0
+        for bound, count in histogram.buckets:
+            cumulative += count
+            le = '+Inf' if bound == float('inf') else f'{bound:.6g}'
+            lines.append(f'{metric}_bucket{{le="{le}"}} {cumulative}')
+        lines.append(f'{metric}_sum {histogram.sum}')
+        lines.append(f'{metric}_count {histogram.count}')
+    return '\n'.join(lines) + '\n'
@@ -1,11 +1,12 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import typing as t
 
 from xpring import hashes
 from xpring.types import (
     AccountId, Address, EncodedSeed, Seed, PrivateKey, PublicKey, Signature
 )
-from xpring.algorithms.signing import SigningAlgorithm
+from xpring.algorithms import secp256k1
+from xpring.algorithms.signing import SigningAlgorithm, Signer, Verifier
 from xpring.codec import DEFAULT_CODEC
 
 
@@ -21,29 +22,58 @@ class KeyPair:
     algorithm: SigningAlgorithm
     private_key: PrivateKey
     public_key: PublicKey
+    # Backend-native keys, expanded once at construction.
+    _signer: Signer = field(init=False, repr=False, compare=False)
+    _verifier: Verifier = field(init=False, repr=False, compare=False)
+    _account_id: t.Optional[AccountId] = field(
+        init=False, repr=False, compare=False, default=None
+    )
+
+    def __post_init__(self) -> None:
+        self._signer = self.algorithm.prepare_signer(self.private_key)
+        self._verifier = self.algorithm.prepare_verifier(self.public_key)
 
     @classmethod
     def from_encoded_seed(cls, encoded_seed: EncodedSeed) -> 'KeyPair':
         seed, algorithm = DEFAULT_CODEC.decode_seed(encoded_seed)
         private_key, public_key = algorithm.derive_key_pair(seed)
+        key_pair = cls(seed, algorithm, private_key, public_key)
         # TODO: Is this assertion necessary?
         message = b'The quick brown fox jumped over the lazy dog.'
-        signature = algorithm.sign(message, private_key)
-        if not algorithm.verify(message, signature, public_key):
+        signature = key_pair.sign(message)
+        if not key_pair.verify(message, signature):
             raise AssertionError('public key does not verify private key')
-        return cls(seed, algorithm, private_key, public_key)
+        return key_pair
+
+    @classmethod
+    def from_encoded_seed_family(
+        cls, encoded_seed: EncodedSeed, count: int, start: int = 0
+    ) -> t.List['KeyPair']:
+        """
+        Derive the key pairs for a range of account indices from one
+        secp256k1 seed.
+        """
+        seed, algorithm = DEFAULT_CODEC.decode_seed(encoded_seed)
+        if algorithm is not secp256k1:
+            raise ValueError('only secp256k1 seeds have account families')
+        return [
+            cls(seed, algorithm, private_key, public_key)
+            for private_key, public_key in
+            secp256k1.derive_key_pairs(seed, count, start)
+        ]
 
     @property
     def account_id(self) -> AccountId:
-        # TODO: cached_property?
-        return derive_account_id(self.public_key)
+        if self._account_id is None:
+            self._account_id = derive_account_id(self.public_key)
+        return self._account_id
 
     @property
     def address(self) -> Address:
         return DEFAULT_CODEC.encode_address(self.account_id)
 
     def sign(self, message: bytes) -> Signature:
-        return self.algorithm.sign(message, self.private_key)
+        return self._signer(message)
 
     def verify(self, message: bytes, signature: Signature) -> bool:
-        return self.algorithm.verify(message, signature, self.public_key)
+        return self._verifier(message, signature)
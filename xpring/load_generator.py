@@ -0,0 +1,210 @@
+"""
+Drive a client against a fake ledger and report throughput and latency.
+
+Run ``python -m xpring.load_generator`` to submit payments through
+:class:`~xpring.client.Client` (``--mode send``) or a
+:class:`~xpring.submission.SubmissionPipeline` (``--mode pipeline``), over
+gRPC on a local port or directly (``--transport direct``).
+"""
+
+import argparse
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+import importlib
+import time
+import typing as t
+
+import grpc
+from xpring import instrumentation
+from xpring.algorithms.signing import SigningAlgorithm
+from xpring.client import Client
+from xpring.fake_ledger import FakeLedger, serve
+from xpring.proto.v1.xrp_ledger_pb2_grpc import XRPLedgerAPIServiceStub
+from xpring.provisioning import provision_wallets
+from xpring.response_cache import ResponseCache
+from xpring.sequences import SequenceAllocator
+from xpring.submission import SubmissionPipeline
+from xpring.types import Address
+from xpring.wallet import Wallet
+
+MODES = ('send', 'pipeline')
+
+
+class LoadReport(t.NamedTuple):
+    elapsed: float
+    # Seconds per payment, sorted.
+    latencies: t.List[float]
+    # Payments by engine result.
+    results: t.Counter[str]
+
+    @property
+    def throughput(self) -> float:
+        """Payments per second."""
+        return len(self.latencies) / self.elapsed if self.elapsed else 0.0
+
+    def percentile(self, q: float) -> float:
+        if not self.latencies:
+            return 0.0
+        index = min(len(self.latencies) - 1, int(q * len(self.latencies)))
+        return self.latencies[index]
+
+
+def generate_load(
+    client: Client,
+    wallets: t.Sequence[Wallet],
+    destination: Address,
+    count: int,
+    concurrency: int = 16,
+    mode: str = 'send',
+    amount: str = '1000',
+) -> LoadReport:
+    """
+    Submit `count` payments from `wallets`, in turn, to `destination`.
+
+    In ``send`` mode, each payment is a call to :meth:`Client.send` and then
+    :meth:`Client.submit`, with `concurrency` payments at once. Latency is
+    measured from the start of the send. In ``pipeline`` mode, payments go
+    through a :class:`SubmissionPipeline`, and latency is measured from when
+    the pipeline takes the payment.
+    """
+    if mode not in MODES:
+        raise ValueError(f'unknown mode: {mode}')
+    latencies = []
+    results: t.Counter[str] = Counter()
+    start = time.perf_counter()
+
+    if mode == 'send':
+
+        def pay(i: int) -> t.Tuple[float, str]:
+            begin = time.perf_counter()
+            signed_transaction = client.send(
+                wallets[i % len(wallets)], destination, amount
+            )
+            response = client.submit(signed_transaction)
+            return time.perf_counter() - begin, response.engine_result.result
+
+        with ThreadPoolExecutor(concurrency) as executor:
+            for latency, result in executor.map(pay, range(count)):
+                latencies.append(latency)
+                results[result] += 1
+
+    else:
+        starts: t.Deque[float] = deque()
+
+        def payments():
+            for i in range(count):
+                starts.append(time.perf_counter())
+                yield {
+                    'Account': wallets[i % len(wallets)].address,
+                    'Amount': amount,
+                    'Destination': destination,
+                    'Flags': 0x80000000,
+                    'TransactionType': 'Payment',
+                }
+
+        with SubmissionPipeline(
+            client, wallets, concurrency=concurrency
+        ) as pipeline:
+            for submission in pipeline.submit(payments()):
+                latencies.append(time.perf_counter() - starts.popleft())
+                results[submission.result or submission.disposition.value] += 1
+
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return LoadReport(elapsed, latencies, results)
+
+
+def main(argv: t.Optional[t.Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--payments', type=int, default=1000)
+    parser.add_argument('--accounts', type=int, default=4)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--mode', choices=MODES, default='send')
+    parser.add_argument(
+        '--transport', choices=('grpc', 'direct'), default='grpc'
+    )
+    parser.add_argument(
+        '--algorithm', choices=('ed25519', 'secp256k1'), default='ed25519'
+    )
+    parser.add_argument(
+        '--latency',
+        type=float,
+        default=0.0,
+        help='seconds added to each RPC by the fake ledger',
+    )
+    parser.add_argument(
+        '--close-interval',
+        type=float,
+        default=1.0,
+        help='seconds between ledger closes',
+    )
+    args = parser.parse_args(argv)
+
+    algorithm = t.cast(
+        SigningAlgorithm,
+        importlib.import_module(f'xpring.algorithms.{args.algorithm}')
+    )
+    wallets = [
+        Wallet.from_seed(provisioned.encoded_seed)
+        for provisioned in provision_wallets(args.accounts + 1, algorithm)
+    ]
+    destination = wallets.pop().address
+    ledger = FakeLedger(
+        {wallet.address: 10**15 for wallet in wallets},
+        latency=args.latency,
+    )
+    ledger.fund(destination, ledger.reserve)
+
+    server = None
+    channel = None
+    grpc_client: t.Any = ledger
+    if args.transport == 'grpc':
+        server, port = serve(ledger, max_workers=args.concurrency)
+        channel = grpc.insecure_channel(f'localhost:{port}')
+        grpc_client = XRPLedgerAPIServiceStub(channel)
+    client = Client(grpc_client, ResponseCache(), SequenceAllocator())
+
+    recorder = instrumentation.MetricsRecorder()
+    previous = instrumentation.install(recorder)
+    ledger.start(args.close_interval)
+    try:
+        report = generate_load(
+            client,
+            wallets,
+            destination,
+            args.payments,
+            concurrency=args.concurrency,
+            mode=args.mode,
+        )
+    finally:
+        ledger.stop()
+        instrumentation.install(previous)
+        if channel is not None:
+            channel.close()
+        if server is not None:
+            server.stop(None)
+
+    print(
+        f'{len(report.latencies)} payments in {report.elapsed:.2f} s, '
+        f'{report.throughput:.0f}/s'
+    )
+    print(
+        'latency: ' + ', '.join(
+            f'p{round(q * 100)} {report.percentile(q) * 1000:.2f} ms'
+            for q in (0.5, 0.9, 0.99)
+        ) + f', max {report.latencies[-1] * 1000:.2f} ms'
+        if report.latencies else 'latency: -'
+    )
+    for result, count in report.results.most_common():
+        print(f'{result}: {count}')
+    snapshot = recorder.snapshot()
+    for name, histogram in sorted(snapshot.histograms.items()):
+        print(
+            f'{name}: {histogram.count} calls, '
+            f'mean {histogram.mean * 1000:.3f} ms, '
+            f'p99 {histogram.quantile(0.99) * 1000:.3f} ms'
+        )
+
+
+if __name__ == '__main__':
+    main()
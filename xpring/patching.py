@@ -0,0 +1,84 @@
+"""
+Edit serialized transactions without decoding them.
+
+Fields are located with the skippers of :mod:`xpring.serialization`, so
+that a transaction can be re-signed, or have its fee raised, by rewriting
+only the bytes that change.
+"""
+
+import typing as t
+
+from xpring.serialization import (
+    FIELDS_BY_ID,
+    FIELDS_BY_NAME,
+    Scanner,
+    deserialize_field_key,
+    serialize_field,
+    skip_field_value,
+)
+
+FieldLocation = t.Tuple[t.Any, int, int]
+
+
+def locate_fields(blob: bytes) -> t.List[FieldLocation]:
+    """
+    Locate the top-level fields of a serialized transaction.
+
+    Return a list of ``(field, start, end)`` where ``blob[start:end]`` holds
+    the field ID and value, without decoding any value.
+    """
+    scanner = Scanner(blob)
+    locations = []
+    while scanner:
+        start = scanner.cursor
+        field = FIELDS_BY_ID[deserialize_field_key(scanner)]
+        skip_field_value(field, scanner)
+        locations.append((field, start, scanner.cursor))
+    return locations
+
+
+def extract_signing_blob(blob: bytes) -> bytes:
+    """
+    Cut the non-signing fields (e.g. ``TxnSignature``) out of a serialized
+    transaction.
+
+    The result equals ``serialize_transaction(transaction, signing=True)``.
+    """
+    return b''.join(
+        blob[start:end]
+        for field, start, end in locate_fields(blob)
+        if field['isSigningField']
+    )
+
+
+def patch_transaction(blob: bytearray, values: t.Mapping[str, t.Any]) -> bytes:
+    """
+    Rewrite fields of a serialized transaction in place.
+
+    Fixed-width fields (e.g. ``Fee``, ``LastLedgerSequence``) are
+    overwritten without moving any other byte. Variable-length fields (e.g.
+    ``TxnSignature``) are spliced, and missing fields are inserted in
+    canonical order. Return the new signing blob, ready to be signed after
+    :data:`~xpring.serialization.PREFIX_TRANSACTION_SIGNATURE`.
+    """
+    pending = {}
+    for name, value in values.items():
+        field = FIELDS_BY_NAME[name]
+        if not field['isSerialized']:
+            raise ValueError(f'field {name} is not serialized')
+        pending[field['key']] = (field, value)
+    locations = locate_fields(blob)
+    edits = []
+    for field, start, end in locations:
+        if field['key'] in pending:
+            _, value = pending.pop(field['key'])
+            edits.append((start, end, field['key'], field, value))
+    for key, (field, value) in pending.items():
+        position = next(
+            (start for f, start, _ in locations if f['key'] > key), len(blob)
+        )
+        edits.append((position, position, key, field, value))
+    # Edit from the back so that earlier offsets stay valid.
+    for start, end, _, field, value in sorted(edits, reverse=True):
+        blob[start:end] = serialize_field(field, value)
+    return extract_signing_blob(blob)
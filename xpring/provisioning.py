@@ -0,0 +1,156 @@
+"""
+Generate wallets in bulk.
+
+Run ``python -m xpring.provisioning COUNT`` to write wallets as CSV records
+of encoded seed, address, and public key.
+"""
+
+import argparse
+from concurrent.futures import Executor, ProcessPoolExecutor
+import csv
+import importlib
+import os
+import random
+import secrets
+import sys
+import time
+import typing as t
+
+from xpring.algorithms import ed25519
+from xpring.algorithms.signing import SigningAlgorithm
+from xpring.codec import DEFAULT_CODEC
+from xpring.executors import imap_ordered
+from xpring.key_pair import derive_account_id
+from xpring.types import Address, EncodedSeed, PublicKey, Seed
+
+
+class ProvisionedWallet(t.NamedTuple):
+    encoded_seed: EncodedSeed
+    address: Address
+    public_key: PublicKey
+
+
+class Progress(t.NamedTuple):
+    done: int
+    total: int
+    elapsed: float
+
+    @property
+    def rate(self) -> float:
+        """Wallets per second."""
+        return self.done / self.elapsed if self.elapsed else 0.0
+
+
+SELF_TEST_MESSAGE = b'The quick brown fox jumped over the lazy dog.'
+
+
+def _provision_chunk(algorithm_name: str, count: int,
+                     self_test_rate: float) -> t.List[ProvisionedWallet]:
+    # Modules cannot be pickled, so workers import the algorithm by name.
+    algorithm = t.cast(
+        SigningAlgorithm, importlib.import_module(algorithm_name)
+    )
+    wallets = []
+    for _ in range(count):
+        seed = t.cast(Seed, secrets.token_bytes(16))
+        private_key, public_key = algorithm.derive_key_pair(seed)
+        if self_test_rate and random.random() < self_test_rate:
+            signature = algorithm.sign(SELF_TEST_MESSAGE, private_key)
+            if not algorithm.verify(SELF_TEST_MESSAGE, signature, public_key):
+                raise AssertionError('public key does not verify private key')
+        wallets.append(
+            ProvisionedWallet(
+                t.cast(EncodedSeed, DEFAULT_CODEC.encode_seed(seed, algorithm)),
+                DEFAULT_CODEC.encode_address(derive_account_id(public_key)),
+                public_key,
+            )
+        )
+    return wallets
+
+
+def provision_wallets(
+    count: int,
+    algorithm: SigningAlgorithm = ed25519,
+    executor: t.Optional[Executor] = None,
+    chunk_size: int = 256,
+    max_pending: int = 16,
+    self_test_rate: float = 0.0,
+    progress: t.Optional[t.Callable[[Progress], t.Any]] = None,
+) -> t.Iterator[ProvisionedWallet]:
+    """
+    Generate `count` wallets from secure random seeds.
+
+    With an executor (e.g. a process pool), chunks of wallets are derived in
+    parallel. Each wallet is self-tested (a signature is made and verified)
+    with probability `self_test_rate`. `progress` is called after every
+    chunk.
+    """
+    algorithm_name = t.cast(t.Any, algorithm).__name__
+    chunk_sizes = (
+        min(chunk_size, count - start)
+        for start in range(0, count, chunk_size)
+    )
+    wallets = imap_ordered(
+        executor,
+        _provision_chunk,
+        ((algorithm_name, size, self_test_rate) for size in chunk_sizes),
+        max_pending,
+    )
+    start = time.perf_counter()
+    done = 0
+    for wallet in wallets:
+        yield wallet
+        done += 1
+        if progress is not None and (done % chunk_size == 0 or done == count):
+            progress(Progress(done, count, time.perf_counter() - start))
+
+
+def write_wallets(wallets: t.Iterable[ProvisionedWallet], file: t.TextIO) -> int:
+    """Write wallets as CSV records. Return the number written."""
+    writer = csv.writer(file)
+    count = 0
+    for wallet in wallets:
+        writer.writerow(
+            (wallet.encoded_seed, wallet.address, wallet.public_key.hex().upper())
+        )
+        count += 1
+    return count
+
+
+def main(argv: t.Optional[t.Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('count', type=int)
+    parser.add_argument(
+        '--algorithm', choices=('ed25519', 'secp256k1'), default='ed25519'
+    )
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--self-test-rate', type=float, default=0.0)
+    parser.add_argument('--output', type=argparse.FileType('w'), default='-')
+    args = parser.parse_args(argv)
+
+    def report(progress: Progress) -> None:
+        print(
+            f'\r{progress.done}/{progress.total} wallets, '
+            f'{progress.rate:.0f}/s',
+            end='',
+            file=sys.stderr,
+        )
+
+    algorithm = t.cast(
+        SigningAlgorithm,
+        importlib.import_module(f'xpring.algorithms.{args.algorithm}')
+    )
+    with ProcessPoolExecutor(args.workers) as executor:
+        wallets = provision_wallets(
+            args.count,
+            algorithm,
+            executor=executor,
+            self_test_rate=args.self_test_rate,
+            progress=report,
+        )
+        write_wallets(wallets, args.output)
+    print(file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
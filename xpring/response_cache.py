@@ -0,0 +1,97 @@
+from collections import OrderedDict
+import threading
+import time
+import typing as t
+
+# Value, ledger index, and expiration time.
+Entry = t.Tuple[t.Any, int, float]
+
+
+class ResponseCache:
+    """
+    A cache of responses that describe ledger state, e.g. fees and account
+    info.
+
+    Each entry is stamped with the index of the ledger it was read from.
+    It expires `ttl` seconds after it is stored, or as soon as a later
+    ledger is observed, whichever comes first. The least recently used
+    entry is evicted beyond `capacity`.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 4.0,
+        capacity: int = 65536,
+        clock: t.Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.ttl = ttl
+        self.capacity = capacity
+        self.clock = clock
+        self.ledger_index = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._entries: 'OrderedDict[t.Hashable, Entry]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get(self, key: t.Hashable) -> t.Optional[t.Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (
+                entry[1] < self.ledger_index or entry[2] < self.clock()
+            ):
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(
+        self, key: t.Hashable, value: t.Any, ledger_index: int = 0
+    ) -> None:
+        with self._lock:
+            self.ledger_index = max(self.ledger_index, ledger_index)
+            self._entries[key] = (value, ledger_index, self.clock() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+
+    def update(
+        self, key: t.Hashable, function: t.Callable[[t.Any], t.Any]
+    ) -> bool:
+        """
+        Replace a live entry with ``function(value)``, keeping its ledger
+        and expiration. Return whether there was an entry to replace.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False
+            self._entries[key] = (function(entry[0]), entry[1], entry[2])
+            return True
+
+    def observe_ledger(self, ledger_index: int) -> None:
+        """Expire every entry read from a ledger before `ledger_index`."""
+        with self._lock:
+            self.ledger_index = max(self.ledger_index, ledger_index)
+
+    def invalidate(self, key: t.Hashable) -> None:
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
@@ -0,0 +1,153 @@
+"""
+Hand out account sequence numbers locally.
+
+A :class:`SequenceAllocator` lets one account keep many transactions in
+flight. It reads the sequence of each account from the network once,
+then counts up locally. The results of submissions tell it when to read
+again and which numbers were never used and must be filled.
+"""
+
+from dataclasses import dataclass, field
+import heapq
+import threading
+import typing as t
+
+from xpring.types import Address
+
+# Engine results that consume the sequence of a transaction, or will once
+# it is applied from the queue or held until its predecessors apply.
+CONSUMED = ('tes', 'tec')
+HELD = ('terQUEUED', 'terPRE_SEQ')
+# Engine results that mean the local sequence disagrees with the ledger.
+RESYNC = ('tefPAST_SEQ', 'terPRE_SEQ')
+
+
+@dataclass
+class AccountSequences:
+    # The next sequence never handed out.
+    next: int
+    # Handed out, awaiting a result.
+    in_flight: t.Set[int] = field(default_factory=set)
+    # Accepted by the server, but maybe not yet in the ledger.
+    accepted: t.Set[int] = field(default_factory=set)
+    # Released for reuse; a min-heap.
+    free: t.List[int] = field(default_factory=list)
+
+
+class SequenceAllocator:
+    """
+    Sequence numbers for transactions from many accounts, without a round
+    trip per transaction.
+
+    An account must be synchronized with its sequence on the ledger before
+    its first allocation, and again whenever :meth:`record` says so.
+    """
+
+    def __init__(self) -> None:
+        self._accounts: t.Dict[Address, AccountSequences] = {}
+        self._lock = threading.Lock()
+
+    def needs_sync(self, address: Address) -> bool:
+        return address not in self._accounts
+
+    def sync(self, address: Address, sequence: int) -> None:
+        """
+        Reconcile the local state of an account with its `sequence` on the
+        ledger.
+
+        Numbers below `sequence` are forgotten. Numbers from `sequence` up
+        that are neither in flight nor accepted are gaps, and they are
+        handed out again before any new number.
+        """
+        with self._lock:
+            account = self._accounts.get(address)
+            if account is None:
+                self._accounts[address] = AccountSequences(sequence)
+                return
+            account.next = max(account.next, sequence)
+            account.in_flight = {n for n in account.in_flight if n >= sequence}
+            account.accepted = {n for n in account.accepted if n >= sequence}
+            used = account.in_flight | account.accepted
+            account.free = [
+                n for n in range(sequence, account.next) if n not in used
+            ]
+            heapq.heapify(account.free)
+
+    def allocate(self, address: Address) -> int:
+        with self._lock:
+            account = self._accounts[address]
+            if account.free:
+                sequence = heapq.heappop(account.free)
+            else:
+                sequence = account.next
+                account.next += 1
+            account.in_flight.add(sequence)
+            return sequence
+
+    def allocate_gap(self, address: Address) -> t.Optional[int]:
+        """Allocate the lowest released sequence, if there is one."""
+        with self._lock:
+            account = self._accounts.get(address)
+            if account is None or not account.free:
+                return None
+            sequence = heapq.heappop(account.free)
+            account.in_flight.add(sequence)
+            return sequence
+
+    def in_flight(self, address: Address) -> t.Set[int]:
+        with self._lock:
+            account = self._accounts.get(address)
+            return set(account.in_flight) if account else set()
+
+    def release(self, address: Address, sequence: int) -> None:
+        """Return a sequence that no transaction will use."""
+        with self._lock:
+            account = self._accounts.get(address)
+            if account is not None and sequence in account.in_flight:
+                account.in_flight.remove(sequence)
+                heapq.heappush(account.free, sequence)
+
+    def record(
+        self,
+        address: Address,
+        sequence: int,
+        result: str,
+        retry: bool = False,
+    ) -> bool:
+        """
+        Record the engine result of a submitted transaction. If `retry`, the
+        same transaction will be submitted again, so a sequence it did not
+        use stays in flight.
+
+        Return whether the account must be synchronized again: when the
+        sequence is past, or it is held and no lower sequence is left to
+        submit.
+        """
+        with self._lock:
+            account = self._accounts.get(address)
+            if account is None:
+                return True
+            if sequence not in account.in_flight:
+                return result in RESYNC
+            used = result.startswith(CONSUMED) or result in HELD
+            if retry and not used and result not in RESYNC:
+                return False
+            account.in_flight.remove(sequence)
+            if used:
+                account.accepted.add(sequence)
+            elif result != 'tefPAST_SEQ':
+                # The transaction failed without using its sequence.
+                heapq.heappush(account.free, sequence)
+            if result == 'terPRE_SEQ':
+                # A lower sequence in flight or waiting for reuse explains
+                # the gap.
+                return not (
+                    any(n < sequence for n in account.in_flight) or
+                    (account.free and account.free[0] < sequence)
+                )
+            return result in RESYNC
+
+    def forget(self, address: Address) -> None:
+        """Synchronize the account again before its next allocation."""
+        with self._lock:
+            self._accounts.pop(address, None)
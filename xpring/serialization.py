@@ -8,10 +8,12 @@ from decimal import getcontext, Decimal
 import json
 import pkg_resources
 import re
+import time
 import typing as t
 
 import typing_extensions as tex
 
+from xpring import instrumentation
 from xpring.bits import from_bytes, to_bytes
 from xpring.codec import DEFAULT_CODEC
 from xpring.types import AccountId, Address, Amount, NonXrpAmount, Transaction
@@ -42,6 +44,45 @@ def field_id(type_code, field_code):
     return to_bytes(type_code << 8 | field_code, 3)
 
 
+class Sink(tex.Protocol):
+    """
+    A destination for serialized bytes.
+
+    Binary files and :class:`io.BytesIO` are sinks already. Use
+    :class:`ByteArraySink` to collect bytes in a (reusable) buffer and
+    :class:`HasherSink` to feed them to a running hash.
+    """
+
+    def write(self, bites: bytes) -> t.Any:
+        ...
+
+
+class ByteArraySink:
+
+    def __init__(self, buffer: t.Optional[bytearray] = None) -> None:
+        self.buffer = bytearray() if buffer is None else buffer
+        self.write = self.buffer.extend
+
+
+class HasherSink:
+
+    def __init__(self, hasher) -> None:
+        self.hasher = hasher
+        self.write = hasher.update
+
+
+class CountingSink:
+    """Counts the bytes written through it to another sink."""
+
+    def __init__(self, sink: Sink) -> None:
+        self.sink = sink
+        self.count = 0
+
+    def write(self, bites: bytes) -> None:
+        self.count += len(bites)
+        self.sink.write(bites)
+
+
 def vl_encode(blob: bytes) -> bytes:
     """
     Encode a variable length type.
@@ -53,7 +94,11 @@ def vl_encode(blob: bytes) -> bytes:
     <= 12480 bytes: prefix is 2 bytes
     <= 192 bytes: prefix is 1 byte
     """
-    length = len(blob)
+    return vl_encode_length(len(blob)) + blob
+
+
+def vl_encode_length(length: int) -> bytes:
+    """Encode the length prefix of a variable length type."""
     if length > 918744:
         raise ValueError(
             'variable length field must not be longer than 918744 bytes'
@@ -64,7 +109,7 @@ def vl_encode(blob: bytes) -> bytes:
         prefix = to_bytes(length - 193 + (193 << 8), 2)
     else:
         prefix = bytes([length])
-    return prefix + blob
+    return prefix
 
 
 def serialize_account_id(address: str) -> bytes:
@@ -158,15 +203,27 @@ def serialize_amount_non_xrp(value: str) -> bytes:
 
 def serialize_array(array: t.Iterable) -> bytes:
     """Serialize an array of objects."""
-    return b''.join(
-        serialize_object(item, terminate=False) for item in array
-    ) + ARRAY_END_MARKER
+    sink = ByteArraySink()
+    serialize_array_into(sink, array)
+    return bytes(sink.buffer)
+
+
+def serialize_array_into(sink: Sink, array: t.Iterable) -> None:
+    for item in array:
+        serialize_object_into(sink, item, terminate=False)
+    sink.write(ARRAY_END_MARKER)
 
 
 def serialize_blob(blob_hex: str) -> bytes:
     return vl_encode(bytes.fromhex(blob_hex))
 
 
+def serialize_blob_into(sink: Sink, blob_hex: str) -> None:
+    blob = bytes.fromhex(blob_hex)
+    sink.write(vl_encode_length(len(blob)))
+    sink.write(blob)
+
+
 # ISO 4217 3-character currency code
 CURRENCY_CODE_PATTERN = re.compile(r'^[][A-Za-z0-9?!@#$%^&*<>(){}|]{3}$')
 HEX_160_PATTERN = re.compile(r'^[0-9a-fA-F]{40}$')
@@ -212,6 +269,22 @@ def serialize_field(field, value):
     return id_bytes + value_bytes
 
 
+def serialize_field_into(sink: Sink, field, value) -> None:
+    serialize_into = field['serialize_into']
+    if serialize_into is None:
+        sink.write(serialize_field(field, value))
+        return
+    sink.write(field['id'])
+    try:
+        serialize_into(sink, value)
+    except ValueError as cause:
+        field_type = field['type']
+        field_name = field['name']
+        raise ValueError(
+            f'field {field_name} ({field_type}): {str(cause)}'
+        ) from cause
+
+
 def serialize_hash(bits: int, digest: str) -> bytes:
     blob = bytes.fromhex(digest)
     if len(blob) * 8 != bits:
@@ -247,6 +320,23 @@ def field_key(field):
 def serialize_object(
     object_: t.Mapping, signing: bool = False, terminate: bool = True
 ) -> bytes:
+    sink = ByteArraySink()
+    serialize_object_into(sink, object_, signing=signing, terminate=terminate)
+    return bytes(sink.buffer)
+
+
+def serialize_object_into(
+    sink: Sink,
+    object_: t.Mapping,
+    signing: bool = False,
+    terminate: bool = True,
+) -> None:
+    """
+    Serialize an object into a sink.
+
+    Nested objects, arrays, and blobs are written piecewise, without first
+    being joined into intermediate byte strings.
+    """
     fields = [FIELDS_BY_NAME[name] for name in object_.keys()]
     fields = [
         field for field in fields
@@ -254,12 +344,10 @@ def serialize_object(
     ]
     fields = sorted(fields, key=field_key)
 
-    blob = bytearray()
     for field in fields:
-        blob.extend(serialize_field(field, object_[field['name']]))
+        serialize_field_into(sink, field, object_[field['name']])
     if terminate:
-        blob.extend(OBJECT_END_MARKER)
-    return bytes(blob)
+        sink.write(OBJECT_END_MARKER)
 
 
 def serialize_path(path: t.Collection) -> bytes:
@@ -295,7 +383,27 @@ def serialize_step(step: t.Mapping) -> bytes:
 def serialize_transaction(
     transaction: Transaction, signing: bool = False
 ) -> bytes:
-    return serialize_object(transaction, signing=signing, terminate=False)
+    sink = ByteArraySink()
+    serialize_transaction_into(sink, transaction, signing=signing)
+    return bytes(sink.buffer)
+
+
+def serialize_transaction_into(
+    sink: Sink, transaction: Transaction, signing: bool = False
+) -> None:
+    recorder = instrumentation.recorder
+    if recorder is None:
+        serialize_object_into(
+            sink, transaction, signing=signing, terminate=False
+        )
+        return
+    counter = CountingSink(sink)
+    start = time.perf_counter()
+    serialize_object_into(
+        counter, transaction, signing=signing, terminate=False
+    )
+    recorder.observe('serialize.seconds', time.perf_counter() - start)
+    recorder.increment('serialize.bytes', counter.count)
 
 
 def serialize_transaction_type(name: str) -> bytes:
@@ -328,6 +436,61 @@ def serialize_vector256(digests: t.Iterable[str]) -> bytes:
     return vl_encode(blob)
 
 
+class TransactionTemplate:
+    """
+    A transaction whose constant fields are serialized once.
+
+    Fields named in `variables` are left as slots that are serialized anew
+    for each transaction. ``TxnSignature`` is always a slot. Every other
+    field takes its value from `constants`.
+    """
+
+    def __init__(
+        self, constants: Transaction, variables: t.Iterable[str]
+    ) -> None:
+        self.variables = frozenset(variables) | {'TxnSignature'}
+        names = self.variables | constants.keys()
+        fields = [FIELDS_BY_NAME[name] for name in names]
+        fields = sorted(
+            (field for field in fields if field['isSerialized']),
+            key=field_key
+        )
+        self._segments = self._compile(fields, constants)
+        self._signing_segments = self._compile(
+            [field for field in fields if field['isSigningField']], constants
+        )
+
+    def _compile(self, fields: t.Iterable, constants: Transaction) -> t.List:
+        """Merge each run of constant fields into one pre-encoded segment."""
+        segments: t.List[t.Any] = []
+        for field in fields:
+            if field['name'] in self.variables:
+                segments.append(field)
+                continue
+            blob = serialize_field(field, constants[field['name']])
+            if segments and isinstance(segments[-1], bytes):
+                segments[-1] += blob
+            else:
+                segments.append(blob)
+        return segments
+
+    def serialize(self, values: t.Mapping, signing: bool = False) -> bytes:
+        """
+        Serialize a transaction from the values of the variable fields.
+
+        A variable field missing from `values` is omitted, just as
+        :func:`serialize_object` omits fields missing from its object.
+        """
+        segments = self._signing_segments if signing else self._segments
+        blob = bytearray()
+        for segment in segments:
+            if isinstance(segment, bytes):
+                blob.extend(segment)
+            elif segment['name'] in values:
+                blob.extend(serialize_field(segment, values[segment['name']]))
+        return bytes(blob)
+
+
 class Scanner:
 
     def __init__(self, stream: bytes) -> None:
@@ -370,6 +533,11 @@ def vl_decode(scanner: Scanner) -> bytes:
 
     https://xrpl.org/serialization.html#length-prefixing
     """
+    return scanner.take(vl_decode_length(scanner))
+
+
+def vl_decode_length(scanner: Scanner) -> int:
+    """Return the next length prefix while advancing the cursor."""
     byte1 = scanner.take1()
     if byte1 < 193:
         length = byte1
@@ -382,7 +550,7 @@ def vl_decode(scanner: Scanner) -> bytes:
         length = 12481 + (byte1 - 241) * 645536 + byte2 * 256 + byte3
     else:
         raise ValueError(f'not a length prefix: {byte1}')
-    return scanner.take(length)
+    return length
 
 
 def deserialize_account_id(scanner: Scanner) -> Address:
@@ -462,8 +630,11 @@ def deserialize_currency(scanner: Scanner) -> str:
 
 
 def deserialize_field(scanner: Scanner) -> t.Tuple[str, t.Any]:
-    type_code, field_code = deserialize_field_key(scanner)
-    field = FIELDS_BY_ID[(type_code, field_code)]
+    field = FIELDS_BY_ID[deserialize_field_key(scanner)]
+    return (field['name'], deserialize_field_value(field, scanner))
+
+
+def deserialize_field_value(field, scanner: Scanner) -> t.Any:
     deserialize = field['deserialize']
     if deserialize is None:
         field_name = field['name']
@@ -471,8 +642,7 @@ def deserialize_field(scanner: Scanner) -> t.Tuple[str, t.Any]:
         raise NotImplementedError(
             f'cannot deserialize field {field_name} ({field_type})'
         )
-    value = deserialize(scanner)
-    return (field['name'], value)
+    return deserialize(scanner)
 
 
 TypeCode = t.NewType('TypeCode', int)
@@ -511,11 +681,22 @@ def deserialize_ledger_entry_type(scanner: Scanner) -> str:
     return LEDGER_ENTRY_TYPES_BY_CODE[type_code]
 
 
-def deserialize_object(scanner: Scanner) -> t.Mapping:
+def deserialize_object(
+    scanner: Scanner, only: t.Optional[t.Container[str]] = None
+) -> t.Mapping:
+    """
+    Deserialize an object.
+
+    If `only` is given, then only the named fields are deserialized.
+    Every other field is skipped without decoding its value.
+    """
     object_ = {}
     while scanner.peek(1) != OBJECT_END_MARKER:
-        key, value = deserialize_field(scanner)
-        object_[key] = value
+        field = FIELDS_BY_ID[deserialize_field_key(scanner)]
+        if only is None or field['name'] in only:
+            object_[field['name']] = deserialize_field_value(field, scanner)
+        else:
+            skip_field_value(field, scanner)
     scanner.skip(1)
     return object_
 
@@ -569,9 +750,11 @@ def deserialize_step(scanner: Scanner) -> Step:
     return step
 
 
-def deserialize_transaction(scanner: Scanner) -> Transaction:
+def deserialize_transaction(
+    scanner: Scanner, fields: t.Optional[t.Container[str]] = None
+) -> Transaction:
     scanner.extend(OBJECT_END_MARKER)
-    return deserialize_object(scanner)
+    return deserialize_object(scanner, only=fields)
 
 
 def deserialize_transaction_type(scanner: Scanner) -> str:
@@ -609,6 +792,68 @@ def deserialize_vector256(scanner: Scanner) -> t.List[str]:
     return digests
 
 
+def skip_amount(scanner: Scanner) -> None:
+    # Most-significant bit is the format bit. 1 means "is not XRP".
+    if scanner.bite() & (1 << 7):
+        # 64 bits of value, 160 bits of currency, 160 bits of issuer.
+        scanner.skip(48)
+    else:
+        scanner.skip(8)
+
+
+def skip_array(scanner: Scanner) -> None:
+    while scanner.peek(1) != ARRAY_END_MARKER:
+        skip_field(scanner)
+    scanner.skip(1)
+
+
+def skip_field(scanner: Scanner) -> None:
+    field = FIELDS_BY_ID[deserialize_field_key(scanner)]
+    skip_field_value(field, scanner)
+
+
+def skip_field_value(field, scanner: Scanner) -> None:
+    skip = field['skip']
+    if skip is None:
+        field_name = field['name']
+        field_type = field['type']
+        raise NotImplementedError(
+            f'cannot skip field {field_name} ({field_type})'
+        )
+    skip(scanner)
+
+
+def skip_fixed(bits: int) -> t.Callable[[Scanner], None]:
+
+    def skip(scanner: Scanner) -> None:
+        scanner.skip(bits // 8)
+
+    return skip
+
+
+def skip_object(scanner: Scanner) -> None:
+    while scanner.peek(1) != OBJECT_END_MARKER:
+        skip_field(scanner)
+    scanner.skip(1)
+
+
+def skip_pathset(scanner: Scanner) -> None:
+    while True:
+        type_byte = scanner.take1()
+        if type_byte == PATHSET_END_MARKER[0]:
+            return
+        if type_byte == PATH_END_MARKER[0]:
+            continue
+        # Each of account, currency, and issuer is 160 bits.
+        for flag in (0x01, 0x10, 0x20):
+            if type_byte & flag:
+                scanner.skip(20)
+
+
+def skip_vl(scanner: Scanner) -> None:
+    scanner.skip(vl_decode_length(scanner))
+
+
 CODECS = {
     'AccountID': (serialize_account_id, deserialize_account_id),
     'Amount': (serialize_amount, deserialize_amount),
@@ -626,6 +871,31 @@ CODECS = {
     'Vector256': (serialize_vector256, deserialize_vector256),
 }
 
+# Types that can be written piecewise into a sink.
+# Every other type is written whole.
+SERIALIZERS_INTO = {
+    'Blob': serialize_blob_into,
+    'STArray': serialize_array_into,
+    'STObject': serialize_object_into,
+}
+
+SKIPPERS = {
+    'AccountID': skip_vl,
+    'Amount': skip_amount,
+    'Blob': skip_vl,
+    'Hash128': skip_fixed(128),
+    'Hash160': skip_fixed(160),
+    'Hash256': skip_fixed(256),
+    'PathSet': skip_pathset,
+    'STArray': skip_array,
+    'STObject': skip_object,
+    'UInt8': skip_fixed(8),
+    'UInt16': skip_fixed(16),
+    'UInt32': skip_fixed(32),
+    'UInt64': skip_fixed(64),
+    'Vector256': skip_vl,
+}
+
 # TODO: Consider lazy initialization.
 _DEFINITIONS = json.load(
     pkg_resources.resource_stream('xpring', 'definitions.json')
@@ -649,6 +919,8 @@ for field_name, field in FIELDS_BY_NAME.items():
         field['key'] = (type_code, field_code)
         field['id'] = field_id(type_code, field_code)
         field['serialize'], field['deserialize'] = CODECS[type_name]
+        field['serialize_into'] = SERIALIZERS_INTO.get(type_name)
+        field['skip'] = SKIPPERS[type_name]
 FIELDS_BY_NAME['TransactionType']['serialize'] = serialize_transaction_type
 FIELDS_BY_NAME['TransactionType']['deserialize'] = deserialize_transaction_type
 FIELDS_BY_NAME['LedgerEntryType']['serialize'] = serialize_ledger_entry_type
@@ -0,0 +1,123 @@
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+import itertools
+import os
+import typing as t
+import uuid
+
+from xpring.algorithms import SIGNING_ALGORITHMS
+from xpring.executors import imap_ordered
+from xpring.key_pair import KeyPair
+from xpring.types import Address, PrivateKey, PublicKey, Seed, Transaction
+from xpring.wallet import Wallet
+
+SignedBlob = t.Tuple[bytes, bytes]
+# A key pair as sent to a worker process, with its algorithm as an index
+# into SIGNING_ALGORITHMS. The keys are sent because the seed alone does not
+# give back the children of an account family.
+KeyMaterial = t.Tuple[Seed, int, PrivateKey, PublicKey]
+
+# Wallets by pool, then by address.
+# In a worker process, the keyring of its pool is loaded once, at startup.
+_KEYRINGS: t.Dict[str, t.Dict[Address, Wallet]] = {}
+
+
+def _dump_key_pair(key_pair: KeyPair) -> KeyMaterial:
+    return (
+        key_pair.seed,
+        SIGNING_ALGORITHMS.index(key_pair.algorithm),
+        key_pair.private_key,
+        key_pair.public_key,
+    )
+
+
+def _load_keyring(token: str, key_pairs: t.Iterable[KeyMaterial]) -> None:
+    wallets = (
+        Wallet(
+            KeyPair(
+                seed, SIGNING_ALGORITHMS[algorithm], private_key, public_key
+            )
+        ) for seed, algorithm, private_key, public_key in key_pairs
+    )
+    _KEYRINGS[token] = {wallet.address: wallet for wallet in wallets}
+
+
+def _sign_chunk(token: str,
+                transactions: t.Iterable[Transaction]) -> t.List[SignedBlob]:
+    keyring = _KEYRINGS[token]
+    results = []
+    for transaction in transactions:
+        try:
+            wallet = keyring[transaction['Account']]
+        except KeyError:
+            account = transaction.get('Account')
+            raise ValueError(f'no wallet for account {account}') from None
+        results.append(wallet.sign_transaction_blob(transaction))
+    return results
+
+
+class SigningPool:
+    """
+    Sign transactions in parallel.
+
+    Each transaction is signed by the wallet whose address matches its
+    ``Account``. By default, the wallets are loaded once into each process
+    of a process pool. Pass ``threads=True`` to use a thread pool instead,
+    which pays off only when the signing backend releases the GIL.
+    """
+
+    def __init__(
+        self,
+        wallets: t.Iterable[Wallet],
+        max_workers: t.Optional[int] = None,
+        threads: bool = False,
+        chunk_size: int = 64,
+        max_pending: t.Optional[int] = None,
+    ) -> None:
+        self.token = uuid.uuid4().hex
+        wallets = list(wallets)
+        self.executor: Executor
+        if threads:
+            _KEYRINGS[self.token] = {wallet.address: wallet for wallet in wallets}
+            self.executor = ThreadPoolExecutor(max_workers)
+        else:
+            key_pairs = [_dump_key_pair(wallet.key_pair) for wallet in wallets]
+            self.executor = ProcessPoolExecutor(
+                max_workers,
+                initializer=_load_keyring,
+                initargs=(self.token, key_pairs),
+            )
+        self.chunk_size = chunk_size
+        if max_pending is None:
+            max_pending = 2 * (max_workers or os.cpu_count() or 1)
+        self.max_pending = max_pending
+
+    def sign(self,
+             transactions: t.Iterable[Transaction]) -> t.Iterator[SignedBlob]:
+        """
+        Yield the serialized form and hash of each signed transaction,
+        in order.
+
+        At most `max_pending` chunks of `chunk_size` transactions are in
+        flight at once. `transactions` is consumed only as fast as results
+        are consumed.
+        """
+        iterator = iter(transactions)
+        chunks = iter(
+            lambda: list(itertools.islice(iterator, self.chunk_size)), []
+        )
+        return imap_ordered(
+            self.executor,
+            _sign_chunk,
+            ((self.token, chunk) for chunk in chunks),
+            self.max_pending,
+        )
+
+    def close(self) -> None:
+        self.executor.shutdown()
+        _KEYRINGS.pop(self.token, None)
+
+    def __enter__(self) -> 'SigningPool':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
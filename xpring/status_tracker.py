@@ -0,0 +1,223 @@
+"""
+Wait for many transactions to be validated.
+
+A :class:`StatusTracker` polls transactions in rounds. A round runs only
+after a ledger closes, since a transaction cannot be validated any sooner,
+and it checks at most `batch_size` transactions. Each transaction backs off
+by a doubling number of ledgers while it stays pending. The request rate
+is thus bounded by the ledger close rate, however many transactions are
+tracked.
+"""
+
+from concurrent.futures import Executor, Future
+from dataclasses import dataclass
+import heapq
+import logging
+import threading
+import time
+import typing as t
+
+import grpc
+from xpring.client import Client, transaction_status
+from xpring.types import DigestLike, TransactionStatus, to_digest
+
+# The validated ledger trails the open ledger. A transaction is expired
+# only once the open ledger is this far past its LastLedgerSequence.
+EXPIRY_MARGIN = 2
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TrackedTransaction:
+    txid: bytes
+    future: 'Future[TransactionStatus]'
+    last_ledger_sequence: t.Optional[int]
+    # Check again once this ledger is open.
+    next_ledger: int = 0
+    # Ledgers to wait between checks.
+    delay: int = 1
+
+
+class StatusTracker:
+    """
+    Resolve a future for each tracked transaction once it is validated, or
+    once it expires.
+
+    Call :meth:`poll` to run a round, or :meth:`start` to run rounds in a
+    background thread. Checks in a round run on `executor`, if given.
+    """
+
+    def __init__(
+        self,
+        client: Client,
+        executor: t.Optional[Executor] = None,
+        batch_size: int = 256,
+        max_delay: int = 8,
+        ledger_interval: float = 3.5,
+        clock: t.Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.client = client
+        self.executor = executor
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        # Estimated seconds between ledger closes.
+        self.ledger_interval = ledger_interval
+        self.clock = clock
+        self.ledger_index = 0
+        self.rounds = 0
+        self.requests = 0
+        self._ledger_time = 0.0
+        self._tracked: t.Dict[bytes, TrackedTransaction] = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: t.Optional[threading.Thread] = None
+
+    def __len__(self) -> int:
+        return len(self._tracked)
+
+    def track(
+        self,
+        txid: DigestLike,
+        last_ledger_sequence: t.Optional[int] = None,
+    ) -> 'Future[TransactionStatus]':
+        """
+        Return a future for the final status of a transaction: succeeded,
+        failed, or expired. A transaction without a `last_ledger_sequence`
+        never expires.
+        """
+        txid = to_digest(txid)
+        with self._lock:
+            tracked = self._tracked.get(txid)
+            if tracked is None:
+                tracked = TrackedTransaction(
+                    txid, Future(), last_ledger_sequence,
+                    self.ledger_index + 1
+                )
+                self._tracked[txid] = tracked
+            return tracked.future
+
+    def track_transaction(
+        self, signed_transaction: t.Mapping
+    ) -> 'Future[TransactionStatus]':
+        return self.track(
+            signed_transaction['hash'],
+            signed_transaction.get('LastLedgerSequence'),
+        )
+
+    def _observe_ledger(self, ledger_index: int) -> bool:
+        """Update the ledger interval estimate. Return whether it is new."""
+        now = self.clock()
+        if ledger_index <= self.ledger_index:
+            return False
+        if self.ledger_index:
+            interval = (now - self._ledger_time) / (
+                ledger_index - self.ledger_index
+            )
+            self.ledger_interval += 0.2 * (interval - self.ledger_interval)
+        self.ledger_index = ledger_index
+        self._ledger_time = now
+        return True
+
+    def _check(self, tracked: TrackedTransaction) -> TransactionStatus:
+        try:
+            response = self.client.get_transaction(tracked.txid)
+        except grpc.RpcError as error:
+            if error.code() != grpc.StatusCode.NOT_FOUND:
+                # Try again next time.
+                return TransactionStatus.PENDING
+        else:
+            if response.validated:
+                return transaction_status(response)
+        if (
+            tracked.last_ledger_sequence is not None and
+            self.ledger_index > tracked.last_ledger_sequence + EXPIRY_MARGIN
+        ):
+            return TransactionStatus.EXPIRED
+        return TransactionStatus.PENDING
+
+    def poll(self) -> int:
+        """
+        Run one round, if a ledger has closed since the last. Return the
+        number of transactions resolved.
+        """
+        fees = self.client.get_fee()
+        if not self._observe_ledger(fees.ledger_current_index):
+            return 0
+        self.rounds += 1
+        with self._lock:
+            cancelled = [
+                txid for txid, tracked in self._tracked.items()
+                if tracked.future.cancelled()
+            ]
+            for txid in cancelled:
+                del self._tracked[txid]
+            due = heapq.nsmallest(
+                self.batch_size,
+                (
+                    tracked for tracked in self._tracked.values()
+                    if tracked.next_ledger <= self.ledger_index
+                ),
+                key=lambda tracked: tracked.next_ledger,
+            )
+        self.requests += len(due)
+        if self.executor is None:
+            statuses: t.Iterable[TransactionStatus] = map(self._check, due)
+        else:
+            statuses = self.executor.map(self._check, due)
+        resolved = 0
+        for tracked, status in zip(due, statuses):
+            if status is TransactionStatus.PENDING:
+                tracked.next_ledger = self.ledger_index + tracked.delay
+                tracked.delay = min(2 * tracked.delay, self.max_delay)
+                continue
+            with self._lock:
+                del self._tracked[tracked.txid]
+            # The caller may have cancelled the future.
+            if tracked.future.set_running_or_notify_cancel():
+                tracked.future.set_result(status)
+                resolved += 1
+        return resolved
+
+    def start(self) -> None:
+        """Run rounds in a background thread until :meth:`close`."""
+        if self._thread is not None:
+            raise RuntimeError('the status tracker is already running')
+
+        def run():
+            while True:
+                try:
+                    self.poll()
+                except grpc.RpcError:
+                    pass
+                except Exception:  # pylint: disable=broad-except
+                    logger.exception('status tracker round failed')
+                # Wake up around the next ledger close, or soon after if it
+                # is late.
+                expected = self._ledger_time + self.ledger_interval
+                delay = max(
+                    expected - self.clock(), self.ledger_interval / 8
+                )
+                if self._stopped.wait(delay):
+                    return
+
+        self._stopped.clear()
+        self._thread = threading.Thread(target=run, daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        """Stop polling, and cancel the futures still pending."""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        with self._lock:
+            for tracked in self._tracked.values():
+                tracked.future.cancel()
+            self._tracked.clear()
+
+    def __enter__(self) -> 'StatusTracker':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
@@ -0,0 +1,297 @@
+"""
+Sign and submit transactions in bulk.
+
+A :class:`SubmissionPipeline` fills in the fee and sequence of each
+transaction, signs it, and submits it, with many submissions in flight at
+once. Each engine result is classified to decide whether to stop, submit
+again, or sign again.
+"""
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import enum
+import time
+import typing as t
+
+import grpc
+from xpring.call_policy import RETRY_CODES
+from xpring.client import FEE_KEY, Client
+from xpring.executors import imap_ordered
+from xpring.proto.v1.submit_pb2 import SubmitTransactionResponse
+from xpring.sequences import HELD
+from xpring.signing_pool import SigningPool
+from xpring.types import Address, Transaction
+from xpring.wallet import Wallet
+
+
+class Disposition(enum.Enum):
+    # The transaction was applied to the open ledger.
+    ACCEPTED = 'accepted'
+    # The transaction was queued, or held until its predecessors apply. It
+    # is not applied yet, and may never be. Look it up by hash.
+    HELD = 'held'
+    # The transaction can never succeed as submitted.
+    FAILED = 'failed'
+    # The same transaction may succeed later.
+    RETRY = 'retry'
+    # The transaction needs a fresh sequence or fee.
+    RESIGN = 'resign'
+    # The transaction may have been applied already. Look it up by hash.
+    UNCERTAIN = 'uncertain'
+
+
+# Dispositions after which a transaction is not submitted again.
+FINAL = frozenset((
+    Disposition.ACCEPTED,
+    Disposition.HELD,
+    Disposition.FAILED,
+    Disposition.UNCERTAIN,
+))
+
+RESIGN_RESULTS = frozenset(('tefPAST_SEQ', 'telINSUF_FEE_P'))
+
+
+def classify(result: str) -> Disposition:
+    """Classify an engine result, e.g. ``'tesSUCCESS'``."""
+    if result.startswith('tes'):
+        return Disposition.ACCEPTED
+    if result in HELD:
+        return Disposition.HELD
+    if result in RESIGN_RESULTS:
+        return Disposition.RESIGN
+    if result.startswith(('ter', 'tel')):
+        return Disposition.RETRY
+    return Disposition.FAILED
+
+
+class Submission(t.NamedTuple):
+    # The transaction as given.
+    transaction: Transaction
+    # The identifier of the last transaction submitted for it.
+    hash: bytes
+    response: t.Optional[SubmitTransactionResponse]
+    disposition: Disposition
+    attempts: int
+    error: t.Optional[grpc.RpcError] = None
+
+    @property
+    def result(self) -> t.Optional[str]:
+        if self.response is None:
+            return None
+        return self.response.engine_result.result
+
+
+class SubmissionPipeline:
+    """
+    Sign and submit many transactions, at most `concurrency` at once.
+
+    The fee and sequence of a transaction are filled in when they are
+    missing. Sequences come from the sequence allocator of the client.
+    Transactions are signed in the calling thread, or by `signing_pool`
+    if given. Up to `max_pending` transactions are queued for submission
+    ahead of the slowest one in flight.
+
+    A transaction is submitted again, after an exponential backoff from
+    `retry_delay`, until it is accepted, fails, or has been submitted
+    `max_attempts` times. If it needs a new fee or sequence that the
+    pipeline filled in, it is signed again. When a transaction fails
+    without using its sequence, a no-op transaction takes the sequence so
+    that the transactions after it can apply.
+    """
+
+    def __init__(
+        self,
+        client: Client,
+        wallets: t.Iterable[Wallet],
+        concurrency: int = 16,
+        max_pending: t.Optional[int] = None,
+        max_attempts: int = 5,
+        retry_delay: float = 0.5,
+        signing_pool: t.Optional[SigningPool] = None,
+    ) -> None:
+        self.client = client
+        self.wallets: t.Dict[Address, Wallet] = {
+            wallet.address: wallet for wallet in wallets
+        }
+        self.executor = ThreadPoolExecutor(concurrency)
+        if max_pending is None:
+            max_pending = 4 * concurrency
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.signing_pool = signing_pool
+
+    def _wallet(self, transaction: Transaction) -> Wallet:
+        try:
+            return self.wallets[transaction['Account']]
+        except KeyError:
+            account = transaction.get('Account')
+            raise ValueError(f'no wallet for account {account}') from None
+
+    def _prepare(self, transaction: Transaction) -> Transaction:
+        """Fill in the fee and sequence, if missing."""
+        prepared = dict(transaction)
+        if 'Fee' not in prepared:
+            fees = self.client.get_fee()
+            prepared['Fee'] = str(fees.fee.minimum_fee.drops)
+        if 'Sequence' not in prepared:
+            if self.client.sequences is None:
+                raise ValueError(
+                    'filling in sequences needs a client with a sequence '
+                    'allocator'
+                )
+            prepared['Sequence'] = self.client.allocate_sequence(
+                prepared['Account']
+            )
+        return prepared
+
+    def _sign(
+        self, transactions: t.Iterable[Transaction]
+    ) -> t.Iterator[t.Tuple[Transaction, Transaction, bytes, bytes]]:
+        """
+        Yield each transaction as given and as prepared, with its serialized
+        signed form and hash, in order.
+        """
+        queue: t.Deque[t.Tuple[Transaction, Transaction]] = deque()
+
+        def prepare_all():
+            for transaction in transactions:
+                prepared = self._prepare(transaction)
+                queue.append((transaction, prepared))
+                yield prepared
+
+        if self.signing_pool is None:
+            signed = (
+                self._wallet(prepared).sign_transaction_blob(prepared)
+                for prepared in prepare_all()
+            )
+        else:
+            signed = self.signing_pool.sign(prepare_all())
+        for blob, txid in signed:
+            transaction, prepared = queue.popleft()
+            yield transaction, prepared, blob, txid
+
+    def _reconsider(
+        self, result: str, transaction: Transaction, resubmitted: bool
+    ) -> Disposition:
+        """
+        Decide whether a transaction that needs a new fee or sequence can
+        be signed again.
+        """
+        if result == 'telINSUF_FEE_P':
+            if 'Fee' in transaction:
+                # The load on the server may drop.
+                return Disposition.RETRY
+            if self.client.cache is not None:
+                self.client.cache.invalidate(FEE_KEY)
+            return Disposition.RESIGN
+        if resubmitted:
+            # The sequence may be past because this very blob was applied.
+            return Disposition.UNCERTAIN
+        if 'Sequence' in transaction:
+            return Disposition.FAILED
+        return Disposition.RESIGN
+
+    def _submit(
+        self,
+        transaction: Transaction,
+        prepared: Transaction,
+        blob: bytes,
+        txid: bytes,
+        fill_gaps: bool = True,
+    ) -> t.List[Submission]:
+        attempts = 0
+        # Whether this blob was submitted before, and so may be applied.
+        resubmitted = False
+        while True:
+            attempts += 1
+            response = None
+            error = None
+            try:
+                response = self.client.submit_blob(
+                    blob, prepared, record=False
+                )
+            except grpc.RpcError as e:
+                error = e
+                disposition = (
+                    Disposition.RETRY
+                    if e.code() in RETRY_CODES else Disposition.FAILED
+                )
+                if (
+                    disposition is not Disposition.RETRY or
+                    attempts >= self.max_attempts
+                ) and self.client.sequences is not None:
+                    # The blob is not submitted again. Free its sequence for
+                    # a no-op, which fails harmlessly if the blob applied.
+                    self.client.sequences.release(
+                        prepared['Account'], prepared['Sequence']
+                    )
+            else:
+                result = response.engine_result.result
+                disposition = classify(result)
+                if disposition is Disposition.RESIGN:
+                    disposition = self._reconsider(
+                        result, transaction, resubmitted
+                    )
+                # Keep the sequence while this blob may still be submitted.
+                self.client.record_submission(
+                    prepared,
+                    response,
+                    retry=disposition is Disposition.RETRY and
+                    attempts < self.max_attempts,
+                )
+            if disposition in FINAL or attempts >= self.max_attempts:
+                if fill_gaps:
+                    self._fill_gaps(prepared['Account'])
+                return [
+                    Submission(
+                        transaction, txid, response, disposition, attempts,
+                        error
+                    )
+                ]
+            if disposition is Disposition.RESIGN:
+                prepared = self._prepare(transaction)
+                blob, txid = self._wallet(prepared).sign_transaction_blob(
+                    prepared
+                )
+                resubmitted = False
+            else:
+                time.sleep(self.retry_delay * 2**(attempts - 1))
+                resubmitted = True
+
+    def _fill_gaps(self, address: Address) -> None:
+        if self.client.sequences is None:
+            return
+        while True:
+            sequence = self.client.sequences.allocate_gap(address)
+            if sequence is None:
+                return
+            filler = self._prepare({
+                'Account': address,
+                'Sequence': sequence,
+                'TransactionType': 'AccountSet',
+            })
+            blob, txid = self._wallet(filler).sign_transaction_blob(filler)
+            self._submit(filler, filler, blob, txid, fill_gaps=False)
+
+    def submit(
+        self, transactions: t.Iterable[Transaction]
+    ) -> t.Iterator[Submission]:
+        """
+        Yield a :class:`Submission` for each transaction, in order.
+
+        `transactions` is consumed only as fast as results are consumed.
+        """
+        return imap_ordered(
+            self.executor, self._submit, self._sign(transactions),
+            self.max_pending
+        )
+
+    def close(self) -> None:
+        self.executor.shutdown()
+
+    def __enter__(self) -> 'SubmissionPipeline':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
@@ -0,0 +1,194 @@
+"""
+Write the JSON text of serialized transactions directly from the binary.
+
+Each field is transcoded by the function for its type, which writes the
+same text as ``json.dumps`` would for the deserialized value.
+"""
+
+import json
+import typing as t
+
+from xpring.bits import from_bytes
+from xpring.codec import DEFAULT_CODEC
+from xpring.serialization import (
+    ARRAY_END_MARKER,
+    FIELDS_BY_NAME,
+    LEDGER_ENTRY_TYPES_BY_CODE,
+    OBJECT_END_MARKER,
+    TRANSACTION_TYPES_BY_CODE,
+    Scanner,
+    deserialize_account_id,
+    deserialize_amount,
+    deserialize_amount_non_xrp,
+    deserialize_blob,
+    deserialize_currency,
+    deserialize_field_key,
+    deserialize_hash128,
+    deserialize_hash160,
+    deserialize_hash256,
+    deserialize_pathset,
+    deserialize_uint8,
+    deserialize_uint16,
+    deserialize_uint32,
+    deserialize_uint64,
+    deserialize_vector256,
+)
+from xpring.types import AccountId
+
+Write = t.Callable[[str], t.Any]
+Transcoder = t.Callable[[Scanner, Write], None]
+
+
+def transcode_account_id(scanner: Scanner, write: Write) -> None:
+    write('"')
+    write(deserialize_account_id(scanner))
+    write('"')
+
+
+def transcode_amount(scanner: Scanner, write: Write) -> None:
+    # Most-significant bit is the format bit. 1 means "is not XRP".
+    if not scanner.bite() & (1 << 7):
+        write('"')
+        write(t.cast(str, deserialize_amount(scanner)))
+        write('"')
+        return
+    write('{"value": "')
+    write(deserialize_amount_non_xrp(scanner))
+    write('", "currency": ')
+    write(json.dumps(deserialize_currency(scanner)))
+    write(', "issuer": "')
+    write(
+        DEFAULT_CODEC.encode_address(t.cast(AccountId, scanner.take(20)))
+    )
+    write('"}')
+
+
+def transcode_array(scanner: Scanner, write: Write) -> None:
+    write('[')
+    separator = ''
+    while scanner.peek(1) != ARRAY_END_MARKER:
+        json_key, transcode = transcode_field_key(scanner)
+        write(separator)
+        write('{')
+        write(json_key)
+        transcode(scanner, write)
+        write('}')
+        separator = ', '
+    scanner.skip(1)
+    write(']')
+
+
+def transcode_field_key(scanner: Scanner) -> t.Tuple[str, Transcoder]:
+    """
+    Read a field ID. Return the JSON text of its key, and the transcoder of
+    its value.
+    """
+    key = deserialize_field_key(scanner)
+    try:
+        return TRANSCODERS_BY_ID[key]
+    except KeyError:
+        type_code, field_code = key
+        raise NotImplementedError(
+            f'cannot transcode field ({type_code}, {field_code})'
+        ) from None
+
+
+def transcode_hex(deserialize: t.Callable[[Scanner], str]) -> Transcoder:
+
+    def transcode(scanner: Scanner, write: Write) -> None:
+        write('"')
+        write(deserialize(scanner))
+        write('"')
+
+    return transcode
+
+
+def transcode_int(deserialize: t.Callable[[Scanner], int]) -> Transcoder:
+
+    def transcode(scanner: Scanner, write: Write) -> None:
+        write(str(deserialize(scanner)))
+
+    return transcode
+
+
+def transcode_ledger_entry_type(scanner: Scanner, write: Write) -> None:
+    write(LEDGER_ENTRY_TYPES_JSON[deserialize_uint16(scanner)])
+
+
+def transcode_object(scanner: Scanner, write: Write) -> None:
+    write('{')
+    separator = ''
+    while scanner.peek(1) != OBJECT_END_MARKER:
+        json_key, transcode = transcode_field_key(scanner)
+        write(separator)
+        write(json_key)
+        transcode(scanner, write)
+        separator = ', '
+    scanner.skip(1)
+    write('}')
+
+
+def transcode_pathset(scanner: Scanner, write: Write) -> None:
+    # Paths are rare enough that we go through the dictionary form.
+    write(json.dumps(deserialize_pathset(scanner)))
+
+
+def transcode_transaction(scanner: Scanner, file: t.TextIO) -> None:
+    """
+    Write the JSON text of a serialized transaction to a file.
+
+    The output is identical to
+    ``json.dumps(deserialize_transaction(scanner))``, but it is written
+    directly from the binary without building the intermediate dictionary.
+    Use an :class:`io.StringIO` to collect it in memory.
+    """
+    scanner.extend(OBJECT_END_MARKER)
+    transcode_object(scanner, file.write)
+
+
+def transcode_transaction_type(scanner: Scanner, write: Write) -> None:
+    write(TRANSACTION_TYPES_JSON[from_bytes(scanner.take(2))])
+
+
+def transcode_vector256(scanner: Scanner, write: Write) -> None:
+    write(json.dumps(deserialize_vector256(scanner)))
+
+
+TRANSCODERS: t.Dict[str, Transcoder] = {
+    'AccountID': transcode_account_id,
+    'Amount': transcode_amount,
+    'Blob': transcode_hex(deserialize_blob),
+    'Hash128': transcode_hex(deserialize_hash128),
+    'Hash160': transcode_hex(deserialize_hash160),
+    'Hash256': transcode_hex(deserialize_hash256),
+    'PathSet': transcode_pathset,
+    'STArray': transcode_array,
+    'STObject': transcode_object,
+    'UInt8': transcode_int(deserialize_uint8),
+    'UInt16': transcode_int(deserialize_uint16),
+    'UInt32': transcode_int(deserialize_uint32),
+    'UInt64': transcode_hex(deserialize_uint64),
+    'Vector256': transcode_vector256,
+}
+
+# JSON strings, encoded once.
+LEDGER_ENTRY_TYPES_JSON = {
+    k: json.dumps(v) for k, v in LEDGER_ENTRY_TYPES_BY_CODE.items()
+}
+TRANSACTION_TYPES_JSON = {
+    k: json.dumps(v) for k, v in TRANSACTION_TYPES_BY_CODE.items()
+}
+# The JSON key and transcoder of each serialized field, by field key.
+TRANSCODERS_BY_ID: t.Dict[t.Tuple[int, int], t.Tuple[str, Transcoder]] = {
+    field['key']: (json.dumps(field_name) + ': ', TRANSCODERS[field['type']])
+    for field_name, field in FIELDS_BY_NAME.items()
+    if field['isSerialized']
+}
+_TRANSACTION_TYPE = FIELDS_BY_NAME['TransactionType']['key']
+_LEDGER_ENTRY_TYPE = FIELDS_BY_NAME['LedgerEntryType']['key']
+TRANSCODERS_BY_ID[_TRANSACTION_TYPE] = (
+    TRANSCODERS_BY_ID[_TRANSACTION_TYPE][0], transcode_transaction_type
+)
+TRANSCODERS_BY_ID[_LEDGER_ENTRY_TYPE] = (
+    TRANSCODERS_BY_ID[_LEDGER_ENTRY_TYPE][0], transcode_ledger_entry_type
+)
@@ -55,3 +55,5 @@ class TransactionStatus(Enum):
     FAILED = 1
     PENDING = None
     SUCCEEDED = 0
+    # Never validated, and past its LastLedgerSequence.
+    EXPIRED = 2
@@ -0,0 +1,187 @@
+from collections import OrderedDict
+from concurrent.futures import Executor
+import threading
+import time
+import typing as t
+
+from xpring.algorithms import ed25519, secp256k1
+from xpring.algorithms.signing import SigningAlgorithm
+from xpring.hashes import sha512half
+from xpring.patching import locate_fields
+from xpring.serialization import (
+    PREFIX_TRANSACTION_ID,
+    PREFIX_TRANSACTION_SIGNATURE,
+    Scanner,
+    deserialize_field_key,
+    vl_decode,
+)
+from xpring.types import PublicKey, Signature
+
+SignatureCheck = t.Tuple[bytes, Signature, PublicKey]
+
+
+class SignatureCache:
+    """
+    A bounded cache of signature verification results, in the spirit of
+    rippled's HashRouter.
+
+    Keys are digests that commit to the message, signature, and public key,
+    e.g. transaction IDs. Both good and bad results are cached. The least
+    recently used entry is evicted beyond `capacity`, and entries expire
+    after `ttl` seconds, if given.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 65536,
+        ttl: t.Optional[float] = None,
+        clock: t.Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.capacity = capacity
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[bytes, t.Tuple[bool, float]]' = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get(self, key: bytes) -> t.Optional[bool]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] < self.clock():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: bytes, result: bool) -> None:
+        expires = float('inf') if self.ttl is None else self.clock() + self.ttl
+        with self._lock:
+            self._entries[key] = (result, expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def split_signed_transaction(blob: bytes) -> SignatureCheck:
+    """
+    Return the message signed by a serialized transaction, its signature,
+    and its public key.
+
+    The message is the signing blob, cut out of the binary, after
+    :data:`PREFIX_TRANSACTION_SIGNATURE`.
+    """
+    message = bytearray(PREFIX_TRANSACTION_SIGNATURE)
+    values = {}
+    for field, start, end in locate_fields(blob):
+        if field['isSigningField']:
+            message.extend(blob[start:end])
+        if field['name'] in ('SigningPubKey', 'TxnSignature'):
+            scanner = Scanner(blob[start:end])
+            deserialize_field_key(scanner)
+            values[field['name']] = bytes(vl_decode(scanner))
+    if not values.get('SigningPubKey') or 'TxnSignature' not in values:
+        raise ValueError('transaction is not single-signed')
+    return (
+        bytes(message),
+        t.cast(Signature, values['TxnSignature']),
+        t.cast(PublicKey, values['SigningPubKey']),
+    )
+
+
+def algorithm_for_public_key(public_key: PublicKey) -> SigningAlgorithm:
+    if public_key.startswith(ed25519.KEY_PREFIX):
+        return ed25519
+    return secp256k1
+
+
+def verify_chunk(blobs: t.Sequence[bytes]) -> t.List[bool]:
+    results = [False] * len(blobs)
+    # Indices and checks, by algorithm.
+    batches: t.Dict[t.Any, t.Tuple[t.List[int], t.List[SignatureCheck]]] = {}
+    for i, blob in enumerate(blobs):
+        try:
+            check = split_signed_transaction(blob)
+        except (ValueError, KeyError, IndexError):
+            continue
+        algorithm = algorithm_for_public_key(check[2])
+        indices, checks = batches.setdefault(algorithm, ([], []))
+        indices.append(i)
+        checks.append(check)
+    for algorithm, (indices, checks) in batches.items():
+        messages, signatures, public_keys = zip(*checks)
+        try:
+            oks = algorithm.verify_batch(messages, signatures, public_keys)
+        except Exception:  # pylint: disable=broad-except
+            # Find the malformed checks one at a time.
+            oks = [verify_check(algorithm, check) for check in checks]
+        for i, ok in zip(indices, oks):
+            results[i] = ok
+    return results
+
+
+def verify_check(algorithm: SigningAlgorithm, check: SignatureCheck) -> bool:
+    """Verify one signature. Any error from the algorithm is a failure."""
+    message, signature, public_key = check
+    try:
+        return algorithm.verify_batch([message], [signature], [public_key])[0]
+    except Exception:  # pylint: disable=broad-except
+        return False
+
+
+def verify_signed_transactions(
+    blobs: t.Iterable[bytes],
+    executor: t.Optional[Executor] = None,
+    chunk_size: int = 256,
+    cache: t.Optional[SignatureCache] = None,
+) -> t.List[bool]:
+    """
+    Verify the ``TxnSignature`` of each serialized transaction against its
+    ``SigningPubKey``.
+
+    Malformed and multi-signed transactions verify as False. With an
+    executor (e.g. a process pool), chunks of transactions are parsed and
+    verified in parallel. With a cache, transactions are looked up by their
+    ID, which covers the signing public key, and only misses are verified.
+    """
+    blobs = list(blobs)
+    results: t.List[t.Optional[bool]]
+    if cache is None:
+        keys = []
+        results = [None] * len(blobs)
+    else:
+        keys = [sha512half(PREFIX_TRANSACTION_ID + blob) for blob in blobs]
+        results = [cache.get(key) for key in keys]
+    misses = [i for i, result in enumerate(results) if result is None]
+    pending = [blobs[i] for i in misses]
+    if executor is None:
+        oks = verify_chunk(pending)
+    else:
+        futures = [
+            executor.submit(verify_chunk, pending[i:i + chunk_size])
+            for i in range(0, len(pending), chunk_size)
+        ]
+        oks = [ok for future in futures for ok in future.result()]
+    for i, ok in zip(misses, oks):
+        results[i] = ok
+        if cache is not None:
+            cache.put(keys[i], ok)
+    return t.cast(t.List[bool], results)
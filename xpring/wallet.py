@@ -1,13 +1,19 @@
+import time
 import typing as t
 
-from xpring.hashes import sha512half
+from xpring import instrumentation
+from xpring.hashes import Sha512Half, sha512half
 from xpring.key_pair import KeyPair
 from xpring.serialization import (
     PREFIX_TRANSACTION_ID,
     PREFIX_TRANSACTION_SIGNATURE,
+    ByteArraySink,
+    HasherSink,
     serialize_transaction,
+    serialize_transaction_into,
 )
 from xpring.algorithms.signing import SigningAlgorithm
+from xpring.verification import SignatureCache
 from xpring.types import (
     AccountId,
     Address,
@@ -23,13 +29,22 @@ from xpring.types import (
 
 class Wallet:
 
-    def __init__(self, key_pair: KeyPair):
+    def __init__(
+        self,
+        key_pair: KeyPair,
+        signature_cache: t.Optional[SignatureCache] = None,
+    ):
         self.key_pair = key_pair
+        self.signature_cache = signature_cache
 
     @classmethod
-    def from_seed(cls, seed: EncodedSeed):
+    def from_seed(
+        cls,
+        seed: EncodedSeed,
+        signature_cache: t.Optional[SignatureCache] = None,
+    ):
         key_pair = KeyPair.from_encoded_seed(seed)
-        return cls(key_pair)
+        return cls(key_pair, signature_cache)
 
     @property
     def seed(self) -> Seed:
@@ -55,18 +70,64 @@ class Wallet:
     def private_key(self) -> PrivateKey:
         return self.key_pair.private_key
 
+    def _metric(self, operation: str) -> str:
+        algorithm = t.cast(t.Any, self.algorithm).__name__.rpartition('.')[2]
+        return f'{operation}.{algorithm}.seconds'
+
     def sign(self, message: bytes) -> Signature:
-        return self.key_pair.sign(message)
+        recorder = instrumentation.recorder
+        if recorder is None:
+            return self.key_pair.sign(message)
+        start = time.perf_counter()
+        signature = self.key_pair.sign(message)
+        recorder.observe(self._metric('sign'), time.perf_counter() - start)
+        return signature
 
-    def sign_transaction(self, transaction: Transaction) -> SignedTransaction:
+    def _sign_fields(self, transaction: Transaction) -> t.Dict[str, t.Any]:
+        """Return the transaction with `SigningPubKey` and `TxnSignature`."""
         result = {**transaction, 'SigningPubKey': self.public_key.hex().upper()}
-        blob = serialize_transaction(result, signing=True)
-        signature = self.sign(PREFIX_TRANSACTION_SIGNATURE + blob)
+        sink = ByteArraySink(bytearray(PREFIX_TRANSACTION_SIGNATURE))
+        serialize_transaction_into(sink, result, signing=True)
+        signature = self.sign(bytes(sink.buffer))
         result['TxnSignature'] = signature.hex().upper()
-        blob = serialize_transaction(result)
-        digest = sha512half(PREFIX_TRANSACTION_ID + blob)
-        result['hash'] = digest.hex().upper()
+        return result
+
+    def sign_transaction(self, transaction: Transaction) -> SignedTransaction:
+        result = self._sign_fields(transaction)
+        # The signed blob is needed only for its hash.
+        hasher = Sha512Half(PREFIX_TRANSACTION_ID)
+        serialize_transaction_into(HasherSink(hasher), result)
+        result['hash'] = hasher.hexdigest().upper()
+        return result
+
+    def sign_transaction_blob(
+        self, transaction: Transaction
+    ) -> t.Tuple[bytes, bytes]:
+        """Sign a transaction and return its serialized form and hash."""
+        blob = serialize_transaction(self._sign_fields(transaction))
+        return blob, sha512half(PREFIX_TRANSACTION_ID + blob)
+
+    def _verify(self, message: bytes, signature: bytes) -> bool:
+        recorder = instrumentation.recorder
+        if recorder is None:
+            return self.key_pair.verify(message, t.cast(Signature, signature))
+        start = time.perf_counter()
+        result = self.key_pair.verify(message, t.cast(Signature, signature))
+        recorder.observe(self._metric('verify'), time.perf_counter() - start)
         return result
 
     def verify(self, message: bytes, signature: bytes) -> bool:
-        return self.key_pair.verify(message, t.cast(Signature, signature))
+        if self.signature_cache is None:
+            return self._verify(message, signature)
+        # Public keys have a fixed length, but signatures do not. Frame the
+        # signature so that no other split of the same bytes shares the key.
+        hasher = Sha512Half(self.public_key)
+        hasher.update(len(signature).to_bytes(2, 'big'))
+        hasher.update(signature)
+        hasher.update(message)
+        key = hasher.digest()
+        result = self.signature_cache.get(key)
+        if result is None:
+            result = self._verify(message, signature)
+            self.signature_cache.put(key, result)
+        return result